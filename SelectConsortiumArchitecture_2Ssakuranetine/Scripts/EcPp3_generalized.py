@@ -15,6 +15,7 @@ PIPELINE DESIGNED FOR SELECTION OF THE BEST ARCHITECTURE FOR A GIVEN CONSORTIUM
 Series of functions:
     
     - "biomass_evolution_during_simulation" function for a given number of strains (say 'n')
+    - "COMETS_repeat" function: single COMETS run for a given configuration (sequential or parallel repeats)
     - "SelectConsortiumArchitecture" function for a given number of strains (say 'n')
 
 
@@ -67,6 +68,7 @@ the architecture that is currently running.
 import cobra
 import os, stat
 import pandas as pd
+import numpy as np
 import tabulate
 import re
 import sys
@@ -76,12 +78,12 @@ import copy
 import csv
 import math
 import cobra.flux_analysis.variability
-import massedit
 import subprocess
 import shutil, errno
 import statistics
 import optlang
 import collections
+import concurrent.futures
 from cobra import Reaction
 from cobra import Metabolite
 # import gurobipy
@@ -90,6 +92,14 @@ from cobra import Metabolite
 
 # OUR MODULES FOR FLYCOP TO WORK
 import EcPp3_generalized_initialize_GEMs
+import EcPp3_generalized_model_cache
+import EcPp3_generalized_results_store
+import EcPp3_generalized_layout_COMETS
+import EcPp3_generalized_workspace
+import EcPp3_generalized_parse_COMETS
+import EcPp3_generalized_flux_archive
+import EcPp3_generalized_plot_COMETS
+import EcPp3_generalized_comets_supervisor
 # -----------------------------------------------------------------------------
 
 
@@ -166,121 +176,90 @@ import EcPp3_generalized_initialize_GEMs
 # -----------------------------------------------------------------------------
 
 
-def biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_loss_required = 1e-4, biomass_indexes = []):
-    cycle_count = 0
+def biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_loss_required = 1e-4, biomass_indexes = [], CometsArray = None):
     
-    biomass_track = 0  # Biomass loss absence: 0; Biomass loss presence: 1, Reversible Biomass Loss: -1
-    count_loss_cycles = 0  # Number of consecutive cycles with biomass loss (counter)
+    # BIOMASS ARRAY: row = cycle (row 0 = initial situation), column = microbe in the consortium
+    # CometsArray: float array of the whole COMETS table, shared with 'nutrient_evolution_during_simulation'
+    # -------------------------------------------------------------------------
+    if CometsArray is None: CometsArray = CometsTable.to_numpy(dtype=float)
+    biomass = CometsArray[:, biomass_indexes]
+    n_rows = biomass.shape[0]
+    cycles = np.arange(n_rows)
     
-    initial_dead = 0  # Cycle where the effect is considered to start
-    init_biomass = 0  # Total initial biomass, at the beginning of the simulation
+    # Total biomass in every cycle (microbes added up one by one, as the cycle_total_biomass variable)
+    total_biomass = np.zeros(n_rows)
+    for n_strain in range(biomass.shape[1]):
+        total_biomass += biomass[:, n_strain]
+    init_biomass = total_biomass[0]  # Total initial biomass, at the beginning of the simulation
     
-    biomass_growth = True  # Reversible Dead Tracking
-    biomass_growth_cycles = 0  # Number of consecutive cycles with biomass growth (counter)
     
-    # Dictionary: (biomass_i): last_biomass_value (last cycle)
-    last_biomass = collections.OrderedDict()
-    # Dictionary: (biomass_i): biomass_value (current cycle)
-    biomass = collections.OrderedDict()
+    # ---------------------------------------------------------------------------------------
+    # BLOCK 1
+    # Evaluate if there is biomass loss within every cycle, for all the cycles at once
+    # ---------------------------------------------------------------------------------------
     
+    # Number of microbes with biomass loss in every cycle (no biomass loss in the initial cycle)
+    # Biomass loss is considered if the substraction (current - last biomass) gives a negative value under
+    # the minimal biomass loss allowed (min_biomass_loss_required)
+    loss_in_cycle = np.zeros(n_rows, dtype=np.int64)
+    loss_in_cycle[1:] = (np.diff(biomass, axis=0) < (- min_biomass_loss_required)).sum(axis=1)
+    biomass_loss_in_cycle = loss_in_cycle > 0  # INDICATOR, for every cycle
     
-    # ITERATE ON COMETS_FILE, row by row
-    # Note tuple 241 = cycle 240; tuple 0 = initial situation
-    # -------------------------------------------------------
-    for row in CometsTable.itertuples():  
-        cycle = row[0]
-        # print(cycle)
+    # Consecutive cycles with biomass loss (counter): one unit for each microbe with biomass loss,
+    # back to 0 in every cycle without biomass loss (run-length of the biomass loss periods)
+    cumulative_loss = np.cumsum(loss_in_cycle)
+    count_loss_cycles = cumulative_loss - np.maximum.accumulate(np.where(biomass_loss_in_cycle, 0, cumulative_loss))
     
-        lower_than_init_biomass = False  # INDICATOR 
-        cycle_count += 1
-
-        
-        # ---------------------------------------------------------------------------------------
-        # BLOCK 1
-        # Evaluate if there is biomass loss within the cycle and update 'last_biomass' dictionary
-        # ---------------------------------------------------------------------------------------
-        counter = 1
-        if cycle == 0:  # Initial cycle
-            for index in biomass_indexes:
-                last_biomass["biomass"+str(counter)] = CometsTable.loc[cycle, CometsTable.columns[index]]  
-                init_biomass += CometsTable.loc[cycle, CometsTable.columns[index]]
-                counter += 1
-            
-            # Initial cycle is always 'cycle == 0'
-            initCycle = cycle
-            
-        elif cycle != 0:  # Posterior cycle
-            biomass_loss_in_cycle = False  # INDICATOR 
-            cycle_total_biomass = 0  # Total biomass in the current cycle
-            
-            # For every microbe in the consortium
-            counter = 1
-            for index in biomass_indexes:  
-                
-                # Update dictionary on current biomass values
-                biomass["biomass"+str(counter)] = CometsTable.loc[cycle, CometsTable.columns[index]]
-                # Update total biomass in the current cycle
-                cycle_total_biomass += CometsTable.loc[cycle, CometsTable.columns[index]]  
-                
-                # In case of biomass loss for a given microbe
-                # Biomass loss is considered if the next substraction gives a negative value under
-                # the minimal biomass loss allowed (min_biomass_loss_required)
-                if float(biomass["biomass"+str(counter)] - last_biomass["biomass"+str(counter)] < (- min_biomass_loss_required)):
-                    biomass_loss_in_cycle = True  # Set indicator to True
-                    count_loss_cycles += 1  # Add up a new consecutive cycle  
-                    last_dead = cycle  # Last cycle where the effect is registered
-                    biomass_growth = False  # In the current cycle, biomass does not grow
-                    
-                counter += 1
-            
-            
-            # If there has not been biomass loss in the current and the previous cycle
-            if not biomass_loss_in_cycle and biomass_growth:
-                biomass_growth_cycles += 1  # Number of CONSECUTIVE cycles of biomass growth
-                
-                
-            # If there has not been biomass loss in the current cycle
-            if not biomass_loss_in_cycle:
-                count_loss_cycles = 0  # Number of CONSECUTIVE cycles of biomass loss, back to 0
-                biomass_growth = True  # In the current cycle, biomass has grown (very likely, since it has not been lost)
-                
-                
-            # If the total biomass in the current cycle is lower than the initial biomass in origin
-            if (float(cycle_total_biomass) < float(init_biomass)): 
-                lower_than_init_biomass = True  # Set indicator to True
-            
-            
-            # If the total biomass in the current cycle is again higher than the initial biomass in origin,
-            # after having been lower (lower_than_init_biomass = True --> False)
-            elif lower_than_init_biomass and (float(cycle_total_biomass) > float(init_biomass)): 
-                lower_than_init_biomass = False  # Set indicator to False
-                
-                
-            # Biomass values in current cycle become last biomass values
-            counter = 1
-            for index in biomass_indexes: 
-                last_biomass["biomass"+str(counter)] = CometsTable.loc[cycle, CometsTable.columns[index]]
-                counter += 1
-            
-                
-        # ---------------------------------------------------------------------
-        # BLOCK 2
-        # ---------------------------------------------------------------------
-        # If there is biomass loss during more than 10 consecutive cycles (1) or if current total biomass is lower than initial biomass (2),
-        # BIOMASS LOSS is considered to be present
-        # ---------------------------------------------------------------------
-        # Set endCycle depending on biomass_track
-        # ---------------------------------------------------------------------
+    # Last cycle where the effect is registered, up to every cycle (-1: no biomass loss so far)
+    last_dead = np.maximum.accumulate(np.where(biomass_loss_in_cycle, cycles, -1))
+    
+    # Cycles of biomass growth (counter): no biomass loss in the current and the previous cycle
+    growth_in_cycle = np.zeros(n_rows, dtype=bool)
+    growth_in_cycle[1:] = ~biomass_loss_in_cycle[1:] & ~biomass_loss_in_cycle[:-1]
+    biomass_growth_cycles = np.cumsum(growth_in_cycle)
+    
+    # If the total biomass in the current cycle is lower than the initial biomass in origin
+    lower_than_init_biomass = total_biomass < init_biomass  # INDICATOR, for every cycle
+    
+    
+    # ---------------------------------------------------------------------
+    # BLOCK 2
+    # ---------------------------------------------------------------------
+    # If there is biomass loss during more than 10 consecutive cycles (1) or if current total biomass is lower than initial biomass (2),
+    # BIOMASS LOSS is considered to be present
+    # ---------------------------------------------------------------------
+    # 'biomass_track' only changes in the cycles where the activation (or reversion) condition holds:
+    # the state machine jumps from one of these cycles to the next one
+    # ---------------------------------------------------------------------
+    activation_cycles = np.flatnonzero((count_loss_cycles >= n_cycles) | lower_than_init_biomass)
+    reversion_cycles = np.flatnonzero(~lower_than_init_biomass & (biomass_growth_cycles >= n_cycles))
+    
+    biomass_track = 0  # Biomass loss absence: 0; Biomass loss presence: 1, Reversible Biomass Loss: -1
+    initial_dead = 0  # Cycle where the effect is considered to start
+    cycle = -1  # Last cycle evaluated
+    
+    while True:
         
         # Activation of 'Dead Tracking'
-        if (count_loss_cycles >= n_cycles or lower_than_init_biomass) and biomass_track != 1:
+        if biomass_track != 1:
+            next_cycle = np.searchsorted(activation_cycles, cycle, side="right")
+            if next_cycle == len(activation_cycles): break
+            cycle = int(activation_cycles[next_cycle])
+            
             biomass_track = 1
-            if initial_dead == 0: initial_dead = last_dead - count_loss_cycles
+            # Total biomass lower than initial biomass without any previous biomass loss in a given microbe:
+            # the current cycle is taken as the last cycle where the effect is registered
+            activation_dead = int(last_dead[cycle]) if last_dead[cycle] >= 0 else cycle
+            if initial_dead == 0: initial_dead = activation_dead - int(count_loss_cycles[cycle])
             elif initial_dead < 0: initial_dead = 0
             endCycle = initial_dead
         
         # 'Reversible Dead Tracking'
-        elif biomass_track == 1 and (not lower_than_init_biomass and biomass_growth_cycles >= n_cycles):
+        else:
+            next_cycle = np.searchsorted(reversion_cycles, cycle, side="right")
+            if next_cycle == len(reversion_cycles): break
+            cycle = int(reversion_cycles[next_cycle])
+            
             biomass_track = -1
         
         # ---------------------------------------------------------------------
@@ -288,21 +267,21 @@ def biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_
         
     # REGISTER EFFECT, AS IT CORRESPONDS       
     # -------------------------------------------------------------------------
-    # print("Cycle count: ", cycle_count)
     
-    # Initial line in the simulation
-    initLine = CometsTable.iloc[initCycle].to_list()
+    # Initial line in the simulation (initial cycle is always 'cycle == 0')
+    initLine = CometsArray[0].tolist()
     
     # Final line in the simulation
-    if biomass_track != 1: endCycle = cycle
-    finalLine = CometsTable.iloc[endCycle].to_list()
+    if biomass_track != 1: endCycle = n_rows - 1
+    finalLine = CometsArray[endCycle].tolist()
     
     # Correction of endCycle
     if initial_dead < 0: initial_dead = 0
         
     
     if biomass_track != 0:
-        dead_cycles = str(initial_dead)+"-"+str(last_dead)  # biomass_track = 1 or -1 ('Reversible Dead Tracking')
+        last_dead_cycle = int(last_dead[-1]) if last_dead[-1] >= 0 else activation_dead
+        dead_cycles = str(initial_dead)+"-"+str(last_dead_cycle)  # biomass_track = 1 or -1 ('Reversible Dead Tracking')
         
     else:
         dead_cycles = "NoDeadTracking"  # biomass_track = 0
@@ -325,7 +304,7 @@ def biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_
     # EXAMPLE: sucr:0,substrate
 
 # endCycle (for substrates which can be exhausted)
-# endCycle = 240 would mean:
+# endCycle = maxCycles (240 by default) would mean:
     # a) this nutrient is exhausted in the final simulation cycle or 
     # b) it has not been exhausted in the whole simulation
     
@@ -337,38 +316,35 @@ def biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_
 # -----------------------------------------------------------------------------
 
 
-def nutrient_evolution_during_simulation(CometsTable, nutrient_indexes_dict, endCycle_index, minimal_substrate_conc=0.001, minimal_product_conc=1.0):
-    cycle_count = 0
+def nutrient_evolution_during_simulation(CometsTable, nutrient_indexes_dict, endCycle_index, minimal_substrate_conc=0.001, minimal_product_conc=1.0,
+                                         maxCycles=240, CometsArray=None):
     
-    # EndCycle Dictionary
-    nutrient_endcycle_dict = collections.OrderedDict()
-    for nutrient_key in nutrient_indexes_dict.keys(): nutrient_endcycle_dict[nutrient_key] = 240
+    # Concentration array: row = cycle, column = nutrient (same order as in 'nutrients_to_track.txt')
+    # CometsArray: float array of the whole COMETS table, shared with 'biomass_evolution_during_simulation'
+    if CometsArray is None: CometsArray = CometsTable.to_numpy(dtype=float)
+    nutrients = list(nutrient_indexes_dict.keys())
+    nutrient_roles = np.array([nutrient_indexes_dict[nutrient][1] for nutrient in nutrients])
+    concentrations = CometsArray[:, [int(nutrient_indexes_dict[nutrient][0]) for nutrient in nutrients]]
     
-    # Nutrients that reach 'minimal_substrate_conc' or 'minimal_product_conc' have already found its simulation endCyce
-    already_processed_keys = []
+    # Threshold crossing in every cycle: substrates under 'minimal_substrate_conc', products over 'minimal_product_conc'
+    substrates = nutrient_roles == "substrate"
+    products = nutrient_roles == "product"
+    threshold_mask = np.zeros(concentrations.shape, dtype=bool)
+    threshold_mask[:, substrates] = concentrations[:, substrates] < minimal_substrate_conc
+    threshold_mask[:, products] = concentrations[:, products] > minimal_product_conc
     
-    # ITERATE ON COMETS_FILE, row by row
-    # Note tuple 241 = cycle 240; tuple 0 = initial situation
-    # -------------------------------------------------------
-    for row in CometsTable.itertuples():  
-        cycle = row[0]
-        
-        for nutrient in nutrient_indexes_dict:
-            if nutrient in already_processed_keys: continue
-        
-            nutrient_index = int(nutrient_indexes_dict[nutrient][0])
-            nutrient_role = nutrient_indexes_dict[nutrient][1]
-            current_concentration = CometsTable.loc[cycle, CometsTable.columns[nutrient_index]]
-            
-            if nutrient_role == "substrate":
-                if current_concentration < minimal_substrate_conc:
-                    nutrient_endcycle_dict[nutrient] = CometsTable.loc[cycle, CometsTable.columns[endCycle_index]]
-                    already_processed_keys.append(nutrient)
-
-            elif nutrient_role == "product":
-                if current_concentration > minimal_product_conc:
-                    nutrient_endcycle_dict[nutrient] = CometsTable.loc[cycle, CometsTable.columns[endCycle_index]]
-                    already_processed_keys.append(nutrient)
+    # First cycle crossing the threshold, for all nutrients at once (argmax = first True in every column)
+    first_cycles = threshold_mask.argmax(axis=0)
+    crossed = threshold_mask.any(axis=0)
+    
+    # EndCycle Dictionary
+    # Nutrients that never reach 'minimal_substrate_conc' or 'minimal_product_conc' keep the last simulation cycle (maxCycles)
+    nutrient_endcycle_dict = collections.OrderedDict()
+    for n_nutrient, nutrient_key in enumerate(nutrients):
+        if crossed[n_nutrient]:
+            nutrient_endcycle_dict[nutrient_key] = int(CometsArray[first_cycles[n_nutrient], endCycle_index])
+        else:
+            nutrient_endcycle_dict[nutrient_key] = maxCycles
     
     return nutrient_endcycle_dict
         
@@ -377,12 +353,324 @@ def nutrient_evolution_during_simulation(CometsTable, nutrient_indexes_dict, end
 
 
 
+###############################################################################
+### FUNCTION create_run_folder  ###############################################
+
+# SCRATCH FOLDER FOR A SINGLE COMETS REPEAT (parallel repeats)
+# Every COMETS run writes to fixed file names (output.txt, total_biomass_log_template2.txt,
+# media_log_template2.txt, etc.), thus parallel repeats need their own folder.
+
+# The scratch folder is a sibling of the temporal folder ('XXX_TestTempV0_run1', 'XXX_TestTempV0_run2', ...),
+# so that relative paths to the 'Scripts' folder (i.e. '../../Scripts') remain valid.
+# Only the files in the temporal folder are linked (COMETS layout and script, comets_scr, models), not subfolders:
+# they are not modified by COMETS, thus no copy is needed (see 'link_or_copy' in 'EcPp3_generalized_workspace.py').
+# -----------------------------------------------------------------------------
+
+def create_run_folder(temporal_folder, run_folder):
+    if os.path.exists(run_folder):
+        shutil.rmtree(run_folder)
+    os.makedirs(run_folder)
+
+    for file_name in os.listdir(temporal_folder):
+        file_path = os.path.join(temporal_folder, file_name)
+        if os.path.isfile(file_path):
+            EcPp3_generalized_workspace.link_or_copy(file_path, os.path.join(run_folder, file_name))
+
+### FUNCTION create_run_folder  ###############################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION COMETS_repeat  ###################################################
+
+# SINGLE COMETS RUN (repeat) FOR A GIVEN CONFIGURATION, executed in 'run_folder'
+# It can be called sequentially or from a process pool (parallel repeats); that is why
+# it does not change the current directory and it returns the run results instead of printing them.
+
+# COMETS is supervised (see 'EcPp3_generalized_comets_supervisor.py'): wall-clock and memory limits, and JVM heap
+# from the memory budget for 'n_jobs' COMETS runs at the same time (i.e. parallel repeats)
+# comets_run: result of a COMETS run already done in 'run_folder' (i.e. 'batch' COMETS runner). Default (None): COMETS is run here
+
+# RESULT: dictionary with the metrics computed from the COMETS output for the current run (outcome: 'OK'),
+# or only the outcome of the COMETS run ('ERROR', 'TIMEOUT', 'MEMORY') if it did not complete
+# -----------------------------------------------------------------------------
+
+def COMETS_repeat(run_folder, consortium_arch, baseConfig, strains_list, strains_string, nutrients_dictionary, maxCycles = 240, plots = 'pdf', timeStep = 0.1, n_jobs = 1, comets_run = None):
+    suffix = "template2"  # Variable to be modified depending on the names of COMETS files
+    n_strains = len(strains_list)  # Number of strains in the current consortium
+
+    # --------------------------------------------------------------------------
+    # RUNNING COMETS [supervised] + [Python] plot of the COMETS run (see 'EcPp3_generalized_plot_COMETS.py')
+    # DIR: run_folder
+    # --------------------------------------------------------------------------
+    if comets_run is None:
+        comets_run = EcPp3_generalized_comets_supervisor.run_comets(run_folder, 'comets_script_template'+consortium_arch, n_jobs=n_jobs)
+    if comets_run["outcome"] != "OK":  # Incomplete COMETS logs: no metrics
+        return {"outcome": comets_run["outcome"], "comets_run": comets_run}
+
+    n_metabolites = len(nutrients_dictionary)  # Number of metabolites to track
+    n_columns_without_biomass = n_metabolites + 1  # Column of cycle_number in the COMETS output file
+    metabolites = list(nutrients_dictionary.keys())  # Same order as the indexes in 'nutrients_to_track.txt'
+
+    # COMETS ARRAY: media and total biomass logs parsed in Python (see 'EcPp3_generalized_parse_COMETS.py')
+    CometsArray = EcPp3_generalized_parse_COMETS.comets_array(os.path.join(run_folder, "media_log_"+suffix+".txt"),
+                                                               os.path.join(run_folder, "total_biomass_log_"+suffix+".txt"), metabolites)
+
+    # Plot of the COMETS run: rendered now ('pdf'), deferred ('defer': plot data saved) or skipped ('skip')
+    if plots == "pdf":
+        EcPp3_generalized_plot_COMETS.plot_comets(CometsArray, os.path.join(run_folder, baseConfig+"_"+suffix+"_plot.pdf"), metabolites, strains_list, baseConfig, 
+                                                  timeStep=timeStep)
+    elif plots == "defer":
+        EcPp3_generalized_plot_COMETS.save_plot_data(CometsArray, os.path.join(run_folder, baseConfig+"_"+suffix+"_plot"+EcPp3_generalized_plot_COMETS.PLOT_DATA_SUFFIX), 
+                                                     metabolites, strains_list, baseConfig, timeStep=timeStep)
+
+    # ---------------------------------------------------------------------
+    # INDEX REFERENCES IN COMETS FILE (organized in columns)
+    # ---------------------------------------------------------------------
+    # sucr  2saku  fru  nar  nh4  pi  o2  cycle_number  Biomass1  Biomass2  Biomass3  [...]
+    # 0     1      2    3    4    5   6   7             8         9         10        11
+    # ---------------------------------------------------------------------
+
+
+    # ---------------------------------------------------------------------
+    # COMPUTE METRICS FROM COMETS
+    # DIR: run_folder
+    # ---------------------------------------------------------------------
+
+    # (0) BIOMASS EVOLUTION
+    #######################
+    biomass_indexes = []
+    for n_strain in range(n_strains):
+        # Indexes for 'biomass_evolution_during_simulation' function
+        biomass_indexes.append(n_columns_without_biomass + n_strain)
+
+    biomass_track, dead_process, initLine, finalLine = biomass_evolution_during_simulation(None, n_cycles = 10, min_biomass_loss_required= (1e-4), biomass_indexes = biomass_indexes, 
+                                                                                           CometsArray = CometsArray)
+    nutrient_endcycle_dict = nutrient_evolution_during_simulation(None, nutrient_indexes_dict=nutrients_dictionary,
+                                                                  endCycle_index=n_metabolites, minimal_substrate_conc=0.001, minimal_product_conc=1.0,
+                                                                  maxCycles=maxCycles, CometsArray=CometsArray)
+
+    # (1) INITIAL BIOMASS
+    #####################
+    init_biomass = 0
+    init_biomasses_dict = {}
+
+    for n_strain in range(n_strains):
+        # Initial biomass value for each microbe (individually)
+        init_biomasses_dict[strains_list[n_strain]] = float(initLine[n_columns_without_biomass + n_strain])
+        # (Global) initial biomass
+        init_biomass += float(initLine[n_columns_without_biomass + n_strain])
+
+
+    # (2) FINAL CONCENTRATIONS: pCA, Nar, limiting nutrients
+    ##########################
+    sucrConc=float(finalLine[0])  # Final sucrose
+    NH4conc=float(finalLine[4])  # Final NH4 (first limiting nutrient)
+    tot_MetNar=float(finalLine[1])  # Final metilated naringenin
+    tot_Nar=float(finalLine[3])  # Final Naringenin
+    Final_pi=float(finalLine[5])  # Second limiting nutrient
+    Final_O2=round(float(finalLine[6]), 4)  # Final O2
+    finalCycle=int(finalLine[7])  # Final Cycle
+
+
+    # (3) FINAL BIOMASS
+    ###################
+    total_final_biomass = 0
+    final_biomasses_dict = {}
+
+    for n_strain in range(n_strains):
+        # Final biomass value for each microbe (individually)
+        final_biomasses_dict[strains_list[n_strain]] = float(finalLine[n_columns_without_biomass + n_strain])
+        # (Global) final biomass
+        total_final_biomass += float(finalLine[n_columns_without_biomass + n_strain])
+
+
+    # (4) Pi OVERCONSUMPTION TRACKING (currently disabled)
+    ######################################################
+    # pi_overconsumption, pi_cycles = metabolite_tracking_overconsumption("COMETS_"+baseConfig+"_"+suffix+".txt", 10.0, 9)
+
+    # (5) COMPUTE FITNESS: maximize metilated naringenin
+    ####################################################
+    # if fitObj == "MaxMetNar":
+    fitFunc = tot_MetNar / (total_final_biomass)  # Final metilated naringenin yield over GLOBAL biomass (all microorganisms in the consortium)
+    # POTENTIAL REDEFINITION OF FITNESS
+    fitness=fitFunc
+
+    return {"outcome": "OK", "fitness": fitness, "finalCycle": finalCycle, "tot_Nar": tot_Nar, "tot_MetNar": tot_MetNar,
+            "sucrConc": sucrConc, "NH4conc": NH4conc, "Final_pi": Final_pi, "Final_O2": Final_O2,
+            "biomass_track": biomass_track, "dead_process": dead_process,
+            "init_biomass": init_biomass, "init_biomasses_dict": init_biomasses_dict,
+            "total_final_biomass": total_final_biomass, "final_biomasses_dict": final_biomasses_dict,
+            "nutrient_endcycle_dict": nutrient_endcycle_dict}
+
+### FUNCTION COMETS_repeat  ###################################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION chi2_cdf  ########################################################
+
+# CUMULATIVE DISTRIBUTION FUNCTION OF THE CHI-SQUARE DISTRIBUTION with 'df' degrees of freedom
+# (regularized lower incomplete gamma function, series expansion), without scipy
+# -----------------------------------------------------------------------------
+
+def chi2_cdf(x, df):
+    if x <= 0:
+        return 0.0
+    a = df/2.0
+    x = x/2.0
+    term = 1.0/a
+    total = term
+    n = 1
+    while abs(term) > 1e-15*abs(total) and n < 10000:
+        term *= x/(a+n)
+        total += term
+        n += 1
+    return min(1.0, math.exp(a*math.log(x) - x - math.lgamma(a))*total)
+
+### FUNCTION chi2_cdf  ########################################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION chi2_quantile  ###################################################
+
+# QUANTILE 'p' OF THE CHI-SQUARE DISTRIBUTION with 'df' degrees of freedom (bisection on 'chi2_cdf')
+# -----------------------------------------------------------------------------
+
+def chi2_quantile(p, df):
+    lower, upper = 0.0, float(df)
+    while chi2_cdf(upper, df) < p:
+        upper *= 2
+    for n_iteration in range(200):
+        middle = (lower+upper)/2
+        if chi2_cdf(middle, df) < p:
+            lower = middle
+        else:
+            upper = middle
+    return (lower+upper)/2
+
+### FUNCTION chi2_quantile  ###################################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION adaptive_repeats_decision  #######################################
+
+# ADAPTIVE REPEATS: decision on stopping the COMETS repeats of a configuration in advance,
+# given the fitness values of the repeats already run (fitnessList)
+
+# Every decision is taken with the confidence of 'z_value' (one-sided normal quantile, 99.87% for 3.0):
+#   - confidence interval of the mean: mean -/+ z_value * standard error of the mean
+#   - confidence interval of the SD: chi-square interval for n-1 degrees of freedom (i.e. with 2 repeats,
+#     only deterministic configurations are clearly stable)
+
+#   - 'unstable': the lower bound of the SD is over the maximum allowed (sd_cutoff * upper bound of the mean),
+#                 i.e. the SD stays over sd_cutoff * mean (ID_SD = 1) with the remaining repeats
+#   - 'hopeless': the upper bound of the mean is below the best fitness so far (incumbent_fitness)
+#   - 'stable': the upper bound of the SD is below the maximum allowed (sd_cutoff * lower bound of the mean),
+#               i.e. the SD stays below sd_cutoff * mean (ID_SD = 0) with the remaining repeats
+#   - None: go on with the next repeat
+
+# The SD and ID_SD reported for the repeats run (see 'SelectConsortiumArchitecture') agree with the decision:
+# 'stable' gives ID_SD = 0, 'unstable' gives ID_SD = 1.
+
+# RESULT: 'stable', 'unstable', 'hopeless' or None
+# -----------------------------------------------------------------------------
+
+def adaptive_repeats_decision(fitnessList, sd_cutoff, incumbent_fitness=None, z_value=3.0):
+    n_repeats = len(fitnessList)
+    if n_repeats < 2:
+        return None
+    
+    meanfitness = statistics.mean(fitnessList)
+    sdfitness = statistics.stdev(fitnessList)
+    sefitness = sdfitness/math.sqrt(n_repeats)  # Standard error of the mean
+    
+    # Confidence intervals of the mean and of the SD (chi-square, n-1 degrees of freedom)
+    alpha = 1 - statistics.NormalDist().cdf(z_value)
+    mean_lower, mean_upper = meanfitness - z_value*sefitness, meanfitness + z_value*sefitness
+    sd_lower = sdfitness*math.sqrt((n_repeats-1)/chi2_quantile(1-alpha, n_repeats-1))
+    sd_upper = sdfitness*math.sqrt((n_repeats-1)/chi2_quantile(alpha, n_repeats-1))
+    
+    if sd_lower > float(sd_cutoff)*mean_upper:
+        return "unstable"
+    if incumbent_fitness is not None and mean_upper < incumbent_fitness:
+        return "hopeless"
+    if sd_upper <= float(sd_cutoff)*mean_lower:
+        return "stable"
+    return None
+
+### FUNCTION adaptive_repeats_decision  #######################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION fidelity_parameters  #############################################
+
+# MULTI-FIDELITY: COMETS cycles and time step of a low fidelity evaluation (screening), given the values of the full fidelity.
+# fidelity: fraction of the COMETS cycles of the full fidelity (0 < fidelity <= 1)
+
+#   - 'horizon': shortened simulation, same time step (maxCycles * fidelity cycles)
+#   - 'timestep': same simulated time, coarser time step (maxCycles * fidelity cycles, time step / fidelity)
+
+# RESULT: maxCycles, timeStep
+# -----------------------------------------------------------------------------
+
+def fidelity_parameters(fidelity, maxCycles, timeStep, fidelity_mode='horizon'):
+    fidelity = float(fidelity)
+    if fidelity <= 0 or fidelity > 1:
+        print("ERROR! Fidelity should be in (0, 1]: "+str(fidelity))
+        raise ValueError(fidelity)
+    if fidelity_mode not in ("horizon", "timestep"):
+        print("ERROR! Unknown fidelity mode (horizon, timestep): "+str(fidelity_mode))
+        raise ValueError(fidelity_mode)
+    
+    fidelity_cycles = max(1, int(round(maxCycles*fidelity)))
+    if fidelity_mode == "timestep":
+        return fidelity_cycles, round(timeStep*maxCycles/fidelity_cycles, 6)  # Same simulated time
+    return fidelity_cycles, timeStep
+
+### FUNCTION fidelity_parameters  #############################################
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION promote_configuration  ###########################################
+
+# MULTI-FIDELITY: decision on evaluating a configuration at the next fidelity level (successive halving),
+# given its average fitness at the current fidelity and the configurations already evaluated at that fidelity (results store in dirPlot)
+
+#   - promoted if it is in the best 'promotion_fraction' of the configurations evaluated at the current fidelity
+#   - promoted anyway while there are less than 1 / promotion_fraction configurations evaluated at the current fidelity
+
+# RESULT: True (promoted) or False
+# -----------------------------------------------------------------------------
+
+def promote_configuration(dirPlot, fidelity, avgfitness, promotion_fraction=1/3.0):
+    n_configurations, n_better = EcPp3_generalized_results_store.fidelity_rank(dirPlot+EcPp3_generalized_results_store.RESULTS_DATABASE, 
+                                                                               fidelity, avgfitness)
+    if n_configurations < 1/float(promotion_fraction):
+        return True
+    return n_better < promotion_fraction*n_configurations
+
+### FUNCTION promote_configuration  ###########################################
+###############################################################################
+
+
+
 ###############################################################################
 ### FUNCTION SelectConsortiumArchitecture ##############################################
 def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FVAMetNar, FVANar, 
                                  consortium_arch, initial_biomass,
                                  fitObj='MaxMetNar', maxCycles = 240, dirPlot='', repeat=5, sd_cutoff = 0.1,
-                                 models_summary=False):  # At the moment, fitObj and maxCycles have no real utility
+                                 models_summary=False, n_workers=1, comets_parameters=None, min_repeats=None, incumbent_fitness=None, plots='pdf', comets_runner='process', memoize=False, fidelity=1.0, fidelity_mode='horizon'):  # At the moment, fitObj has no real utility
   '''
   Call: avgFitness, sdFitness = SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, consortium_arch, initial_biomass, **args)
   Start with no more than 5 repeats (1st trial)
@@ -407,11 +695,29 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
       d. OTHER IMPORTANT PARAMETERS
       
           fitObj: fitness function to optimize. In the current example, 'MaxMetNar' - maximize metilated naringenin over GLOBAL biomass
-          maxCycles: cycles in COMETS run, stated in file 'layout_template'. It is not used in the Python scripts (wrapper, individualTest). 
-              If desired to change, see 'layout_template'.
+          maxCycles: cycles in COMETS run. It replaces the value stated in file 'layout_template' (240 in the wrapper and individualTest).
           dirPlot: copy of the plots with several run results.
           repeat: number of runs with the same configuration (COMETS, not number of SMAC iterations)
           sd_cutoff: default (0.1). If other value is desired, it should be specified in the wrapper*.py and individualTest*.py files
+          n_workers: number of COMETS repeats running in parallel, each one in its own scratch folder (default: 1, sequential repeats)
+              JVM heap and COMETS threads of every repeat come from the memory / core budget shared by the parallel repeats
+              (see 'EcPp3_generalized_comets_supervisor.py'). Repeats killed by the supervisor (time or memory limit) are discarded
+          comets_parameters: other COMETS parameters to replace in file 'layout_template', i.e. {'timeStep': 0.1, 'numRunThreads': 1}
+          min_repeats: adaptive repeats. Minimum number of repeats before stopping in advance, as soon as the configuration is clearly
+              stable, unstable or hopeless (see 'adaptive_repeats_decision'). Default (None): always 'repeat' runs
+          incumbent_fitness: best fitness so far, for the adaptive repeats. Default (None): best average fitness in the results store (dirPlot)
+          plots: plot of every COMETS run. 'pdf' (default): rendered after the run, 'defer': plot data saved to render the PDF later, 
+              i.e. during SMAC runs, 'skip': no plot (see 'EcPp3_generalized_plot_COMETS.py')
+          comets_runner: 'process' (default): one JVM per COMETS run, 'batch': one JVM for several repeats (COMETS batch script,
+              'n_workers' JVMs at the same time), to save JVM startup. With adaptive repeats, the first batch has 'min_repeats' repeats
+              (see 'EcPp3_generalized_comets_supervisor.py')
+          memoize: evaluation cache (see 'configuration_key' in 'EcPp3_generalized_results_store.py'). If the same effective configuration
+              was already evaluated with at least 'repeat' repeats, its results are returned without running anything. If it was evaluated
+              with less repeats, only the missing repeats are run (top-up), and merged with the cached ones. Default (False): no cache
+          fidelity: multi-fidelity evaluation, fraction of the COMETS cycles ('maxCycles') actually run. Default (1.0): full fidelity.
+              Low fidelity evaluations (i.e. 0.25) are a cheap screening, stored in the results store with their fidelity
+              (see 'fidelity_parameters' and 'promote_configuration', and 'fidelities' in the wrapper)
+          fidelity_mode: 'horizon' (default): shortened simulation, 'timestep': same simulated time with a coarser time step
           
           
   OUTPUT: avgFitness: average fitness of 'repeat' COMETS runs with the same configuration (due to it is not deterministic)
@@ -420,7 +726,9 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
 
   # Current directory: temporal folder 'xxx_TestTempV0'
   temporal_folder = os.getcwd()
+  comets_parameters = dict(comets_parameters) if comets_parameters is not None else {}
   os.chdir("../EcPp3_TemplateOptimizeConsortiumV0")
+  layout_template = os.path.abspath(os.path.join("Comets", "EcPp3_layout_template2_"+consortium_arch+".txt"))
   
   # 1) COMPOSE STRAINS LIST
   # ===========================================================================
@@ -445,6 +753,34 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
       n_strains = len(strains_list)  # Number of strains in the current consortium
   
   
+  # MULTI-FIDELITY: COMETS cycles and time step of the current fidelity (see 'fidelity')
+  # ===========================================================================
+  if float(fidelity) < 1:
+      timeStep = float(comets_parameters.get("timeStep", EcPp3_generalized_layout_COMETS.load_layout_template(layout_template)["parameters"].get("timeStep", 0.1)))
+      maxCycles, timeStep = fidelity_parameters(fidelity, maxCycles, timeStep, fidelity_mode)
+      comets_parameters = dict(comets_parameters, timeStep=timeStep)
+      print("Fidelity "+str(fidelity)+" ("+fidelity_mode+"): "+str(maxCycles)+" cycles, time step "+str(timeStep))
+  
+  
+  # EVALUATION CACHE: effective configuration (canonical key) already evaluated in the results store (see 'memoize')
+  # ===========================================================================
+  settings = {"fitObj": fitObj, "maxCycles": maxCycles}  # Settings that change the result
+  settings.update({parameter: value for parameter, value in comets_parameters.items() if parameter != "numRunThreads"})
+  configuration = {"sucr1": sucr1, "frc2": frc2, "nh4_Ec": nh4_Ec, "nh4_KT": nh4_KT,
+                   "FVApCA": FVApCA, "FVAfru": FVAfru, "FVAMetNar": FVAMetNar, "FVANar": FVANar}  # Parameters optimized by SMAC, apart from the initial biomasses
+  config_key = EcPp3_generalized_results_store.configuration_key(consortium_arch, configuration, initial_biomass, n_strains, settings)
+  cached = EcPp3_generalized_results_store.cached_evaluation(dirPlot+EcPp3_generalized_results_store.RESULTS_DATABASE, config_key) if memoize else None
+  
+  if cached is not None and cached["requested_repeats"] >= repeat:
+      os.chdir(temporal_folder)
+      print("Cached evaluation ("+str(len(cached["repeats"]))+" repeats): "+cached["base_config"])
+      return cached["avg_fitness"], cached["sd_fitness"], strains_list
+  
+  first_repeat = len(cached["repeats"]) if cached is not None else 0  # Top-up: repeats stored for a cached evaluation (adaptive repeats and discarded COMETS runs excluded)
+  if first_repeat:
+      print("Cached evaluation ("+str(len(cached["repeats"]))+" repeats): top-up to "+str(repeat)+" repeats")
+  
+  
 
   # 2) WHICH MODELS TO INITIALIZE (depending on the consortium architecture)
   # ===========================================================================
@@ -486,7 +822,19 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
                         variables.append(locals()[variable])
                     
                     models_summary = True if models_summary else False
-                    getattr(module, init_function_name)(*variables, temporal_folder=temporal_folder, models_summary=models_summary) 
+                    
+                    # Dependency-aware cache: outputs of the function cached by the values of its variables in 'initialize_variables.txt' only
+                    # (see 'EcPp3_generalized_model_cache.py'). Not used for the models summary
+                    init_function = getattr(module, init_function_name)
+                    init_key = EcPp3_generalized_model_cache.init_function_key(init_function, list(zip(function_variables[init_function_name], variables)))
+                    if not models_summary and EcPp3_generalized_model_cache.get_cached_init(init_key, temporal_folder):
+                        print("Model "+init_function_name+" from the cache ("+", ".join(function_variables[init_function_name])+")")
+                        continue
+                    
+                    previous_state = EcPp3_generalized_model_cache.folder_state(temporal_folder)
+                    init_function(*variables, temporal_folder=temporal_folder, models_summary=models_summary)
+                    if not models_summary:
+                        EcPp3_generalized_model_cache.store_cached_init(init_key, temporal_folder, previous_state)
  
 
 
@@ -502,15 +850,20 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
   os.chdir(temporal_folder)
   # DIR: XXX_TestTempV0
 
-  # Set initial biomass for all microbes
-  # [shell script] Write automatically the COMETS parameters about initial biomass of strains
+  # Set initial biomass for all microbes and COMETS parameters
+  # [Python] Render the COMETS layout from the layout template (see 'EcPp3_generalized_layout_COMETS.py')
   # ---------------------------------------------------------------------------
   # The codification of biomasses in layout file should be a string of 5 equal figures, 
   # depending on the number of strains in the consortium: 11111, 22222, 33333, etc.
   # ---------------------------------------------------------------------------
   
-  for i in range(len(initial_biomass)):
-      massedit.edit_files(['EcPp3_layout_template2_'+consortium_arch+'.txt'],["re.sub(r'"+str(i+1)*5+"','"+str(initial_biomass[i])+"',line)"], dry_run=False)
+  parallel_repeats = n_workers > 1 and repeat > 1
+  comets_jobs = n_workers if parallel_repeats else 1  # COMETS runs at the same time, sharing the memory / core budget
+  layout_parameters = {"maxCycles": maxCycles, "numRunThreads": EcPp3_generalized_comets_supervisor.comets_budget(comets_jobs)["numRunThreads"]}
+  layout_parameters.update(comets_parameters)
+  layout = EcPp3_generalized_layout_COMETS.load_layout_template(layout_template)
+  EcPp3_generalized_layout_COMETS.render_layout(layout, 'EcPp3_layout_template2_'+consortium_arch+'.txt', initial_biomass, parameters=layout_parameters)
+  timeStep = float(layout_parameters.get("timeStep", layout["parameters"].get("timeStep", 0.1)))  # Time (h) per cycle, for the plots
  
     
   # RUN COMETS
@@ -525,107 +878,111 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
   sum_Nar=0  # Naringenin quantity variable (production by P.putida KT)
   sum_MetNar=0  # Metilated naringenin quantity variable (production by E.coli W, metilator strain)
   fitnessList=[]  # List with the different values for 'totfitness' in every execution ('n' repeats)
+  repeat_results=[]  # Per-repeat results, for the results store
+  failed_repeats=0  # COMETS runs discarded (see 'EcPp3_generalized_comets_supervisor.py')
+  
+  if cached is not None:  # Top-up: results of the repeats already run, from the evaluation cache
+      repeat_results = list(cached["repeats"])
+      fitnessList = [repeat_result["fitness"] for repeat_result in repeat_results]
+      totfitness = sum(fitnessList)
+      if all(repeat_result["products"] for repeat_result in repeat_results):  # Exact totals of every repeat
+          sum_Nar = sum(repeat_result["products"]["Nar"] for repeat_result in repeat_results)
+          sum_MetNar = sum(repeat_result["products"]["MetNar"] for repeat_result in repeat_results)
+      else:  # Repeats stored without products: averages in the legacy fields (rounded)
+          sum_Nar = float(cached["fields"]["Nar_mM"])*len(fitnessList)
+          sum_MetNar = float(cached["fields"]["MetNar_mM"])*len(fitnessList)
+  n_cached = len(fitnessList)
   suffix = "template2"  # Variable to be modified depending on the names of COMETS files
   
-  # DIR: XXX_TestTempV0
-  for i in range(repeat):
+  # String of initial biomasses for base configuration (baseConfig)
+  initial_biomass_string = ""
+  for init_biomass in initial_biomass:
+      initial_biomass_string += ","+str(init_biomass) if initial_biomass_string else str(init_biomass)
+      
+  baseConfig=str(sucr1)+','+str(frc2)+','+str(nh4_Ec)+','+str(nh4_KT)+','+str(consortium_arch)+','+initial_biomass_string
+  
+  
+  # ADAPTIVE REPEATS: from 'min_repeats' on, the repeats are stopped as soon as the configuration
+  # is clearly stable, unstable or hopeless (see 'adaptive_repeats_decision')
+  # ---------------------------------------------------------------------------
+  adaptive_repeats = min_repeats is not None and min_repeats < repeat
+  if adaptive_repeats and incumbent_fitness is None:
+      incumbent_fitness = EcPp3_generalized_results_store.best_fitness(dirPlot+EcPp3_generalized_results_store.RESULTS_DATABASE, fidelity)
+  
+  
+  # PARALLEL REPEATS: every repeat runs in its own scratch folder, on a process pool.
+  # Results are merged in the original order of the repeats (those not started yet are cancelled after an early stop).
+  # 'batch' COMETS runner: every repeat in its own scratch folder too, COMETS runs in batches (see 'comets_runner')
+  # ---------------------------------------------------------------------------
+  batch_runner = comets_runner == 'batch'
+  comets_runs = {}  # Results of the COMETS runs already done in batches, by repeat
+  # Scratch folders and process pool are removed on any exit of the repeats (see 'finally' below)
+  run_folders = [temporal_folder+"_run"+str(i+1) for i in range(repeat)] if parallel_repeats or batch_runner else []
+  executor = None
+  try:
+    for run_folder in run_folders[first_repeat:]:  # Only the repeats to run
+        create_run_folder(temporal_folder, run_folder)
+    
+    if parallel_repeats and not batch_runner:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=n_workers)
+        futures = {i: executor.submit(COMETS_repeat, run_folders[i], consortium_arch, baseConfig, strains_list, strains_string, 
+                                        nutrients_dictionary, maxCycles, plots, timeStep, comets_jobs) for i in range(first_repeat, repeat)}
+    
+    # DIR: XXX_TestTempV0
+    for i in range(first_repeat, repeat):
         
         # --------------------------------------------------------------------------
-        # RUNNING COMETS + [R call] Run script to generate one graph:subprocess.call
-        # DIR: XXX_TestTempV0
+        # RUNNING COMETS (see 'COMETS_repeat' function)
+        # DIR: XXX_TestTempV0 (sequential repeats) or XXX_TestTempV0_run<i> (parallel repeats or 'batch' COMETS runner)
         # --------------------------------------------------------------------------
-        with open("output.txt", "w") as f:
-            subprocess.run(args=['./comets_scr', 'comets_script_template'+consortium_arch], stdout=f, stderr=subprocess.STDOUT)
-            
-        n_metabolites = len(nutrients_dictionary)  # Number of metabolites to track
-        n_columns_without_biomass = n_metabolites + 1  # Column of cycle_number in the COMETS output file
+        if batch_runner:
+            run_folder = run_folders[i]
+            if i not in comets_runs:  # Next batch of repeats: the first 'min_repeats' (adaptive repeats), or all the remaining ones
+                batch_repeats = list(range(i, min_repeats if adaptive_repeats and i < min_repeats else repeat))
+                batch_results = EcPp3_generalized_comets_supervisor.run_comets_batches([run_folders[n_repeat] for n_repeat in batch_repeats], 
+                                                                                       'EcPp3_layout_template2_'+consortium_arch+'.txt', n_batches=comets_jobs)
+                comets_runs.update(zip(batch_repeats, batch_results))
+            run_results = COMETS_repeat(run_folder, consortium_arch, baseConfig, strains_list, strains_string, 
+                                        nutrients_dictionary, maxCycles, plots, timeStep, comets_jobs, comets_runs[i])
+        elif parallel_repeats:
+            run_folder = run_folders[i]
+            run_results = futures[i].result()
+        else:
+            run_folder = temporal_folder
+            run_results = COMETS_repeat(run_folder, consortium_arch, baseConfig, strains_list, strains_string, 
+                                        nutrients_dictionary, maxCycles, plots, timeStep, comets_jobs)
         
-        # String of initial biomasses for base configuration (baseConfig)
-        initial_biomass_string = ""
-        for init_biomass in initial_biomass:
-            initial_biomass_string += ","+str(init_biomass) if initial_biomass_string else str(init_biomass)
-            
-        baseConfig=str(sucr1)+','+str(frc2)+','+str(nh4_Ec)+','+str(nh4_KT)+','+str(consortium_arch)+','+initial_biomass_string
-        
-        # Line to plot COMETS output 
-        # 6 colours are given since O2 is not represented (i.e. we do not need 7 colours, just 6)
-        subprocess.run(['../../Scripts/plot_biomassX2_vs_4mediaItem_generalized.sh template2 sucr 2saku fru nar nh4 pi o2 '+str(maxCycles)+' '+baseConfig+' blue black darkmagenta yellow orange aquamarine '+strains_string], shell=True)
-            
-        # ---------------------------------------------------------------------
-        # INDEX REFERENCES IN COMETS FILE (organized in columns)
-        # ---------------------------------------------------------------------
-        # sucr  2saku  fru  nar  nh4  pi  o2  cycle_number  Biomass1  Biomass2  Biomass3  [...]
-        # 0     1      2    3    4    5   6   7             8         9         10        11
-        # ---------------------------------------------------------------------
+        # COMETS run killed by the supervisor (time or memory limit) or failed: repeat discarded
+        if run_results["outcome"] != "OK":
+            comets_run = run_results["comets_run"]
+            print("\nExecution: "+str(i+1)+" of "+str(repeat)+". COMETS run discarded: "+comets_run["outcome"]+" (exit status: "+str(comets_run["returncode"])+
+                  ", "+str(round(comets_run["elapsed"]))+" s, "+str(round(comets_run["max_rss_mb"]))+" MB)")
+            failed_repeats += 1
+            continue
         
-        
-        # ---------------------------------------------------------------------
-        # COMPUTE METRICS FROM COMETS
-        # DIR: XXX_TestTempV0
-        # ---------------------------------------------------------------------
-        
-        # (0) BIOMASS EVOLUTION
-        #######################
-        biomass_indexes = []
-        for n_strain in range(n_strains):
-            # Indexes for 'biomass_evolution_during_simulation' function
-            biomass_indexes.append(n_columns_without_biomass + n_strain)
-                
-        CometsTable = pd.read_csv("COMETS_"+baseConfig+"_"+suffix+".txt", sep="\t", header=None)
-        biomass_track, dead_process, initLine, finalLine = biomass_evolution_during_simulation(CometsTable, n_cycles = 10, min_biomass_loss_required= (1e-4), biomass_indexes = biomass_indexes)
-        nutrient_endcycle_dict = nutrient_evolution_during_simulation(CometsTable, nutrient_indexes_dict=nutrients_dictionary, 
-                                                                      endCycle_index=n_metabolites, minimal_substrate_conc=0.001, minimal_product_conc=1.0)
-        
-        # (1) INITIAL BIOMASS
-        #####################
-        init_biomass = 0
-        init_biomasses_dict = {}
-        
-        for n_strain in range(n_strains):
-            # Initial biomass value for each microbe (individually)
-            init_biomasses_dict[strains_list[n_strain]] = float(initLine[n_columns_without_biomass + n_strain])
-            # (Global) initial biomass
-            init_biomass += float(initLine[n_columns_without_biomass + n_strain])
-        
-        
-        # (2) FINAL CONCENTRATIONS: pCA, Nar, limiting nutrients
-        ##########################
-        sucrConc=float(finalLine[0])  # Final sucrose
-        NH4conc=float(finalLine[4])  # Final NH4 (first limiting nutrient)
-        tot_MetNar=float(finalLine[1])  # Final metilated naringenin
-        tot_Nar=float(finalLine[3])  # Final Naringenin
-        Final_pi=float(finalLine[5])  # Second limiting nutrient
-        Final_O2=round(float(finalLine[6]), 4)  # Final O2
-        finalCycle=int(finalLine[7])  # Final Cycle
-        
-        
-        # (3) FINAL BIOMASS
-        ###################
-        total_final_biomass = 0
-        final_biomasses_dict = {}
-        
-        for n_strain in range(n_strains):
-            # Final biomass value for each microbe (individually)
-            final_biomasses_dict[strains_list[n_strain]] = float(finalLine[n_columns_without_biomass + n_strain])
-            # (Global) final biomass 
-            total_final_biomass += float(finalLine[n_columns_without_biomass + n_strain])
-            
-            
-        # (4) Pi OVERCONSUMPTION TRACKING (currently disabled)
-        ######################################################
-        # pi_overconsumption, pi_cycles = metabolite_tracking_overconsumption("COMETS_"+baseConfig+"_"+suffix+".txt", 10.0, 9)
-        
-        # (5) COMPUTE FITNESS: maximize metilated naringenin
-        ####################################################
-        # if fitObj == "MaxMetNar":
-        fitFunc = tot_MetNar / (total_final_biomass)  # Final metilated naringenin yield over GLOBAL biomass (all microorganisms in the consortium)
-        # POTENTIAL REDEFINITION OF FITNESS
-        fitness=fitFunc
+        fitness = run_results["fitness"]
+        finalCycle = run_results["finalCycle"]
+        tot_Nar = run_results["tot_Nar"]
+        tot_MetNar = run_results["tot_MetNar"]
+        sucrConc = run_results["sucrConc"]
+        NH4conc = run_results["NH4conc"]
+        Final_pi = run_results["Final_pi"]
+        Final_O2 = run_results["Final_O2"]
+        biomass_track = run_results["biomass_track"]
+        dead_process = run_results["dead_process"]
+        init_biomass = run_results["init_biomass"]
+        init_biomasses_dict = run_results["init_biomasses_dict"]
+        total_final_biomass = run_results["total_final_biomass"]
+        final_biomasses_dict = run_results["final_biomasses_dict"]
+        nutrient_endcycle_dict = run_results["nutrient_endcycle_dict"]
         
         # (6) UPDATE REPEATS
         ####################
         totfitness += fitness  # 'n' repeats
         fitnessList.append(fitness)  # List with fitness values in 'n' repeats
+        repeat_results.append({"fitness": fitness, "final_cycle": finalCycle, "biomass_track": biomass_track, "dead_cycles": dead_process,
+                               "products": {"Nar": float(tot_Nar), "MetNar": float(tot_MetNar)}})
+        n_run = len(repeat_results)  # Number of the repeat among the stored ones (plots, logs and flux archive), not the loop index
         sum_Nar += tot_Nar  # Total naringenin for 'n' repeats
         sum_MetNar += tot_MetNar  # Total glycosilated naringenin for 'n' repeats
         
@@ -646,27 +1003,55 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
         # DIR: XXX_TestTempV0
         # ---------------------------------------------------------------------
         # Copy individual solution
-        file='IndividualRunsResults/'+baseConfig+"_run"+str(i+1)+'_'+str(fitness)+'_'+str(finalCycle)+'.pdf'
-        shutil.move(baseConfig+"_"+suffix+"_plot.pdf", file)        
-        if(dirPlot != ''):
-            file2=dirPlot+baseConfig+'_run'+str(i+1)+'_'+str(fitness)+'_'+str(finalCycle)+'.pdf'
-            shutil.move(file,file2)
+        # Plot (.pdf) or plot data for a deferred plot (.npz), see 'plots'
+        plot_extension = '.pdf' if plots == 'pdf' else EcPp3_generalized_plot_COMETS.PLOT_DATA_SUFFIX
+        if plots != 'skip':
+            file='IndividualRunsResults/'+baseConfig+"_run"+str(n_run)+'_'+str(fitness)+'_'+str(finalCycle)+plot_extension
+            shutil.move(os.path.join(run_folder, baseConfig+"_"+suffix+"_plot"+plot_extension), file)        
+            if(dirPlot != ''):
+                file2=dirPlot+baseConfig+'_run'+str(n_run)+'_'+str(fitness)+'_'+str(finalCycle)+plot_extension
+                shutil.move(file,file2)
             
-        file='IndividualRunsResults/'+'total_biomass_log_run'+str(i+1)+'.txt'
-        shutil.move('total_biomass_log_'+suffix+'.txt',file)
-        file='IndividualRunsResults/'+'media_log_run'+str(i+1)+'.txt'
-        shutil.move('media_log_'+suffix+'.txt',file)
-        file='IndividualRunsResults/'+'flux_log_run'+str(i+1)+'.txt'
-        shutil.move('flux_log_'+suffix+'.txt',file)   
+        file='IndividualRunsResults/'+'total_biomass_log_run'+str(n_run)+'.txt'
+        shutil.move(os.path.join(run_folder, 'total_biomass_log_'+suffix+'.txt'),file)
+        file='IndividualRunsResults/'+'media_log_run'+str(n_run)+'.txt'
+        shutil.move(os.path.join(run_folder, 'media_log_'+suffix+'.txt'),file)
+        
+        # Flux log archive (compressed, columnar), keyed by baseConfig and repeat: FLYCOP_FLUX_ARCHIVE=0 (environment variable) to disable it
+        if os.environ.get("FLYCOP_FLUX_ARCHIVE", "1") == "1":
+            model_files = EcPp3_generalized_layout_COMETS.parse_layout(os.path.join(run_folder, 'EcPp3_layout_template2_'+consortium_arch+'.txt'))["model_file"]
+            EcPp3_generalized_flux_archive.archive_flux_log(os.path.join(run_folder, 'flux_log_'+suffix+'.txt'),
+                                                            (dirPlot if dirPlot != '' else 'IndividualRunsResults/')+EcPp3_generalized_flux_archive.ARCHIVE_FOLDER,
+                                                            baseConfig, n_run, [os.path.join(run_folder, model_file) for model_file in model_files])
+        file='IndividualRunsResults/'+'flux_log_run'+str(n_run)+'.txt'
+        shutil.move(os.path.join(run_folder, 'flux_log_'+suffix+'.txt'),file)   
         # ---------------------------------------------------------------------
+        
+        # (7) ADAPTIVE REPEATS: stop in advance
+        #######################################
+        if adaptive_repeats and i+1 >= min_repeats and i+1 < repeat:
+            repeats_decision = adaptive_repeats_decision(fitnessList, sd_cutoff, incumbent_fitness)
+            if repeats_decision is not None:
+                print("\nAdaptive repeats: "+repeats_decision+" configuration after "+str(i+1)+" of "+str(repeat)+" repeats")
+                break
        
+  finally:
+      # Remove scratch folders of parallel repeats ('batch' COMETS runner too), also after an error
+      if executor is not None:
+          executor.shutdown(wait=True, cancel_futures=True)
+      for run_folder in run_folders[first_repeat:]:
+          shutil.rmtree(run_folder, ignore_errors=True)
         
   # END OF 5 REPEATS
   # ---------------------------------------------------------------------------
   # MEAN & SD COMPUTATION for all (n = 5) repeats
   # ---------------------------------------------------------------------------
-  avgfitness=totfitness/repeat  # 'totfitness' average in 'n' repeats
-  if(repeat>1):
+  n_repeats = len(fitnessList)  # 'n' repeats run (less than 'repeat' if the adaptive repeats stopped in advance or COMETS runs were discarded)
+  if n_repeats == n_cached:
+      print("ERROR! No COMETS run completed for configuration "+baseConfig+" ("+str(failed_repeats)+" discarded)")
+      raise RuntimeError("COMETS runs not completed: "+baseConfig)
+  avgfitness=totfitness/n_repeats  # 'totfitness' average in 'n' repeats
+  if(n_repeats>1):
       sdfitness=statistics.stdev(fitnessList)  # standard deviations for 'n' values
   else:
       sdfitness=0.0
@@ -677,81 +1062,42 @@ def SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FV
   else: ID_SD = 0
   # -------------------------------------------------------------------
   
-  avgNar = sum_Nar/repeat  # Average naringenin (5 repeats)
-  avgMetNar = sum_MetNar/repeat  # Average metilated naringenin (5 repeats)
+  avgNar = sum_Nar/n_repeats  # Average naringenin (5 repeats)
+  avgMetNar = sum_MetNar/n_repeats  # Average metilated naringenin (5 repeats)
   # ---------------------------------------------------------------------------
   
 
   # ---------------------------------------------------------------------------
-  # SAVE RESULTS in TABLE: 'configurationsResults(...).txt' file
+  # SAVE RESULTS in the RESULTS STORE: 'configurationsResults.sqlite' (see 'EcPp3_generalized_results_store.py')
+  # and export of the legacy TABLE: 'configurationsResults(...).txt' file
   # DIR: XXX_TestTempV0
   # ---------------------------------------------------------------------------
   
-  if not os.path.isfile(dirPlot+"configurationsResults-"+consortium_arch+".txt"):  # CREATE FILE
+  # INFORMATION LINE: (header, value) for every field in the legacy table
+  results_fields = [("FitObjective", fitObj), ("BaseConfig", baseConfig), ("sucr_upt", str(sucr1)), ("frc_upt", str(frc2)), 
+                    ("nh4_Ec", str(nh4_Ec)), ("nh4_KT", str(nh4_KT)), ("Consortium_Arch", str(consortium_arch))]
+  results_fields += [("FVApCA", str(FVApCA)), ("FVAfru", str(FVAfru)), ("FVAMetNar", str(FVAMetNar)), ("FVANar", str(FVANar))]
   
-      myfile = open(dirPlot+"configurationsResults-"+consortium_arch+".txt", "w")
-      
-      # HEADER
-      myfile.write("FitObjective\tBaseConfig\tsucr_upt\tfrc_upt\tnh4_Ec\tnh4_KT\tConsortium_Arch\t")
-      myfile.write("FVApCA\tFVAfru\tFVAMetNar\tFVANar\t")
-      
-      myfile.write("global_init_biomass\t")
-      for strain_key in init_biomasses_dict.keys():
-          myfile.write("init_"+strain_key+"\t") 
-          
-      myfile.write("global_final_biomass\t")
-      for strain_key in final_biomasses_dict.keys():
-          myfile.write("final_"+strain_key+"\t")  
-      
-      for key in nutrient_endcycle_dict.keys(): myfile.write(key+"cycle\t")
-      
-      myfile.write("fitFunc\tSD\tID_SD\tMetNar_mM\tNar_mM\t")
-      myfile.write("endCycle\tNH4_mM\tpi_mM\tBiomassLoss\tDT_cycles\tFinalSucr_mM\tFinalO2_mM\n")  
-      
-      
-      # INFORMATION LINE
-      myfile.write(fitObj+"\t"+baseConfig+"\t"+str(sucr1)+"\t"+str(frc2)+"\t"+str(nh4_Ec)+"\t"+str(nh4_KT)+"\t"+str(consortium_arch)+"\t")
-      myfile.write(str(FVApCA)+"\t"+str(FVAfru)+"\t"+str(FVAMetNar)+"\t"+str(FVANar)+"\t")
-        
-      myfile.write(str(init_biomass)+"\t")
-      for strain_key in init_biomasses_dict.keys():
-          myfile.write(str(init_biomasses_dict[strain_key])+"\t")
-                   
-      myfile.write(str(total_final_biomass)+"\t")
-      for strain_key in final_biomasses_dict.keys():
-          myfile.write(str(final_biomasses_dict[strain_key])+"\t")
-          
-      for key in nutrient_endcycle_dict.keys(): myfile.write(str(nutrient_endcycle_dict[key])+"\t")
-                   
-      myfile.write(str(round(avgfitness, 6))+"\t"+str(round(sdfitness, 6))+"\t"+str(ID_SD)+"\t"+str(round(avgMetNar, 6))+"\t"+str(round(avgNar, 6))+"\t")
-      myfile.write(str(finalCycle)+"\t"+str(round(NH4conc, 4))+"\t"+str(round(Final_pi, 4))+"\t"+str(biomass_track)+"\t")
-      myfile.write(str(dead_process)+"\t"+str(round(sucrConc, 4))+"\t"+str(Final_O2)+"\n")
-                   
-      myfile.close()
-      
+  results_fields.append(("global_init_biomass", str(init_biomass)))
+  for strain_key in init_biomasses_dict.keys():
+      results_fields.append(("init_"+strain_key, str(init_biomasses_dict[strain_key])))
       
-  else:  # APPEND TO THE EXISTING FILE
-      myfile = open(dirPlot+"configurationsResults-"+consortium_arch+".txt", "a")
+  results_fields.append(("global_final_biomass", str(total_final_biomass)))
+  for strain_key in final_biomasses_dict.keys():
+      results_fields.append(("final_"+strain_key, str(final_biomasses_dict[strain_key])))
       
-      # INFORMATION LINE
-      myfile.write(fitObj+"\t"+baseConfig+"\t"+str(sucr1)+"\t"+str(frc2)+"\t"+str(nh4_Ec)+"\t"+str(nh4_KT)+"\t"+str(consortium_arch)+"\t")
-      myfile.write(str(FVApCA)+"\t"+str(FVAfru)+"\t"+str(FVAMetNar)+"\t"+str(FVANar)+"\t")
-      
-      myfile.write(str(init_biomass)+"\t")
-      for strain_key in init_biomasses_dict.keys():
-          myfile.write(str(init_biomasses_dict[strain_key])+"\t")
-                   
-      myfile.write(str(total_final_biomass)+"\t")
-      for strain_key in final_biomasses_dict.keys():
-          myfile.write(str(final_biomasses_dict[strain_key])+"\t")
-      
-      for key in nutrient_endcycle_dict.keys(): myfile.write(str(nutrient_endcycle_dict[key])+"\t")           
-      
-      myfile.write(str(round(avgfitness, 6))+"\t"+str(round(sdfitness, 6))+"\t"+str(ID_SD)+"\t"+str(round(avgMetNar, 6))+"\t"+str(round(avgNar, 6))+"\t")
-      myfile.write(str(finalCycle)+"\t"+str(round(NH4conc, 4))+"\t"+str(round(Final_pi, 4))+"\t"+str(biomass_track)+"\t")
-      myfile.write(str(dead_process)+"\t"+str(round(sucrConc, 4))+"\t"+str(Final_O2)+"\n")
-                   
-      myfile.close()
+  for key in nutrient_endcycle_dict.keys(): results_fields.append((key+"cycle", str(nutrient_endcycle_dict[key])))
+  
+  results_fields += [("fitFunc", str(round(avgfitness, 6))), ("SD", str(round(sdfitness, 6))), ("ID_SD", str(ID_SD)), 
+                     ("MetNar_mM", str(round(avgMetNar, 6))), ("Nar_mM", str(round(avgNar, 6)))]
+  results_fields += [("endCycle", str(finalCycle)), ("NH4_mM", str(round(NH4conc, 4))), ("pi_mM", str(round(Final_pi, 4))), ("BiomassLoss", str(biomass_track)), 
+                     ("DT_cycles", str(dead_process)), ("FinalSucr_mM", str(round(sucrConc, 4))), ("FinalO2_mM", str(Final_O2))]
+  
+  EcPp3_generalized_results_store.insert_configuration(dirPlot+EcPp3_generalized_results_store.RESULTS_DATABASE, consortium_arch, fitObj, baseConfig, 
+                                                       results_fields, avgfitness, sdfitness, ID_SD, repeat_results, 
+                                                       legacy_file=dirPlot+"configurationsResults-"+consortium_arch+".txt", 
+                                                       config_key=config_key, requested_repeats=repeat,
+                                                       fidelity=fidelity, max_cycles=maxCycles, time_step=timeStep)
       
       
   return avgfitness, sdfitness, strains_list
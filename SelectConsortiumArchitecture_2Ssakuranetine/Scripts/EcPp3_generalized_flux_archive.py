@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+FLUX ARCHIVE
+-------------------------------------------------------------------------------
+In the current script, the FLUX ARCHIVE is defined: the COMETS flux log of every repeat
+('flux_log_<suffix>.txt') is converted into a compressed, chunked, columnar file (float32),
+keyed by base configuration and repeat. Otherwise, flux logs are lost, since 'IndividualRunsResults'
+is part of the workspace of the configuration (removed after the evaluation).
+
+The archives are stored in 'FluxArchive' (within dirPlot, next to the results store), together with
+an index of the archives ('flux_archive.sqlite', WAL mode, see 'EcPp3_generalized_results_store.py').
+The time series of a single reaction can be read from an archive (memory-mapped) without loading
+(or decompressing) the whole flux log.
+
+Series of functions:
+
+    - "connect_flux_index" function: connection to the index of the archives (schema created if needed)
+    - "parse_flux_log" function: flux arrays (cycle x reaction) for every model in a COMETS flux log
+    - "comets_reaction_names" function: reaction names (REACTION_NAMES section) of a COMETS model file
+    - "write_flux_archive" function: archive file from the flux arrays
+    - "archive_flux_log" function: archive of a flux log, registered in the index
+    - "find_flux_archive" function: archive file for a given base configuration and repeat
+    - "export_flux_index" function: entries of the index of the archives (i.e. written by a remote worker of the work queue)
+    - "register_flux_archives" function: entries exported from another index, added to the index of 'archive_folder'
+    - "read_archive_header" function: header of an archive (models, cycles, reactions, chunks)
+    - "read_reaction" function: time series of a single reaction, from an archive
+
+
+-------------------------------------------------------------------------------
+ARCHIVE FILE ('<baseConfig hash>_run<repeat>.fluxarchive')
+-------------------------------------------------------------------------------
+
+    - MAGIC (8 bytes) + header length (uint64, little endian)
+    - HEADER (JSON): base_config, repeat, dtype, chunk_size and, for every model (order of 'model_file' in the layout):
+        model_file, cycles, reactions, chunks: [offset, compressed size, number of reactions], offsets from the data start
+    - DATA: chunks of 'chunk_size' reactions (zlib), float32 array (reaction x cycle), i.e. the
+      time series of every reaction is contiguous in its (decompressed) chunk
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import re
+import json
+import mmap
+import zlib
+import struct
+import sqlite3
+import hashlib
+import numpy as np
+# -----------------------------------------------------------------------------
+
+
+ARCHIVE_FOLDER = "FluxArchive"
+ARCHIVE_INDEX = "flux_archive.sqlite"
+ARCHIVE_SUFFIX = ".fluxarchive"
+ARCHIVE_MAGIC = b"FLYCOPFX"
+ARCHIVE_VERSION = 1
+CHUNK_SIZE = 64  # Reactions per chunk
+COMPRESSION_LEVEL = 6
+
+FLUX_LINE = re.compile(r"fluxes\{(\d+)\}\{\d+\}\{\d+\}\{(\d+)\}\s*=\s*\[([^\]]*)\]")  # fluxes{cycle}{x}{y}{model} = [...];
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    base_config TEXT NOT NULL,
+    repeat INTEGER NOT NULL,
+    archive_file TEXT NOT NULL,
+    model_files TEXT,
+    n_cycles INTEGER,
+    created TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (base_config, repeat)
+);
+"""
+
+
+
+###############################################################################
+### FUNCTION connect_flux_index ###############################################
+
+# CONNECTION TO THE INDEX OF THE ARCHIVES (WAL mode, as the results store)
+# -----------------------------------------------------------------------------
+
+def connect_flux_index(database, timeout=600):
+    connection = sqlite3.connect(database, timeout=timeout, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+### end-function-connect_flux_index
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION parse_flux_log ###################################################
+
+# FLUX ARRAYS FROM A COMETS FLUX LOG (MATLAB format), in a single pass over the file
+# RESULT: dictionary, model number (1-based, as in the flux log) : (cycles, fluxes array (cycle x reaction), float32)
+# Grid of 1x1 in the COMETS layouts: if there were several cells, the last one in every cycle is kept.
+# -----------------------------------------------------------------------------
+
+def parse_flux_log(flux_log):
+    cycles = {}
+    fluxes = {}
+
+    with open(flux_log, "r") as flux_file:
+        for line in flux_file:
+            flux_line = FLUX_LINE.match(line)
+            if flux_line is None:
+                continue
+
+            cycle = int(flux_line.group(1))
+            n_model = int(flux_line.group(2))
+            values = np.array(flux_line.group(3).split(), dtype=np.float32)
+
+            if n_model not in cycles:
+                cycles[n_model] = []
+                fluxes[n_model] = []
+            if cycles[n_model] and cycles[n_model][-1] == cycle:
+                fluxes[n_model][-1] = values
+            else:
+                cycles[n_model].append(cycle)
+                fluxes[n_model].append(values)
+
+    return {n_model: (np.array(cycles[n_model], dtype=np.int32), np.vstack(fluxes[n_model])) for n_model in sorted(cycles)}
+
+### end-function-parse_flux_log
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION comets_reaction_names ############################################
+
+# REACTION NAMES OF A COMETS MODEL FILE (REACTION_NAMES section), in the order of the fluxes in the flux log
+# -----------------------------------------------------------------------------
+
+def comets_reaction_names(comets_model_file):
+    reactions = []
+    with open(comets_model_file, "r") as comets_file:
+        section = False
+        for line in comets_file:
+            if not section:
+                section = line.strip() == "REACTION_NAMES"
+            elif line.strip() == "//":
+                break
+            else:
+                reactions.append(line.strip())
+
+    return reactions
+
+### end-function-comets_reaction_names
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION write_flux_archive ###############################################
+
+# ARCHIVE FILE FROM THE FLUX ARRAYS (see 'parse_flux_log'), written to a temporary file and then renamed
+# model_reactions: list of (model_file, reaction names), in the order of the models in the flux log
+# -----------------------------------------------------------------------------
+
+def write_flux_archive(archive_file, model_fluxes, model_reactions, base_config, repeat, chunk_size=CHUNK_SIZE):
+    header = {"version": ARCHIVE_VERSION, "base_config": base_config, "repeat": repeat,
+              "dtype": "float32", "chunk_size": chunk_size, "models": []}
+    chunks = []
+    offset = 0
+
+    for n_model, (cycles, fluxes) in model_fluxes.items():
+        model_file, reactions = model_reactions[n_model-1] if n_model <= len(model_reactions) else ("", [])
+        if len(reactions) != fluxes.shape[1]:
+            print("WARNING! Reaction names of model "+str(n_model)+" ("+model_file+") do not match the flux log. Reaction indexes (1-based) are used instead")
+            reactions = [str(n_reaction+1) for n_reaction in range(fluxes.shape[1])]
+
+        model_chunks = []
+        series = np.ascontiguousarray(fluxes.T)  # Reaction x cycle: every time series is contiguous
+        for first in range(0, series.shape[0], chunk_size):
+            chunk = zlib.compress(series[first:first+chunk_size].tobytes(), COMPRESSION_LEVEL)
+            model_chunks.append([offset, len(chunk), min(chunk_size, series.shape[0]-first)])
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        header["models"].append({"model": n_model, "model_file": model_file, "cycles": cycles.tolist(),
+                                 "reactions": reactions, "chunks": model_chunks})
+
+    header = json.dumps(header).encode()
+    tmp_file = archive_file+".tmp"+str(os.getpid())
+    with open(tmp_file, "wb") as archive:
+        archive.write(ARCHIVE_MAGIC+struct.pack("<Q", len(header)))
+        archive.write(header)
+        for chunk in chunks:
+            archive.write(chunk)
+    os.replace(tmp_file, archive_file)
+
+### end-function-write_flux_archive
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION archive_flux_log #################################################
+
+# ARCHIVE OF A COMETS FLUX LOG, registered in the index (it replaces a previous archive of the same key)
+# archive_folder: i.e. dirPlot+'FluxArchive'
+# model_files: COMETS model files, in the order of 'model_file' in the layout (reaction names)
+
+# RESULT: archive file
+# -----------------------------------------------------------------------------
+
+def archive_flux_log(flux_log, archive_folder, base_config, repeat, model_files):
+    if not os.path.exists(archive_folder):
+        os.makedirs(archive_folder, exist_ok=True)
+
+    model_fluxes = parse_flux_log(flux_log)
+    model_reactions = [(os.path.basename(model_file), comets_reaction_names(model_file) if os.path.isfile(model_file) else [])
+                       for model_file in model_files]
+
+    archive_name = hashlib.sha1(base_config.encode()).hexdigest()[:16]+"_run"+str(repeat)+ARCHIVE_SUFFIX
+    write_flux_archive(os.path.join(archive_folder, archive_name), model_fluxes, model_reactions, base_config, repeat)
+
+    n_cycles = max([len(cycles) for cycles, fluxes in model_fluxes.values()]) if model_fluxes else 0
+    connection = connect_flux_index(os.path.join(archive_folder, ARCHIVE_INDEX))
+    try:
+        connection.execute("INSERT OR REPLACE INTO archives (base_config, repeat, archive_file, model_files, n_cycles) VALUES (?, ?, ?, ?, ?)",
+                           (base_config, int(repeat), archive_name, " ".join([model_file for model_file, reactions in model_reactions]), n_cycles))
+    finally:
+        connection.close()
+
+    return os.path.join(archive_folder, archive_name)
+
+### end-function-archive_flux_log
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION find_flux_archive ################################################
+
+# ARCHIVE FILE FOR A GIVEN BASE CONFIGURATION AND REPEAT (index of the archives)
+# RESULT: archive file, or None if the flux log of that repeat was not archived
+# -----------------------------------------------------------------------------
+
+def find_flux_archive(archive_folder, base_config, repeat):
+    database = os.path.join(archive_folder, ARCHIVE_INDEX)
+    if not os.path.isfile(database):
+        return None
+
+    connection = connect_flux_index(database)
+    try:
+        row = connection.execute("SELECT archive_file FROM archives WHERE base_config = ? AND repeat = ?", (base_config, int(repeat))).fetchone()
+    finally:
+        connection.close()
+
+    return os.path.join(archive_folder, row[0]) if row else None
+
+### end-function-find_flux_archive
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION export_flux_index ################################################
+
+# ENTRIES OF THE INDEX OF THE ARCHIVES in 'archive_folder'
+# RESULT: list of [base_config, repeat, archive_file, model_files, n_cycles] (JSON)
+# -----------------------------------------------------------------------------
+
+def export_flux_index(archive_folder):
+    database = os.path.join(archive_folder, ARCHIVE_INDEX)
+    if not os.path.isfile(database):
+        return []
+
+    connection = connect_flux_index(database)
+    try:
+        entries = connection.execute("SELECT base_config, repeat, archive_file, model_files, n_cycles FROM archives").fetchall()
+    finally:
+        connection.close()
+
+    return [list(entry) for entry in entries]
+
+### end-function-export_flux_index
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION register_flux_archives ###########################################
+
+# ENTRIES EXPORTED FROM ANOTHER INDEX (see 'export_flux_index'), added to the index of 'archive_folder'
+# The archive files must already be in 'archive_folder'.
+# -----------------------------------------------------------------------------
+
+def register_flux_archives(archive_folder, entries):
+    if not entries:
+        return
+    if not os.path.exists(archive_folder):
+        os.makedirs(archive_folder, exist_ok=True)
+
+    connection = connect_flux_index(os.path.join(archive_folder, ARCHIVE_INDEX))
+    try:
+        connection.executemany("INSERT OR REPLACE INTO archives (base_config, repeat, archive_file, model_files, n_cycles) VALUES (?, ?, ?, ?, ?)",
+                               [tuple(entry) for entry in entries])
+    finally:
+        connection.close()
+
+### end-function-register_flux_archives
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION read_archive_header ##############################################
+
+# HEADER OF AN ARCHIVE (dictionary, see SCRIPT DESCRIPTION) and start of the data (bytes)
+# archive: memory-mapped archive file
+# -----------------------------------------------------------------------------
+
+def read_archive_header(archive):
+    if archive[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+        print("ERROR! Not a flux archive")
+        raise ValueError("Not a flux archive")
+
+    header_start = len(ARCHIVE_MAGIC)+8
+    header_length = struct.unpack("<Q", archive[len(ARCHIVE_MAGIC):header_start])[0]
+    header = json.loads(archive[header_start:header_start+header_length].decode())
+
+    return header, header_start+header_length
+
+### end-function-read_archive_header
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION read_reaction ####################################################
+
+# TIME SERIES OF A SINGLE REACTION: only the chunk with the reaction is decompressed
+# model: model number (1-based) or model file (i.e. 'iJN1463_naringeninB12_tmp.mat.txt')
+
+# RESULT: (cycles, fluxes of the reaction), arrays
+# -----------------------------------------------------------------------------
+
+def read_reaction(archive_file, model, reaction):
+    with open(archive_file, "rb") as archive_handle:
+        archive = mmap.mmap(archive_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header, data_start = read_archive_header(archive)
+
+            model_header = [model_header for model_header in header["models"] if model in (model_header["model"], model_header["model_file"])]
+            if not model_header or reaction not in model_header[0]["reactions"]:
+                print("ERROR! Reaction "+str(reaction)+" of model "+str(model)+" is not in the flux archive "+archive_file)
+                raise KeyError(reaction)
+            model_header = model_header[0]
+
+            n_reaction = model_header["reactions"].index(reaction)
+            offset, size, n_columns = model_header["chunks"][n_reaction // header["chunk_size"]]
+            chunk = zlib.decompress(archive[data_start+offset:data_start+offset+size])
+        finally:
+            archive.close()
+
+    series = np.frombuffer(chunk, dtype=np.float32).reshape(n_columns, len(model_header["cycles"]))
+    return np.array(model_header["cycles"], dtype=np.int32), series[n_reaction % header["chunk_size"]].copy()
+
+### end-function-read_reaction
+###############################################################################
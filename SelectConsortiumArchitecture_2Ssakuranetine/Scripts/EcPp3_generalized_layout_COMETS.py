@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+COMETS LAYOUT
+-------------------------------------------------------------------------------
+In the current script, the COMETS layout template ('EcPp3_layout_template2_<consortium_arch>.txt')
+is parsed into a structured layout (dictionary), and the final layout for a given configuration
+is rendered from it in one write. This replaces the in-place edition of the layout file
+(massedit + re.sub, once per strain) for setting the initial biomasses.
+
+Series of functions:
+
+    - "parse_layout" function: structured layout from a COMETS layout file
+    - "load_layout_template" function: parsed layout template (parsed once per process)
+    - "render_layout" function: final COMETS layout file for a given configuration
+
+
+-------------------------------------------------------------------------------
+STRUCTURED LAYOUT (dictionary)
+-------------------------------------------------------------------------------
+
+    - model_file: list of COMETS model files ('*_tmp.mat.txt'), in the order of the strains
+    - world_media: ordered dictionary, metabolite : initial concentration (text, as in the template)
+    - initial_pop: list of lines in the 'initial_pop' block (list of fields in each line)
+    - parameters: ordered dictionary, parameter : value (text, as in the template)
+    - lines: original lines of the template, for the sections not parsed (model_world, media, ...)
+    - line_indexes: line index of every parsed item, to render it in its original position
+
+The initial biomass of every strain is coded in 'initial_pop' as a string of 5 equal figures,
+depending on the number of strains in the consortium: 11111, 22222, 33333, etc.
+A template rendered without changes is byte-identical to the original file.
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import collections
+# -----------------------------------------------------------------------------
+
+
+layout_templates = {}  # Layout templates already parsed in the current process: (path, mtime, size) : layout
+
+
+
+###############################################################################
+### FUNCTION parse_layout #####################################################
+
+# STRUCTURED LAYOUT FROM A COMETS LAYOUT FILE
+# -----------------------------------------------------------------------------
+
+def parse_layout(layout_file):
+    with open(layout_file, "r") as layout_template:
+        lines = layout_template.readlines()
+
+    layout = {"model_file": [], "world_media": collections.OrderedDict(), "initial_pop": [],
+              "parameters": collections.OrderedDict(), "lines": lines,
+              "line_indexes": {"model_file": None, "world_media": {}, "initial_pop": [], "parameters": {}}}
+
+    section = None
+    for index, line in enumerate(lines):
+        fields = line.split()
+
+        if section is None:
+            if fields and fields[0] == "model_file":
+                layout["model_file"] = fields[1:]
+                layout["line_indexes"]["model_file"] = index
+            elif fields in (["world_media"], ["initial_pop"], ["parameters"]):
+                section = fields[0]
+
+        elif fields == ["//"]:  # End of the current section
+            section = None
+
+        elif section == "world_media" and len(fields) == 2:
+            layout["world_media"][fields[0]] = fields[1]
+            layout["line_indexes"]["world_media"][fields[0]] = index
+
+        elif section == "initial_pop" and fields:
+            layout["initial_pop"].append(fields)
+            layout["line_indexes"]["initial_pop"].append(index)
+
+        elif section == "parameters" and "=" in line:
+            parameter, value = line.split("=", 1)
+            layout["parameters"][parameter.strip()] = value.strip()
+            layout["line_indexes"]["parameters"][parameter.strip()] = index
+
+    return layout
+
+### end-function-parse_layout
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION load_layout_template #############################################
+
+# PARSED LAYOUT TEMPLATE, parsed only once in the current process
+# (the template is parsed again if it is modified)
+# -----------------------------------------------------------------------------
+
+def load_layout_template(layout_file):
+    file_stat = os.stat(layout_file)
+    file_id = (os.path.abspath(layout_file), file_stat.st_mtime_ns, file_stat.st_size)
+
+    if file_id not in layout_templates:
+        layout_templates[file_id] = parse_layout(layout_file)
+
+    return layout_templates[file_id]
+
+### end-function-load_layout_template
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION indentation ######################################################
+
+def indentation(line):
+    return line[:len(line)-len(line.lstrip())]
+
+### end-function-indentation
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION render_layout ####################################################
+
+# FINAL COMETS LAYOUT FILE FOR A GIVEN CONFIGURATION (one write)
+
+# layout: structured layout (see 'load_layout_template'). It is not modified.
+# initial_biomass: list of initial biomasses, in the order of the strains (11111, 22222, 33333...)
+# model_file: list of COMETS model files, to replace those in the template (optional)
+# world_media: dictionary, metabolite : initial concentration, to replace those in the template (optional)
+# parameters: dictionary, parameter : value, to replace those in the template (optional)
+#             i.e. {"maxCycles": 240, "timeStep": 0.1, "numRunThreads": 1}
+#             Parameters not present in the template are added at the end of the 'parameters' block.
+# -----------------------------------------------------------------------------
+
+def render_layout(layout, layout_file, initial_biomass=[], model_file=None, world_media=None, parameters=None):
+    lines = list(layout["lines"])
+    line_indexes = layout["line_indexes"]
+
+    # MODEL FILES
+    if model_file is not None:
+        lines[line_indexes["model_file"]] = "model_file\t"+"\t".join(model_file)+"\n"
+
+    # WORLD MEDIA
+    if world_media is not None:
+        for metabolite, value in world_media.items():
+            if metabolite not in line_indexes["world_media"]:
+                print("ERROR! Metabolite "+metabolite+" is not in the 'world_media' block of the layout template")
+                raise KeyError(metabolite)
+            index = line_indexes["world_media"][metabolite]
+            lines[index] = indentation(lines[index])+metabolite+"\t"+str(value)+"\n"
+
+    # INITIAL POPULATION: initial biomass of every strain
+    placeholders = {str(i+1)*5: str(initial_biomass[i]) for i in range(len(initial_biomass))}
+    for fields, index in zip(layout["initial_pop"], line_indexes["initial_pop"]):
+        if any([field in placeholders for field in fields]):
+            lines[index] = indentation(lines[index])+"\t".join([placeholders.get(field, field) for field in fields])+"\n"
+
+    # PARAMETERS: only the lines with a different value are rewritten
+    new_parameters = []
+    if parameters is not None:
+        for parameter, value in parameters.items():
+            if parameter not in line_indexes["parameters"]:
+                new_parameters.append("    "+parameter+" = "+str(value)+"\n")
+            elif str(value) != layout["parameters"][parameter]:
+                index = line_indexes["parameters"][parameter]
+                lines[index] = indentation(lines[index])+parameter+" = "+str(value)+"\n"
+
+    if new_parameters:
+        last_parameter = max(line_indexes["parameters"].values())
+        lines[last_parameter] = lines[last_parameter]+"".join(new_parameters)
+
+    with open(layout_file, "w") as layout_output:
+        layout_output.write("".join(lines))
+
+### end-function-render_layout
+###############################################################################
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+PARSING OF COMETS OUTPUT LOGS
+-------------------------------------------------------------------------------
+In the current script, the COMETS output logs of a simulation ('media_log_<suffix>.txt',
+'total_biomass_log_<suffix>.txt') are parsed into NumPy arrays in one streaming pass,
+keeping only the metabolites to track (i.e. those in 'nutrients_to_track.txt'). This replaces
+the shell / awk preprocessing in 'plot_biomassX2_vs_4mediaItem_generalized.sh', and the later
+reading of the resulting table ('COMETS_<baseConfig>_<suffix>.txt') with pandas.
+
+Series of functions:
+
+    - "media_log_metabolites" function: list of metabolites in the media log (first line, 'medialist')
+    - "media_log_number" function: number of a metabolite to track in the media log (i.e. 'sucr' for 'sucr[e]')
+    - "parse_media_log" function: concentration array (cycle x tracked metabolite)
+    - "parse_biomass_log" function: biomass array (cycle x [cycle_number, strain1, strain2, ...])
+    - "comets_array" function: COMETS array, with the same columns as the former COMETS table
+
+
+-------------------------------------------------------------------------------
+COMETS ARRAY (organized in columns, as the former COMETS table)
+-------------------------------------------------------------------------------
+
+    metabolite1  ...  metabolite_n  cycle_number  Biomass1  Biomass2  Biomass3  [...]
+    0            ...  n-1           n             n+1       n+2       n+3
+
+The semantics of the former awk preprocessing are kept for every metabolite:
+    - A metabolite to track is matched as a whole word (egrep -w), i.e. 'sucr' is 'sucr[e]' in the media log
+    - A media line is '<cycle> = <value>' (grid coordinates removed, 'sparse(...)' = 0.0)
+    - The last value in every cycle is kept
+    - The first row is -1 unless the first cycle in the media log is 0 (awk initial values)
+    - Columns with different number of rows are filled with NaN (as 'paste' + pandas)
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import re
+import numpy as np
+# -----------------------------------------------------------------------------
+
+
+MEDIA_LINE = re.compile(r"media_(\d+)\{(\d+)\}")  # media_<cycle>{<metabolite number>}
+
+
+
+###############################################################################
+### FUNCTION media_log_metabolites ############################################
+
+# LIST OF METABOLITES IN THE MEDIA LOG, from its first line:
+# medialist = { 'metabolite1', 'metabolite2', ... };
+# -----------------------------------------------------------------------------
+
+def media_log_metabolites(header_line):
+    medialist = header_line.rsplit("{ ", 1)[-1].split("}", 1)[0].replace("'", "")
+    return [metabolite.strip() for metabolite in medialist.split(", ")]
+
+### end-function-media_log_metabolites
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION media_log_number #################################################
+
+# NUMBER OF A METABOLITE IN THE MEDIA LOG (1-based, as 'media_<cycle>{<number>}'). The metabolites to track
+# ('nutrients_to_track.txt') have no compartment: first metabolite in 'medialist' that contains the given one
+# as a whole word (as 'egrep -w'), unless there is an exact match.
+# RESULT: number of the metabolite, or None if it is not in the media log
+# -----------------------------------------------------------------------------
+
+def media_log_number(medialist, metabolite):
+    if metabolite in medialist:
+        return medialist.index(metabolite)+1
+
+    whole_word = re.compile(r"(?<![A-Za-z0-9_])"+re.escape(metabolite)+r"(?![A-Za-z0-9_])")
+    for n_metabolite, name in enumerate(medialist):
+        if whole_word.search(name):
+            return n_metabolite+1
+
+    return None
+
+### end-function-media_log_number
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION parse_media_log ##################################################
+
+# CONCENTRATION ARRAY FROM THE MEDIA LOG: row = cycle, column = metabolite (same order as in 'metabolites')
+# Only the lines of the metabolites to track are parsed, in a single pass over the file.
+# -----------------------------------------------------------------------------
+
+def parse_media_log(media_log, metabolites):
+    with open(media_log, "r") as media_file:
+        medialist = media_log_metabolites(media_file.readline())
+
+        # Metabolite number in the media log (1-based) : column in the array
+        columns = {}
+        for n_metabolite, metabolite in enumerate(metabolites):
+            number = media_log_number(medialist, metabolite)
+            if number is None:
+                print("ERROR! Metabolite "+metabolite+" is not in the media log "+media_log)
+                raise KeyError(metabolite)
+            columns[str(number)] = n_metabolite
+
+        # Last value per cycle, for every metabolite (awk initial values: oldCycle = 0, value = -1)
+        values = [[] for metabolite in metabolites]
+        old_cycles = ["0"]*len(metabolites)
+        last_values = [-1.0]*len(metabolites)
+
+        for line in media_file:
+            media_line = MEDIA_LINE.match(line)
+            if media_line is None or media_line.group(2) not in columns:
+                continue
+
+            column = columns[media_line.group(2)]
+            value = line.rsplit("=", 1)[-1].strip().rstrip(";").strip()
+            value = 0.0 if value.startswith("sparse") else float(value)
+
+            cycle = media_line.group(1)
+            if int(cycle) != int(old_cycles[column]):
+                values[column].append(last_values[column])
+                old_cycles[column] = cycle
+            last_values[column] = value
+
+    for column in range(len(metabolites)):
+        values[column].append(last_values[column])
+
+    return fill_columns(values)
+
+### end-function-parse_media_log
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION parse_biomass_log ################################################
+
+# BIOMASS ARRAY FROM THE TOTAL BIOMASS LOG: row = cycle, columns = cycle_number, biomass of every strain
+# -----------------------------------------------------------------------------
+
+def parse_biomass_log(biomass_log):
+    with open(biomass_log, "r") as biomass_file:
+        rows = [[float(value) for value in line.split()] for line in biomass_file if line.strip()]
+
+    n_columns = max([len(row) for row in rows]) if rows else 0
+    biomass = np.full((len(rows), n_columns), np.nan)
+    for n_row, row in enumerate(rows):
+        biomass[n_row, :len(row)] = row
+
+    return biomass
+
+### end-function-parse_biomass_log
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION fill_columns #####################################################
+
+# ARRAY FROM A LIST OF COLUMNS (lists of values) of different length, filled with NaN
+# -----------------------------------------------------------------------------
+
+def fill_columns(columns):
+    n_rows = max([len(column) for column in columns]) if columns else 0
+    array = np.full((n_rows, len(columns)), np.nan)
+    for n_column, column in enumerate(columns):
+        array[:len(column), n_column] = column
+
+    return array
+
+### end-function-fill_columns
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION comets_array #####################################################
+
+# COMETS ARRAY: concentrations of the tracked metabolites + total biomass log, row by row
+# (as 'paste' of both files: rows missing in one of them are filled with NaN)
+# -----------------------------------------------------------------------------
+
+def comets_array(media_log, biomass_log, metabolites):
+    media = parse_media_log(media_log, metabolites)
+    biomass = parse_biomass_log(biomass_log)
+
+    n_rows = max(media.shape[0], biomass.shape[0])
+    CometsArray = np.full((n_rows, media.shape[1]+biomass.shape[1]), np.nan)
+    CometsArray[:media.shape[0], :media.shape[1]] = media
+    CometsArray[:biomass.shape[0], media.shape[1]:] = biomass
+
+    return CometsArray
+
+### end-function-comets_array
+###############################################################################
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+RESULTS STORE
+-------------------------------------------------------------------------------
+In the current script, the RESULTS STORE for the configurations evaluated during a
+FLYCOP run is defined: a SQLite database in WAL mode ('configurationsResults.sqlite'),
+so that many processes (SMAC evaluations running concurrently) can insert results
+atomically. The legacy TSV tables ('configurationsResults-<consortium_arch>.txt')
+are exported from the database, for the downstream analysis scripts.
+
+Series of functions:
+
+    - "connect_results_store" function: connection to the database (schema created if needed)
+    - "insert_configuration" function: results of a configuration (+ per-repeat results) and legacy TSV export
+    - "export_legacy_tsv" function: legacy TSV table for a given consortium architecture
+    - "append_legacy_tsv" function: line of a new configuration appended to the legacy TSV table (full export only if needed)
+    - "best_fitness" function: best average fitness stored so far (incumbent), for the adaptive repeats
+    - "worst_fitness" function: worst average fitness stored so far at a given fidelity, for the configurations not promoted (multi-fidelity)
+    - "select_configurations" function: base configurations selected by fitness (top-k) and / or by the value of a field (i.e. BiomassLoss)
+    - "configuration_key" function: canonical key of the effective configuration, for the evaluation cache
+    - "cached_evaluation" function: results stored for a configuration key (evaluation cache), with its fields and repeats
+    - "fidelity_rank" function: rank of an average fitness among the configurations evaluated at a given fidelity (multi-fidelity)
+    - "backup_results_store" function: consistent copy of the database (single file), for the remote workers of the work queue
+    - "last_configuration_id" function: id of the last configuration stored
+    - "export_configurations" function: configurations stored after a given id, with their fields, repeats and cache entries
+    - "import_configurations" function: configurations exported from another results store (see 'export_configurations')
+
+
+-------------------------------------------------------------------------------
+SCHEMA
+-------------------------------------------------------------------------------
+
+    - configurations: one row per evaluated configuration
+        id, consortium_arch, base_config, fit_objective, avg_fitness, sd_fitness, id_sd, n_repeats, created,
+        fidelity (fraction of the COMETS cycles of the full fidelity, 1: full fidelity), max_cycles, time_step
+        Only full fidelity configurations are exported to the legacy TSV tables (screening results: results store only)
+
+    - configuration_fields: every field of the legacy TSV line, in its original order and format
+        configuration_id, position, name (TSV header), value (TSV value, as text)
+
+    - repeats: per-repeat results of every configuration
+        configuration_id, repeat, fitness, final_cycle, biomass_track, dead_cycles,
+        products (JSON: total of every product in the repeat, unrounded, i.e. {"Nar": ..., "MetNar": ...})
+
+    - evaluation_cache: last configuration evaluated for every effective configuration (memoization across SMAC evaluations)
+        config_key (see 'configuration_key'), configuration_id, requested_repeats (repeats requested, not always run:
+        adaptive repeats, COMETS runs discarded)
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+# -----------------------------------------------------------------------------
+
+
+RESULTS_DATABASE = "configurationsResults.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configurations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    consortium_arch TEXT NOT NULL,
+    base_config TEXT NOT NULL,
+    fit_objective TEXT,
+    avg_fitness REAL,
+    sd_fitness REAL,
+    id_sd INTEGER,
+    n_repeats INTEGER,
+    created TEXT DEFAULT CURRENT_TIMESTAMP,
+    fidelity REAL DEFAULT 1.0,
+    max_cycles INTEGER,
+    time_step REAL
+);
+
+CREATE TABLE IF NOT EXISTS configuration_fields (
+    configuration_id INTEGER NOT NULL REFERENCES configurations(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (configuration_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS repeats (
+    configuration_id INTEGER NOT NULL REFERENCES configurations(id),
+    repeat INTEGER NOT NULL,
+    fitness REAL,
+    final_cycle INTEGER,
+    biomass_track INTEGER,
+    dead_cycles TEXT,
+    products TEXT,
+    PRIMARY KEY (configuration_id, repeat)
+);
+
+CREATE TABLE IF NOT EXISTS evaluation_cache (
+    config_key TEXT PRIMARY KEY,
+    configuration_id INTEGER NOT NULL REFERENCES configurations(id),
+    requested_repeats INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS configurations_arch ON configurations (consortium_arch, base_config);
+"""
+
+# Columns added to existing databases (results stores created before the multi-fidelity evaluation and the per-repeat products)
+MIGRATIONS = [("configurations", "fidelity", "REAL DEFAULT 1.0"), ("configurations", "max_cycles", "INTEGER"), ("configurations", "time_step", "REAL"),
+              ("repeats", "products", "TEXT")]
+
+
+
+###############################################################################
+### FUNCTION connect_results_store ############################################
+
+# CONNECTION TO THE RESULTS STORE (WAL mode)
+# Autocommit mode (isolation_level=None): transactions are explicitly opened with
+# 'BEGIN IMMEDIATE', so that concurrent writers wait for each other (timeout).
+# -----------------------------------------------------------------------------
+
+def connect_results_store(database, timeout=600):
+    connection = sqlite3.connect(database, timeout=timeout, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+
+    for table, column, definition in MIGRATIONS:
+        if column not in [row[1] for row in connection.execute("PRAGMA table_info("+table+")")]:
+            try:
+                connection.execute("ALTER TABLE "+table+" ADD COLUMN "+column+" "+definition)
+            except sqlite3.OperationalError:  # Added by another process in the meantime (duplicate column)
+                pass
+
+    return connection
+
+### end-function-connect_results_store
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION insert_configuration #############################################
+
+# INSERT THE RESULTS OF A CONFIGURATION (single transaction)
+
+# results_fields: list of (name, value) for the legacy TSV line, values already formatted as text
+# repeat_results: list of dictionaries (one per repeat): fitness, final_cycle, biomass_track, dead_cycles, products (optional)
+# legacy_file: legacy TSV table (optional). The line of the configuration is appended within the same transaction,
+#              i.e. with the write lock, so that lines are never lost or interleaved (see 'append_legacy_tsv').
+# config_key: key of the effective configuration (see 'configuration_key'). If given, the configuration
+#             becomes the cached evaluation for that key, with 'requested_repeats' repeats requested
+# fidelity, max_cycles, time_step: fidelity of the evaluation (multi-fidelity) and COMETS cycles and time step actually run
+
+# RESULT: id of the configuration in the database
+# -----------------------------------------------------------------------------
+
+def insert_configuration(database, consortium_arch, fit_objective, base_config, results_fields,
+                         avg_fitness, sd_fitness, id_sd, repeat_results, legacy_file="", config_key=None, requested_repeats=None,
+                         fidelity=1.0, max_cycles=None, time_step=None):
+    connection = connect_results_store(database)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+
+        cursor = connection.execute("INSERT INTO configurations (consortium_arch, base_config, fit_objective, avg_fitness, sd_fitness, id_sd, n_repeats, "
+                                    "fidelity, max_cycles, time_step) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (consortium_arch, base_config, fit_objective, float(avg_fitness), float(sd_fitness), int(id_sd), len(repeat_results),
+                                     float(fidelity), max_cycles, time_step))
+        configuration_id = cursor.lastrowid
+
+        connection.executemany("INSERT INTO configuration_fields (configuration_id, position, name, value) VALUES (?, ?, ?, ?)",
+                               [(configuration_id, position, name, value) for position, (name, value) in enumerate(results_fields)])
+
+        connection.executemany("INSERT INTO repeats (configuration_id, repeat, fitness, final_cycle, biomass_track, dead_cycles, products) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [(configuration_id, n_repeat+1, float(repeat_result["fitness"]), int(repeat_result["final_cycle"]),
+                                 int(repeat_result["biomass_track"]), str(repeat_result["dead_cycles"]), json.dumps(repeat_result.get("products", {})))
+                                for n_repeat, repeat_result in enumerate(repeat_results)])
+
+        if config_key is not None:
+            connection.execute("INSERT OR REPLACE INTO evaluation_cache (config_key, configuration_id, requested_repeats) VALUES (?, ?, ?)",
+                               (config_key, configuration_id, int(requested_repeats if requested_repeats is not None else len(repeat_results))))
+
+        if legacy_file and float(fidelity) >= 1:
+            append_legacy_tsv(connection, consortium_arch, legacy_file, results_fields)
+
+        connection.execute("COMMIT")
+
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+    finally:
+        connection.close()
+
+    return configuration_id
+
+### end-function-insert_configuration
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION export_legacy_tsv ################################################
+
+# LEGACY TSV TABLE ('configurationsResults-<consortium_arch>.txt') for a given consortium architecture
+# Header (from the first configuration) and one line per full fidelity configuration, in order of insertion.
+# The table is written to a temporary file and then renamed (atomic replacement).
+
+# connection: open connection to the results store, or path to the database
+# -----------------------------------------------------------------------------
+
+def export_legacy_tsv(connection, consortium_arch, legacy_file):
+    if isinstance(connection, str):
+        connection = connect_results_store(connection)
+
+    lines = []
+    header = None
+    current_id = None
+    fields = []
+
+    query = connection.execute("SELECT configuration_fields.configuration_id, configuration_fields.name, configuration_fields.value "
+                               "FROM configuration_fields JOIN configurations ON configurations.id = configuration_fields.configuration_id "
+                               "WHERE configurations.consortium_arch = ? AND configurations.fidelity >= 1 "
+                               "ORDER BY configuration_fields.configuration_id, configuration_fields.position", (consortium_arch,))
+
+    for configuration_id, name, value in query:
+        if configuration_id != current_id:
+            if fields:
+                lines.append("\t".join([value for _, value in fields])+"\n")
+                if header is None: header = "\t".join([name for name, _ in fields])+"\n"
+            current_id = configuration_id
+            fields = []
+        fields.append((name, value))
+
+    if fields:
+        lines.append("\t".join([value for _, value in fields])+"\n")
+        if header is None: header = "\t".join([name for name, _ in fields])+"\n"
+
+    if header is None:
+        return
+
+    tmp_file = legacy_file+".tmp"+str(os.getpid())
+    with open(tmp_file, "w") as myfile:
+        myfile.write(header)
+        myfile.write("".join(lines))
+    os.replace(tmp_file, legacy_file)
+
+### end-function-export_legacy_tsv
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION append_legacy_tsv ################################################
+
+# LINE OF A NEW CONFIGURATION APPENDED TO THE LEGACY TSV TABLE (called with the write lock, see 'insert_configuration'),
+# so that every insert costs a single line, not the export of the whole table.
+# The table is exported again (see 'export_legacy_tsv') only if it does not exist yet, its header is not the
+# header of the first configuration stored for the consortium architecture, or its last line is incomplete.
+# -----------------------------------------------------------------------------
+
+def append_legacy_tsv(connection, consortium_arch, legacy_file, results_fields):
+    first_id = connection.execute("SELECT MIN(id) FROM configurations WHERE consortium_arch = ? AND fidelity >= 1", (consortium_arch,)).fetchone()[0]
+    header = "\t".join([name for name, in connection.execute("SELECT name FROM configuration_fields WHERE configuration_id = ? ORDER BY position",
+                                                               (first_id,))])+"\n"
+
+    if os.path.isfile(legacy_file) and os.path.getsize(legacy_file) > 0:
+        with open(legacy_file, "rb") as myfile:
+            current_header = myfile.readline().decode()
+            myfile.seek(-1, os.SEEK_END)
+            complete = myfile.read(1) == b"\n"
+
+        if current_header == header and complete:
+            with open(legacy_file, "a") as myfile:
+                myfile.write("\t".join([value for _, value in results_fields])+"\n")
+            return
+
+    export_legacy_tsv(connection, consortium_arch, legacy_file)
+
+### end-function-append_legacy_tsv
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION best_fitness #####################################################
+
+# BEST AVERAGE FITNESS STORED SO FAR (incumbent), for all consortium architectures
+# fidelity: only the configurations evaluated at that fidelity (fitness values at different fidelities are not comparable)
+# RESULT: best average fitness, or None if there is no configuration in the results store yet
+# -----------------------------------------------------------------------------
+
+def best_fitness(database, fidelity=1.0):
+    if not os.path.isfile(database):
+        return None
+
+    connection = connect_results_store(database)
+    try:
+        best = connection.execute("SELECT MAX(avg_fitness) FROM configurations WHERE fidelity = ?", (float(fidelity),)).fetchone()[0]
+    finally:
+        connection.close()
+
+    return best
+
+### end-function-best_fitness
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION worst_fitness ####################################################
+
+# WORST AVERAGE FITNESS STORED SO FAR at a given fidelity, for all consortium architectures
+# Multi-fidelity: fitness reported to SMAC for the configurations not promoted to the full fidelity
+# (worst of the promoted ones, on the same scale as the full fidelity results)
+# RESULT: worst average fitness, or None if there is no configuration at that fidelity yet
+# -----------------------------------------------------------------------------
+
+def worst_fitness(database, fidelity=1.0):
+    if not os.path.isfile(database):
+        return None
+
+    connection = connect_results_store(database)
+    try:
+        worst = connection.execute("SELECT MIN(avg_fitness) FROM configurations WHERE fidelity = ?", (float(fidelity),)).fetchone()[0]
+    finally:
+        connection.close()
+
+    return worst
+
+### end-function-worst_fitness
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION select_configurations ############################################
+
+# BASE CONFIGURATIONS SELECTED FROM THE RESULTS STORE, in order of average fitness (best first)
+# top: the best 'top' configurations (by average fitness, i.e. fitFunc)
+# field_values: dictionary, field name (legacy TSV header) : value (as text), i.e. {"BiomassLoss": "1"}
+# A configuration is selected if it satisfies any of the criteria given (None: all configurations)
+# fidelity: only the configurations evaluated at that fidelity (default: full fidelity, as 'best_fitness').
+#           None: all fidelities, higher fidelity first (fitness values at different fidelities are not comparable)
+
+# RESULT: list of base configurations (without duplicates)
+# -----------------------------------------------------------------------------
+
+def select_configurations(database, top=None, field_values=None, fidelity=1.0):
+    if not os.path.isfile(database):
+        return []
+
+    connection = connect_results_store(database)
+    try:
+        if fidelity is None:
+            ranking = connection.execute("SELECT id, base_config FROM configurations ORDER BY fidelity DESC, avg_fitness DESC, id").fetchall()
+        else:
+            ranking = connection.execute("SELECT id, base_config FROM configurations WHERE fidelity = ? ORDER BY avg_fitness DESC, id",
+                                         (float(fidelity),)).fetchall()
+
+        if top is None and not field_values:
+            selected_ids = set([configuration_id for configuration_id, base_config in ranking])
+        else:
+            selected_ids = set([configuration_id for configuration_id, base_config in ranking[:top or 0]])
+            for name, value in (field_values or {}).items():
+                selected_ids.update([row[0] for row in connection.execute("SELECT configuration_id FROM configuration_fields WHERE name = ? AND value = ?",
+                                                                          (name, str(value)))])
+    finally:
+        connection.close()
+
+    base_configs = []
+    for configuration_id, base_config in ranking:
+        if configuration_id in selected_ids and base_config not in base_configs:
+            base_configs.append(base_config)
+
+    return base_configs
+
+### end-function-select_configurations
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION configuration_key ################################################
+
+# CANONICAL KEY OF THE EFFECTIVE CONFIGURATION (JSON text), for the evaluation cache
+# The same configuration gets the same key, whatever the format of the values given by SMAC ('0.04', '0.040'...)
+# or the inactive conditional parameters (i.e. biomass of a strain not in the consortium architecture).
+
+# parameters: dictionary, parameter : value (numeric values as given by SMAC)
+# initial_biomass: initial biomasses, in the order of the strains. Only the first 'n_strains' are kept (active strains)
+# settings: dictionary, other settings that change the result of the evaluation (i.e. fitObj, maxCycles, COMETS parameters)
+# -----------------------------------------------------------------------------
+
+def configuration_key(consortium_arch, parameters, initial_biomass, n_strains, settings=None):
+    def canonical(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return str(value)
+
+    effective_configuration = {"consortium_arch": str(consortium_arch),
+                               "parameters": {name: canonical(value) for name, value in parameters.items()},
+                               "initial_biomass": [canonical(biomass) for biomass in list(initial_biomass)[:n_strains]],
+                               "settings": {name: canonical(value) for name, value in (settings or {}).items()}}
+
+    return json.dumps(effective_configuration, sort_keys=True)
+
+### end-function-configuration_key
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION cached_evaluation ################################################
+
+# RESULTS STORED FOR A CONFIGURATION KEY (evaluation cache, see 'configuration_key')
+# RESULT: dictionary, or None if the configuration was not evaluated yet
+#     - avg_fitness, sd_fitness, requested_repeats, base_config
+#     - fields: dictionary, field name (legacy TSV header) : value (as text)
+#     - repeats: list of dictionaries (one per repeat run): fitness, final_cycle, biomass_track, dead_cycles,
+#                products (empty for the repeats stored without products)
+# -----------------------------------------------------------------------------
+
+def cached_evaluation(database, config_key):
+    if not os.path.isfile(database):
+        return None
+
+    connection = connect_results_store(database)
+    try:
+        cached = connection.execute("SELECT configurations.id, configurations.avg_fitness, configurations.sd_fitness, "
+                                    "evaluation_cache.requested_repeats, configurations.base_config "
+                                    "FROM evaluation_cache JOIN configurations ON configurations.id = evaluation_cache.configuration_id "
+                                    "WHERE evaluation_cache.config_key = ?", (config_key,)).fetchone()
+        if cached is None:
+            return None
+
+        configuration_id, avg_fitness, sd_fitness, requested_repeats, base_config = cached
+        fields = dict(connection.execute("SELECT name, value FROM configuration_fields WHERE configuration_id = ? ORDER BY position",
+                                         (configuration_id,)).fetchall())
+        repeats = [{"fitness": fitness, "final_cycle": final_cycle, "biomass_track": biomass_track, "dead_cycles": dead_cycles,
+                    "products": json.loads(products) if products else {}}
+                   for fitness, final_cycle, biomass_track, dead_cycles, products in
+                   connection.execute("SELECT fitness, final_cycle, biomass_track, dead_cycles, products FROM repeats WHERE configuration_id = ? ORDER BY repeat",
+                                      (configuration_id,))]
+    finally:
+        connection.close()
+
+    return {"avg_fitness": avg_fitness, "sd_fitness": sd_fitness, "requested_repeats": requested_repeats, "base_config": base_config,
+            "fields": fields, "repeats": repeats}
+
+### end-function-cached_evaluation
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION fidelity_rank ####################################################
+
+# RANK OF AN AVERAGE FITNESS AMONG THE CONFIGURATIONS EVALUATED AT A GIVEN FIDELITY (multi-fidelity promotion)
+# RESULT: (number of configurations at that fidelity, number of them with a better average fitness)
+# -----------------------------------------------------------------------------
+
+def fidelity_rank(database, fidelity, avg_fitness):
+    if not os.path.isfile(database):
+        return 0, 0
+
+    connection = connect_results_store(database)
+    try:
+        n_configurations, n_better = connection.execute("SELECT COUNT(*), COALESCE(SUM(avg_fitness > ?), 0) FROM configurations WHERE fidelity = ?",
+                                                        (float(avg_fitness), float(fidelity))).fetchone()
+    finally:
+        connection.close()
+
+    return n_configurations, n_better
+
+### end-function-fidelity_rank
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION backup_results_store #############################################
+
+# CONSISTENT COPY OF THE RESULTS STORE in a single file (rollback journal, no WAL), i.e. for a remote worker of
+# the work queue (see 'EcPp3_work_queue.py'). The copy is made on the local file system (SQLite backup)
+# and then copied to 'backup_file' (temporary file + rename), which may be in a shared file system.
+# RESULT: True if the copy was made, False if the results store does not exist yet
+# -----------------------------------------------------------------------------
+
+def backup_results_store(database, backup_file):
+    if not os.path.isfile(database):
+        return False
+
+    local_fd, local_file = tempfile.mkstemp(suffix=".sqlite")
+    os.close(local_fd)
+    try:
+        source = connect_results_store(database)
+        destination = sqlite3.connect(local_file)
+        try:
+            source.backup(destination)
+            destination.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            destination.close()
+            source.close()
+
+        tmp_file = backup_file+".tmp"+str(os.getpid())
+        shutil.copyfile(local_file, tmp_file)
+        os.replace(tmp_file, backup_file)
+    finally:
+        os.remove(local_file)
+
+    return True
+
+### end-function-backup_results_store
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION last_configuration_id ############################################
+
+# ID OF THE LAST CONFIGURATION STORED (0 if there is no configuration in the results store yet)
+# -----------------------------------------------------------------------------
+
+def last_configuration_id(database):
+    if not os.path.isfile(database):
+        return 0
+
+    connection = connect_results_store(database)
+    try:
+        last_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM configurations").fetchone()[0]
+    finally:
+        connection.close()
+
+    return last_id
+
+### end-function-last_configuration_id
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION export_configurations ############################################
+
+# CONFIGURATIONS STORED AFTER 'after_id' (i.e. by a remote worker of the work queue, in its copy of the results store)
+# RESULT: list of dictionaries (JSON), with the arguments of 'insert_configuration' (see 'import_configurations')
+# -----------------------------------------------------------------------------
+
+def export_configurations(database, after_id=0):
+    if not os.path.isfile(database):
+        return []
+
+    configurations = []
+    connection = connect_results_store(database)
+    try:
+        query = connection.execute("SELECT id, consortium_arch, fit_objective, base_config, avg_fitness, sd_fitness, id_sd, fidelity, max_cycles, time_step "
+                                   "FROM configurations WHERE id > ? ORDER BY id", (int(after_id),)).fetchall()
+
+        for configuration_id, consortium_arch, fit_objective, base_config, avg_fitness, sd_fitness, id_sd, fidelity, max_cycles, time_step in query:
+            results_fields = connection.execute("SELECT name, value FROM configuration_fields WHERE configuration_id = ? ORDER BY position",
+                                                (configuration_id,)).fetchall()
+            repeat_results = [{"fitness": fitness, "final_cycle": final_cycle, "biomass_track": biomass_track, "dead_cycles": dead_cycles,
+                               "products": json.loads(products) if products else {}}
+                              for fitness, final_cycle, biomass_track, dead_cycles, products in
+                              connection.execute("SELECT fitness, final_cycle, biomass_track, dead_cycles, products FROM repeats "
+                                                 "WHERE configuration_id = ? ORDER BY repeat", (configuration_id,))]
+            cache_entry = connection.execute("SELECT config_key, requested_repeats FROM evaluation_cache WHERE configuration_id = ?",
+                                             (configuration_id,)).fetchone()
+
+            configurations.append({"consortium_arch": consortium_arch, "fit_objective": fit_objective, "base_config": base_config,
+                                   "results_fields": [list(field) for field in results_fields], "avg_fitness": avg_fitness, "sd_fitness": sd_fitness,
+                                   "id_sd": id_sd, "repeat_results": repeat_results, "fidelity": fidelity, "max_cycles": max_cycles, "time_step": time_step,
+                                   "config_key": cache_entry[0] if cache_entry else None, "requested_repeats": cache_entry[1] if cache_entry else None})
+    finally:
+        connection.close()
+
+    return configurations
+
+### end-function-export_configurations
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION import_configurations ############################################
+
+# CONFIGURATIONS EXPORTED FROM ANOTHER RESULTS STORE (see 'export_configurations'), inserted in 'database'
+# (new ids) together with their lines in the legacy TSV tables of 'results_folder' ('configurationsResults-<consortium_arch>.txt',
+# as in 'SelectConsortiumArchitecture')
+# -----------------------------------------------------------------------------
+
+def import_configurations(database, configurations, results_folder):
+    for configuration in configurations:
+        insert_configuration(database, configuration["consortium_arch"], configuration["fit_objective"], configuration["base_config"],
+                             [tuple(field) for field in configuration["results_fields"]], configuration["avg_fitness"], configuration["sd_fitness"],
+                             configuration["id_sd"], configuration["repeat_results"],
+                             legacy_file=os.path.join(results_folder, "configurationsResults-"+configuration["consortium_arch"]+".txt"),
+                             config_key=configuration["config_key"], requested_repeats=configuration["requested_repeats"],
+                             fidelity=configuration["fidelity"], max_cycles=configuration["max_cycles"], time_step=configuration["time_step"])
+
+### end-function-import_configurations
+###############################################################################
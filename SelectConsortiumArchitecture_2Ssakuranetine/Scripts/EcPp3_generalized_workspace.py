@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+WORKSPACES
+-------------------------------------------------------------------------------
+In the current script, the WORKSPACES (temporal folders) where every configuration is
+evaluated are defined. Instead of copying the whole Comets template folder to the same
+temporal folder ('EcPp3_TestTempV0') for every SMAC evaluation, each evaluation creates
+its own workspace with a unique name ('EcPp3_TestTempV0_<pid>_<random>'), so that several
+SMAC workers (or parallel scenarios) can evaluate configurations on the same node.
+
+Series of functions:
+
+    - "link_or_copy" function: hardlink (or symlink, or copy) of a read-only input file
+    - "create_workspace" function: new workspace with a unique name, from the Comets template folder
+    - "remove_workspace" function: removal of a workspace after the evaluation
+
+
+-------------------------------------------------------------------------------
+CONTENTS OF A WORKSPACE
+-------------------------------------------------------------------------------
+
+    - Read-only inputs (comets_scr, ...): hardlinks to the files in the template folder
+    - COMETS scripts ('comets_script_template*'): copied (materialized) in the workspace
+    - COMETS layouts ('EcPp3_layout_template*'): not copied, they are rendered in the workspace
+      for every configuration (see 'EcPp3_generalized_layout_COMETS.py')
+    - COMETS models ('*_tmp.mat.txt'): written (or hardlinked from the model cache) by the
+      initialize_update functions (see 'EcPp3_generalized_initialize_GEMs.py')
+
+The workspace is created next to the template folder (in 'MicrobialCommunities'), so that
+relative paths to the 'Scripts' folder (i.e. '../../Scripts') remain valid.
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+# -----------------------------------------------------------------------------
+
+
+LAYOUT_PREFIX = "EcPp3_layout_template"  # Rendered in the workspace, not copied
+SCRIPT_PREFIX = "comets_script_template"  # Copied in the workspace
+
+
+
+###############################################################################
+### FUNCTION link_or_copy #####################################################
+
+# LINK 'source' TO 'destination', for read-only files (never modified in place):
+# hardlink, or symlink if the hardlink is not possible (i.e. different file system),
+# or copy if none of them is possible (symlink=False: hardlink or copy)
+# -----------------------------------------------------------------------------
+
+def link_or_copy(source, destination, symlink=True):
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    try:
+        os.link(source, destination)
+        return
+    except OSError:
+        pass
+
+    if symlink:
+        try:
+            os.symlink(os.path.abspath(source), destination)
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(source, destination)  # copy2 keeps the execution permissions of 'comets_scr'
+
+### end-function-link_or_copy
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION create_workspace #################################################
+
+# NEW WORKSPACE WITH A UNIQUE NAME: 'prefix_<pid>_<random>', in the current directory
+# template_folder: Comets template folder ('EcPp3_TemplateOptimizeConsortiumV0/Comets')
+
+# RESULT: name of the workspace (relative to the current directory)
+# -----------------------------------------------------------------------------
+
+def create_workspace(template_folder, prefix):
+    workspace = os.path.basename(tempfile.mkdtemp(prefix=prefix+"_"+str(os.getpid())+"_", dir=os.getcwd()))
+
+    for file_name in os.listdir(template_folder):
+        file_path = os.path.join(template_folder, file_name)
+        if not os.path.isfile(file_path) or file_name.startswith(LAYOUT_PREFIX):
+            continue
+
+        if file_name.startswith(SCRIPT_PREFIX):
+            shutil.copy2(file_path, workspace)
+        else:
+            link_or_copy(file_path, os.path.join(workspace, file_name))
+
+    return workspace
+
+### end-function-create_workspace
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION remove_workspace #################################################
+
+def remove_workspace(workspace):
+    shutil.rmtree(workspace, ignore_errors=True)
+
+### end-function-remove_workspace
+###############################################################################
@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+"""
+EVALUATION SERVER for the configurations proposed by SMAC during a FLYCOP run.
+
+The wrapper (EcPp3_wrapperFLYCOP_v0_generalized.py) is started by SMAC as a new Python
+process for every configuration. Without the server, each of these processes imports
+cobra, optlang and pandas and loads the GEM models again. The server is a
+long-lived process that keeps these modules (and the base models, see
+'load_base_model' in EcPp3_generalized_initialize_GEMs.py) in memory, while the
+wrapper just sends the SMAC arguments through a Unix socket and prints the result.
+
+Call (from MicrobialCommunities, as SMAC does with the wrapper):
+
+    python3 -W ignore ../Scripts/EcPp3_evaluation_server.py
+
+Protocol (one request per connection, one JSON line each way):
+
+    - Request: {"argv": [SMAC arguments, without the script name]}
+    - Response: {"avgfitness": float, "sdfitness": float} or {"error": traceback}
+
+Socket file: FLYCOP_EVALUATION_SOCKET (environment variable),
+default 'EcPp3_evaluation_server.sock' in the current directory (MicrobialCommunities).
+
+Timeouts of the wrapper (client): CONNECT_TIMEOUT seconds to connect and send the request, and
+FLYCOP_EVALUATION_TIMEOUT seconds (environment variable, default EVALUATION_TIMEOUT) to receive the
+response. If the server is not running, or closes the connection without a response (i.e. it was
+stopped), the wrapper evaluates the configuration in its own process. If the server does not answer in
+time, the configuration is still being evaluated by the server: the wrapper exits with an error, so that
+SMAC registers the run as crashed (the configuration is not evaluated twice).
+
+Configurations are evaluated one at a time, in the order they arrive, since every
+evaluation changes the current directory of the process (to its own workspace).
+Several servers (one per SMAC worker) can run on the same node, with different socket files.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import socketserver
+import traceback
+
+SOCKET_FILE = "EcPp3_evaluation_server.sock"
+WRAPPER_NAME = "EcPp3_wrapperFLYCOP_v0_generalized.py"
+CONNECT_TIMEOUT = 30  # Seconds
+EVALUATION_TIMEOUT = 6*3600  # Seconds (FLYCOP_EVALUATION_TIMEOUT)
+
+
+
+###############################################################################
+### FUNCTION server_socket ####################################################
+
+def server_socket():
+    return os.environ.get("FLYCOP_EVALUATION_SOCKET", SOCKET_FILE)
+
+### end-function-server_socket
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION request_evaluation ###############################################
+
+# CLIENT SIDE (wrapper): send the SMAC arguments to the evaluation server
+# Only standard modules are used, so that the wrapper starts fast.
+# RESULT: (avgfitness, sdfitness), or None if the server is not running or closed the connection without a response
+#         (evaluation in the wrapper). Exit with an error if there is no response in FLYCOP_EVALUATION_TIMEOUT seconds.
+# -----------------------------------------------------------------------------
+
+def request_evaluation(argv):
+    socket_file = server_socket()
+    if not os.path.exists(socket_file):
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(socket_file)
+    except OSError:  # Stale socket file (server not running)
+        client.close()
+        return None
+
+    evaluation_timeout = float(os.environ.get("FLYCOP_EVALUATION_TIMEOUT", EVALUATION_TIMEOUT))
+    try:
+        with client.makefile("rwb") as stream:
+            try:
+                stream.write((json.dumps({"argv": argv})+"\n").encode())
+                stream.flush()
+            except OSError as error:  # Request not sent: the server was stopped
+                print("ERROR! The request could not be sent to the evaluation server ("+repr(error)+"), the configuration is evaluated by the wrapper")
+                return None
+
+            client.settimeout(evaluation_timeout)
+            try:
+                response_line = stream.readline()
+            except socket.timeout:  # The server is still evaluating the configuration: do not evaluate it again
+                print("ERROR! No response from the evaluation server in "+str(evaluation_timeout)+" seconds (FLYCOP_EVALUATION_TIMEOUT)")
+                sys.exit(1)
+            except OSError as error:  # Connection reset: the server was stopped during the evaluation
+                print("ERROR! The evaluation server closed the connection ("+repr(error)+"), the configuration is evaluated by the wrapper")
+                return None
+    finally:
+        client.close()
+
+    try:
+        response = json.loads(response_line.decode())
+    except ValueError:  # EOF (empty line) or partial response: the server was stopped during the evaluation
+        print("ERROR! The evaluation server closed the connection without a response, the configuration is evaluated by the wrapper")
+        return None
+
+    if "error" in response:
+        print("ERROR! The evaluation server could not evaluate the configuration:")
+        print(response["error"])
+        sys.exit(1)
+
+    return response["avgfitness"], response["sdfitness"]
+
+### end-function-request_evaluation
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION evaluate_request #################################################
+
+# EVALUATION OF A CONFIGURATION with the wrapper functions, in the current process
+# (modules and models already loaded). Also used by the workers of the work queue (EcPp3_work_queue.py)
+# dirPlot: results folder (default: 'dirPlots' in the wrapper), i.e. the staging folder of a remote worker
+# RESULT: response, {"avgfitness": float, "sdfitness": float} or {"error": traceback}
+# -----------------------------------------------------------------------------
+
+def evaluate_request(argv, dirPlot=None):
+    import EcPp3_wrapperFLYCOP_v0_generalized as wrapper
+
+    base_folder = os.getcwd()
+
+    try:
+        parameters = wrapper.parse_arguments([WRAPPER_NAME]+argv)
+        avgfitness, sdfitness = wrapper.run_configuration(parameters, dirPlot)
+        response = {"avgfitness": avgfitness, "sdfitness": sdfitness}
+
+    except Exception:  # Any error is returned to the wrapper (SMAC registers the run as crashed)
+        response = {"error": traceback.format_exc()}
+
+    finally:
+        os.chdir(base_folder)
+        sys.stdout.flush()
+
+    return response
+
+### end-function-evaluate_request
+###############################################################################
+
+
+
+###############################################################################
+### CLASS EvaluationHandler ###################################################
+
+# SERVER SIDE: evaluation of a configuration (see 'evaluate_request')
+# -----------------------------------------------------------------------------
+
+class EvaluationHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        request_line = self.rfile.readline()
+        if not request_line:  # EOF: the wrapper closed the connection before sending the request
+            return
+        request = json.loads(request_line.decode())
+        response = evaluate_request(request["argv"])
+        self.wfile.write((json.dumps(response)+"\n").encode())
+
+### end-class-EvaluationHandler
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION serve ############################################################
+
+def serve():
+    # Preload the modules for the evaluation: cobra, optlang, pandas
+    import EcPp3_wrapperFLYCOP_v0_generalized
+    import EcPp3_generalized
+
+    socket_file = server_socket()
+    if os.path.exists(socket_file):
+        os.remove(socket_file)  # Socket file from a previous server
+
+    # Stop the server (and remove the socket file) with 'kill'
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    server = socketserver.UnixStreamServer(socket_file, EvaluationHandler)
+    print("Evaluation server listening on "+socket_file)
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_file):
+            os.remove(socket_file)
+
+### end-function-serve
+###############################################################################
+
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+COMETS SUPERVISOR
+-------------------------------------------------------------------------------
+In the current script, the COMETS SUPERVISOR is defined: COMETS jobs ('./comets_scr <COMETS script>')
+are launched concurrently (asyncio) and supervised, with a wall-clock limit and a memory (RSS) limit
+per job. A hung or pathological simulation is killed (the whole process group: comets_scr and java)
+instead of blocking the SMAC evaluation forever. The JVM heap ('-Xmx', COMETS_XMX in comets_scr) and
+the COMETS threads ('numRunThreads' in the layout) of every job are sized from a global memory / core
+budget, so that concurrent COMETS jobs (i.e. parallel repeats) do not overcommit the node.
+
+The COMETS RUNNER is pluggable ('comets_runner' in 'SelectConsortiumArchitecture'), with the same result
+for every COMETS run:
+
+    - 'process' (default): one JVM per COMETS run ('./comets_scr <COMETS script>' in the run folder)
+    - 'batch': one JVM for several COMETS runs (i.e. repeats), a COMETS batch script with one 'load_layout'
+      line per run. JVM startup and class loading (glpk-java, gurobi, jogl) are paid once per batch.
+      Every run keeps its own folder: log files and model files of its layout are given as absolute paths.
+
+Series of functions:
+
+    - "comets_budget" function: -Xmx, numRunThreads and RSS limit per job, for a given number of concurrent jobs
+    - "process_tree_rss" function: memory (RSS, MB) of a process and all its descendants
+    - "supervise_job" function: [async] a single COMETS job, with wall-clock and RSS limits
+    - "run_comets_jobs" function: several COMETS jobs, at most 'max_concurrent' at the same time
+    - "run_comets" function: a single COMETS job (i.e. one COMETS repeat)
+    - "batch_layout" function: layout of a COMETS run in a batch (absolute paths)
+    - "batch_results" function: result of every COMETS run in a batch, from the result of the batch job
+    - "supervise_batch" function: [async] several COMETS runs in a single JVM
+    - "run_comets_batches" function: COMETS runs split into several batches, one JVM per batch at the same time
+
+
+-------------------------------------------------------------------------------
+RESULT OF A COMETS JOB (dictionary)
+-------------------------------------------------------------------------------
+
+    - outcome: 'OK', 'ERROR' (exit status != 0), 'TIMEOUT' (wall-clock limit) or 'MEMORY' (RSS limit)
+    - returncode, elapsed (s), max_rss_mb (MB, maximum RSS observed)
+
+Results 'TIMEOUT' and 'MEMORY' mean that the COMETS logs are incomplete: the caller must not compute
+metrics from them (see 'COMETS_repeat' in 'EcPp3_generalized.py').
+
+
+-------------------------------------------------------------------------------
+BUDGET (environment variables)
+-------------------------------------------------------------------------------
+
+    - FLYCOP_COMETS_MEMORY_MB: memory for all the concurrent COMETS jobs (default: 75% of the physical memory)
+    - FLYCOP_COMETS_CORES: cores for all the concurrent COMETS jobs (default: all the CPUs)
+    - FLYCOP_COMETS_EVALUATIONS: configurations evaluated concurrently on the node, sharing the budget (default: 1)
+    - FLYCOP_COMETS_TIMEOUT: wall-clock limit per job, seconds (default: 7200, 0 = no limit)
+    - FLYCOP_COMETS_MAX_RSS_MB: RSS limit per job, MB (default: the memory budget of the job)
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import time
+import signal
+import asyncio
+
+import EcPp3_generalized_layout_COMETS
+# -----------------------------------------------------------------------------
+
+
+MAX_XMX_MB = 8192  # -Xmx hard-coded in comets_scr before the budget
+MIN_XMX_MB = 512
+HEAP_FRACTION = 0.8  # Fraction of the memory of a job for the JVM heap (the rest: JVM overhead, GLPK / Gurobi)
+DEFAULT_TIMEOUT = 7200
+MONITOR_INTERVAL = 1.0  # Seconds between checks of a running job
+
+COMETS_RUNNERS = ("process", "batch")
+BATCH_SCRIPT = "comets_batch_script"
+BATCH_LAYOUT = "comets_batch_layout.txt"
+BATCH_OUTPUT = "output_batch.txt"
+
+
+
+###############################################################################
+### FUNCTION comets_budget ####################################################
+
+# RESOURCES PER JOB FOR 'n_jobs' CONCURRENT COMETS JOBS (global memory / core budget)
+# The budget of the node is shared by FLYCOP_COMETS_EVALUATIONS concurrent evaluations (i.e. local workers of the work queue)
+# RESULT: dictionary, xmx (i.e. '4096M', for COMETS_XMX), numRunThreads, max_rss_mb, timeout
+# -----------------------------------------------------------------------------
+
+def comets_budget(n_jobs=1):
+    n_jobs = max(1, int(n_jobs)) * max(1, int(os.environ.get("FLYCOP_COMETS_EVALUATIONS", 1)))
+
+    memory_mb = os.environ.get("FLYCOP_COMETS_MEMORY_MB")
+    if memory_mb is None:
+        memory_mb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024) * 0.75
+    job_memory_mb = float(memory_mb) / n_jobs
+
+    cores = int(os.environ.get("FLYCOP_COMETS_CORES", os.cpu_count() or 1))
+
+    xmx_mb = int(min(MAX_XMX_MB, max(MIN_XMX_MB, job_memory_mb * HEAP_FRACTION)))
+    return {"xmx": str(xmx_mb)+"M",
+            "numRunThreads": max(1, cores // n_jobs),
+            "max_rss_mb": float(os.environ.get("FLYCOP_COMETS_MAX_RSS_MB", max(job_memory_mb, xmx_mb / HEAP_FRACTION))),
+            "timeout": float(os.environ.get("FLYCOP_COMETS_TIMEOUT", DEFAULT_TIMEOUT))}
+
+### end-function-comets_budget
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION process_tree_rss #################################################
+
+# MEMORY (RSS, MB) OF A PROCESS AND ALL ITS DESCENDANTS (Linux, /proc). RESULT: None if not available
+# -----------------------------------------------------------------------------
+
+def process_tree_rss(pid):
+    rss_kb = 0
+    pending = [pid]
+    found = False
+
+    while pending:
+        current = pending.pop()
+        try:
+            with open("/proc/"+str(current)+"/status", "r") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        rss_kb += int(line.split()[1])
+                        break
+            found = True
+
+            for task in os.listdir("/proc/"+str(current)+"/task"):
+                with open("/proc/"+str(current)+"/task/"+task+"/children", "r") as children:
+                    pending.extend([int(child) for child in children.read().split()])
+        except (OSError, ValueError):  # Finished process, or no /proc
+            continue
+
+    return rss_kb / 1024 if found else None
+
+### end-function-process_tree_rss
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION supervise_job ####################################################
+
+# [ASYNC] SINGLE COMETS JOB: './comets_scr <comets_script>' in 'run_folder' (own process group), output to 'output_file'
+# timeout (s) and max_rss_mb (MB): limits of the job (0 / None = no limit). xmx: JVM heap (COMETS_XMX)
+# RESULT: result of the job (see SCRIPT DESCRIPTION)
+# -----------------------------------------------------------------------------
+
+async def supervise_job(run_folder, comets_script, output_file="output.txt", xmx=None, timeout=None, max_rss_mb=None):
+    environment = dict(os.environ)
+    if xmx:
+        environment["COMETS_XMX"] = xmx
+
+    start = time.monotonic()
+    max_rss = 0.0
+    outcome = None
+
+    with open(os.path.join(run_folder, output_file), "w") as output:
+        process = await asyncio.create_subprocess_exec("./comets_scr", comets_script, cwd=run_folder, env=environment,
+                                                       stdout=output, stderr=asyncio.subprocess.STDOUT, start_new_session=True)
+        while True:
+            try:
+                await asyncio.wait_for(process.wait(), MONITOR_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            rss = process_tree_rss(process.pid)
+            if rss is not None:
+                max_rss = max(max_rss, rss)
+
+            if timeout and time.monotonic() - start > timeout:
+                outcome = "TIMEOUT"
+            elif max_rss_mb and rss is not None and rss > max_rss_mb:
+                outcome = "MEMORY"
+
+            if outcome is not None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)  # comets_scr and java
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+                break
+
+    if outcome is None:
+        outcome = "OK" if process.returncode == 0 else "ERROR"
+
+    return {"outcome": outcome, "returncode": process.returncode, "elapsed": time.monotonic() - start, "max_rss_mb": max_rss}
+
+### end-function-supervise_job
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION run_comets_jobs ##################################################
+
+# SEVERAL COMETS JOBS, at most 'max_concurrent' running at the same time (default: all of them)
+# jobs: list of (run_folder, comets_script). Resources per job from the budget for 'max_concurrent' jobs,
+# unless 'budget' is given (see 'comets_budget')
+
+# RESULT: list of results, in the order of 'jobs'
+# -----------------------------------------------------------------------------
+
+def run_comets_jobs(jobs, max_concurrent=None, budget=None, output_file="output.txt"):
+    max_concurrent = max_concurrent or len(jobs) or 1
+    if budget is None:
+        budget = comets_budget(max_concurrent)
+
+    async def supervise_all():
+        slots = asyncio.Semaphore(max_concurrent)
+
+        async def supervise_slot(run_folder, comets_script):
+            async with slots:
+                return await supervise_job(run_folder, comets_script, output_file, budget["xmx"], budget["timeout"], budget["max_rss_mb"])
+
+        return await asyncio.gather(*[supervise_slot(run_folder, comets_script) for run_folder, comets_script in jobs])
+
+    return list(asyncio.run(supervise_all()))
+
+### end-function-run_comets_jobs
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION run_comets #######################################################
+
+# SINGLE COMETS JOB (i.e. one COMETS repeat, sequential or in a process pool)
+# n_jobs: number of COMETS jobs running concurrently on the node, for the budget (i.e. parallel repeats)
+# -----------------------------------------------------------------------------
+
+def run_comets(run_folder, comets_script, n_jobs=1, budget=None, output_file="output.txt"):
+    if budget is None:
+        budget = comets_budget(n_jobs)
+
+    return asyncio.run(supervise_job(run_folder, comets_script, output_file, budget["xmx"], budget["timeout"], budget["max_rss_mb"]))
+
+### end-function-run_comets
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION batch_layout #####################################################
+
+# LAYOUT OF A COMETS RUN IN A BATCH ('BATCH_LAYOUT' in 'run_folder'), from the layout 'layout_name' of the run folder.
+# All the runs of a batch share the working directory of the JVM: log files (parameters '*logname') and model files
+# are given as absolute paths in the run folder.
+
+# RESULT: (batch layout file, first log file of the run), both absolute paths
+# -----------------------------------------------------------------------------
+
+def batch_layout(run_folder, layout_name):
+    run_folder = os.path.abspath(run_folder)
+    layout = EcPp3_generalized_layout_COMETS.parse_layout(os.path.join(run_folder, layout_name))
+
+    log_files = {parameter: os.path.join(run_folder, value) for parameter, value in layout["parameters"].items()
+                 if parameter.lower().endswith("logname")}
+    model_file = [os.path.join(run_folder, model) for model in layout["model_file"]]
+
+    layout_file = os.path.join(run_folder, BATCH_LAYOUT)
+    EcPp3_generalized_layout_COMETS.render_layout(layout, layout_file, model_file=model_file, parameters=log_files)
+
+    return layout_file, list(log_files.values())[0] if log_files else None
+
+### end-function-batch_layout
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION batch_results ####################################################
+
+# RESULT OF EVERY COMETS RUN IN A BATCH (runs are sequential in the JVM), from the result of the batch job.
+# If the batch job did not complete, a run is complete if the next one already started (its first log file exists);
+# the others get the outcome of the batch job.
+
+# RESULT: list of results, in the order of the runs (see SCRIPT DESCRIPTION)
+# -----------------------------------------------------------------------------
+
+def batch_results(batch_run, log_files):
+    n_runs = len(log_files)
+    results = []
+    for n_run in range(n_runs):
+        result = dict(batch_run, batch_runs=n_runs)
+        if batch_run["outcome"] != "OK" and any([log_file is not None and os.path.exists(log_file) for log_file in log_files[n_run+1:]]):
+            result["outcome"] = "OK"
+        results.append(result)
+
+    return results
+
+### end-function-batch_results
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION supervise_batch ##################################################
+
+# [ASYNC] SEVERAL COMETS RUNS IN A SINGLE JVM: COMETS batch script ('BATCH_SCRIPT', one 'load_layout' line per run)
+# in the first run folder. Wall-clock limit: the limit per run in the budget, times the number of runs.
+
+# run_folders: one per COMETS run, with the layout 'layout_name' (and its model files)
+# RESULT: list of results, in the order of 'run_folders'
+# -----------------------------------------------------------------------------
+
+async def supervise_batch(run_folders, layout_name, budget):
+    layouts = [batch_layout(run_folder, layout_name) for run_folder in run_folders]
+
+    for layout_file, log_file in layouts:  # Log files of a previous batch in the same folders
+        if log_file is not None and os.path.exists(log_file):
+            os.remove(log_file)
+
+    with open(os.path.join(run_folders[0], BATCH_SCRIPT), "w") as batch_script:
+        batch_script.write("".join(["load_layout  "+layout_file+"\n" for layout_file, log_file in layouts]))
+
+    timeout = budget["timeout"] * len(run_folders) if budget["timeout"] else None
+    batch_run = await supervise_job(run_folders[0], BATCH_SCRIPT, BATCH_OUTPUT, budget["xmx"], timeout, budget["max_rss_mb"])
+
+    return batch_results(batch_run, [log_file for layout_file, log_file in layouts])
+
+### end-function-supervise_batch
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION run_comets_batches ###############################################
+
+# COMETS RUNS SPLIT INTO 'n_batches' BATCHES (consecutive runs), one JVM per batch, all the batches at the same time.
+# Resources per JVM from the budget for 'n_batches' jobs, unless 'budget' is given (see 'comets_budget')
+
+# RESULT: list of results, in the order of 'run_folders'
+# -----------------------------------------------------------------------------
+
+def run_comets_batches(run_folders, layout_name, n_batches=1, budget=None):
+    n_batches = max(1, min(n_batches, len(run_folders)))
+    if budget is None:
+        budget = comets_budget(n_batches)
+
+    batch_size, n_larger = divmod(len(run_folders), n_batches)
+    batches = []
+    start = 0
+    for n_batch in range(n_batches):
+        end = start + batch_size + (1 if n_batch < n_larger else 0)
+        batches.append(run_folders[start:end])
+        start = end
+
+    async def supervise_all():
+        return await asyncio.gather(*[supervise_batch(batch, layout_name, budget) for batch in batches])
+
+    return [result for results in asyncio.run(supervise_all()) for result in results]
+
+### end-function-run_comets_batches
+###############################################################################
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+EXPORT OF COBRA MODELS TO THE COMETS FORMAT
+-------------------------------------------------------------------------------
+In the current script, the COBRA models are exported to the COMETS model format
+(SMATRIX, BOUNDS, OBJECTIVE, METABOLITE_NAMES, REACTION_NAMES, EXCHANGE_REACTIONS).
+
+Series of functions:
+
+    - "stoichiometry_to_coo" function: sparse (COO) stoichiometric matrix of a given model
+    - "stoichiometry_signature" function: signature of the sections that do not depend on the bounds
+    - "invariant_sections" function: COMETS sections that do not depend on the bounds (SMATRIX, OBJECTIVE, names...)
+    - "bounds_section" function: COMETS BOUNDS section, with optional bound overrides
+    - "stored_sections" function: invariant sections of a base model, stored once on disk (byte offset of BOUNDS)
+    - "copy_range" function: copy of a byte range between files (in the kernel, if possible)
+    - "write_bytes" function: write to an unbuffered file
+    - "model_to_comets" function: COMETS model file (.txt) from a given COBRA model (in memory)
+
+The output is byte-identical to the former 'mat_to_comets' export (metabolite-by-reaction
+loop in 'EcPp3_generalized_initialize_GEMs.py'), which now relies on 'model_to_comets'.
+
+
+-------------------------------------------------------------------------------
+INVARIANT SECTIONS
+-------------------------------------------------------------------------------
+
+Across configurations, the initialize_update functions only change the bounds of a base model.
+The invariant sections are rendered once per stoichiometry signature (metabolites, reactions,
+coefficients and objective) and kept in memory, so that only the BOUNDS section is rendered
+for every configuration. Any change in the stoichiometry gives a different signature, i.e.
+the invariant sections are rendered again.
+
+The invariant sections are also stored once per base model in the model cache directory
+('CometsSections' folder, see 'EcPp3_generalized_model_cache.py'): '<signature>.sections', with the
+byte offset where the BOUNDS section goes in '<signature>.offset'. Every COMETS model file is then
+spliced from the stored sections and a freshly rendered BOUNDS section: the invariant sections are
+copied between files in the kernel (os.copy_file_range), so that only the BOUNDS section (kilobytes)
+goes through Python, instead of the whole model (megabytes).
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import hashlib
+import collections
+
+import numpy as np
+from cobra.util.solver import linear_reaction_coefficients
+
+# OUR MODULES FOR FLYCOP TO WORK
+import EcPp3_generalized_model_cache
+# -----------------------------------------------------------------------------
+
+
+SECTIONS_CACHE_SIZE = 16  # Maximum number of base models with invariant sections kept in memory
+SECTIONS_FOLDER = "CometsSections"  # Inside the model cache directory
+comets_sections = collections.OrderedDict()  # Stoichiometry signature : (SMATRIX section, OBJECTIVE to EXCHANGE_REACTIONS sections)
+stored_sections_index = {}  # Stoichiometry signature : (stored sections file, byte offset of BOUNDS, size), in the current process
+
+
+###############################################################################
+### FUNCTION stoichiometry_to_coo #############################################
+
+# SPARSE STOICHIOMETRIC MATRIX (COO format), built in one pass over the reactions
+# (only non-zero coefficients are visited, instead of every metabolite x reaction pair).
+
+# RESULT: row (metabolite) indexes, column (reaction) indexes and coefficients,
+# sorted by metabolite and then by reaction (the order of the SMATRIX block in COMETS).
+# Coefficients are kept as the original Python objects, so that str(coeff) is not altered.
+# -----------------------------------------------------------------------------
+
+def stoichiometry_to_coo(model):
+    metabolite_indexes = {metabolite: x for x, metabolite in enumerate(model.metabolites)}
+    rows = []
+    columns = []
+    coefficients = []
+
+    for y, reaction in enumerate(model.reactions):
+        for metabolite, coeff in reaction.metabolites.items():
+            x = metabolite_indexes.get(metabolite)
+            if x is not None:
+                rows.append(x)
+                columns.append(y)
+                coefficients.append(coeff)
+
+    rows = np.array(rows, dtype=np.int64)
+    columns = np.array(columns, dtype=np.int64)
+    order = np.lexsort((columns, rows))  # Last key is the primary one: metabolite, then reaction
+
+    return rows[order], columns[order], [coefficients[k] for k in order]
+
+### end-function-stoichiometry_to_coo
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION objective_index ##################################################
+
+# COMETS OBJECTIVE: index (1-based) of the last reaction in the objective, as in 'mat_to_comets'
+# -----------------------------------------------------------------------------
+
+def objective_index(model):
+    objective_reactions = linear_reaction_coefficients(model)
+    objective_indexes = [y for y, reaction in enumerate(model.reactions) if objective_reactions.get(reaction, 0) != 0]
+    return objective_indexes[-1]+1
+
+### end-function-objective_index
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION stoichiometry_signature ##########################################
+
+# SIGNATURE OF THE INVARIANT SECTIONS: metabolite ids, reaction ids and coefficients
+# (in the order of the model) and objective reaction
+# -----------------------------------------------------------------------------
+
+def stoichiometry_signature(model):
+    signature = hashlib.sha256()
+    signature.update("\t".join([metabolite.id for metabolite in model.metabolites]).encode())
+    for reaction in model.reactions:
+        signature.update(("\n"+reaction.id+"\t"+"\t".join([metabolite.id+":"+repr(coeff) for metabolite, coeff in reaction.metabolites.items()])).encode())
+    signature.update(("\nOBJECTIVE\t"+str(objective_index(model))).encode())
+
+    return signature.hexdigest()
+
+### end-function-stoichiometry_signature
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION invariant_sections ###############################################
+
+# COMETS SECTIONS THAT DO NOT DEPEND ON THE BOUNDS, rendered once per stoichiometry signature
+# RESULT: (SMATRIX section, OBJECTIVE to EXCHANGE_REACTIONS sections), as text
+# -----------------------------------------------------------------------------
+
+def invariant_sections(model, signature=None):
+    if signature is None:
+        signature = stoichiometry_signature(model)
+
+    if signature in comets_sections:
+        comets_sections.move_to_end(signature)
+        return comets_sections[signature]
+
+    n_metabolites = len(model.metabolites)
+    n_reactions = len(model.reactions)
+
+    # S matrix
+    rows, columns, coefficients = stoichiometry_to_coo(model)
+    smatrix = ["SMATRIX  "+str(n_metabolites)+"  "+str(n_reactions)+"\n"]
+    smatrix.extend(["    "+str(x+1)+"   "+str(y+1)+"   "+str(coeff)+"\n" for x, y, coeff in zip(rows.tolist(), columns.tolist(), coefficients)])
+    smatrix.append("//\n")
+
+    # Objective reaction
+    lines = ["OBJECTIVE\n", "    "+str(objective_index(model))+"\n", "//\n"]
+
+    # Metabolite names
+    lines.append("METABOLITE_NAMES\n")
+    lines.extend(["    "+metabolite.id+"\n" for metabolite in model.metabolites])
+    lines.append("//\n")
+
+    # Reaction names
+    lines.append("REACTION_NAMES\n")
+    lines.extend(["    "+reaction.id+"\n" for reaction in model.reactions])
+    lines.append("//\n")
+
+    # Exchange reactions
+    lines.append("EXCHANGE_REACTIONS\n")
+    lines.extend([" "+str(y+1) for y, reaction in enumerate(model.reactions) if reaction.id.find('EX_')==0])
+    lines.append("\n//\n")
+
+    comets_sections[signature] = ("".join(smatrix), "".join(lines))
+    if len(comets_sections) > SECTIONS_CACHE_SIZE:
+        comets_sections.popitem(last=False)  # Least recently used base model
+
+    return comets_sections[signature]
+
+### end-function-invariant_sections
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION bounds_section ###################################################
+
+# COMETS BOUNDS SECTION (as float, i.e. '0.0', as for a model loaded from a mat file)
+# bounds: dictionary, reaction id : (lower bound, upper bound), to override the bounds of the model (optional)
+#         i.e. a compiled base model plus the bounds of a given configuration
+# -----------------------------------------------------------------------------
+
+def bounds_section(model, bounds=None):
+    if bounds is None:
+        bounds = {}
+
+    lines = ["BOUNDS  -1000  1000\n"]
+    for y, reaction in enumerate(model.reactions):
+        lower_bound, upper_bound = bounds.get(reaction.id, (reaction.lower_bound, reaction.upper_bound))
+        lines.append("    "+str(y+1)+"   "+str(float(lower_bound))+"   "+str(float(upper_bound))+"\n")
+    lines.append("//\n")
+
+    return "".join(lines)
+
+### end-function-bounds_section
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION stored_sections ##################################################
+
+# INVARIANT SECTIONS OF A BASE MODEL, STORED ONCE ON DISK: SMATRIX + OBJECTIVE to EXCHANGE_REACTIONS,
+# without the BOUNDS section, which goes at the byte offset = size of the SMATRIX section.
+# The files are written to temporary files and then renamed (first the offset, then the sections),
+# so that other SMAC evaluations never read a partial file.
+
+# RESULT: (stored sections file, byte offset of BOUNDS, size of the stored sections file)
+# -----------------------------------------------------------------------------
+
+def stored_sections(model, signature):
+    if signature in stored_sections_index and os.path.exists(stored_sections_index[signature][0]):
+        return stored_sections_index[signature]
+
+    sections_dir = os.path.join(EcPp3_generalized_model_cache.cache_directory(), SECTIONS_FOLDER)
+    os.makedirs(sections_dir, exist_ok=True)
+    sections_file = os.path.join(sections_dir, signature+".sections")
+    offset_file = os.path.join(sections_dir, signature+".offset")
+
+    try:
+        with open(offset_file, "r") as offsets:
+            bounds_offset, sections_size = [int(value) for value in offsets.read().split()]
+        if os.path.getsize(sections_file) != sections_size:
+            raise ValueError(sections_file)
+
+    except (OSError, ValueError):  # Not stored yet (or partially stored): store the invariant sections
+        smatrix, other_sections = invariant_sections(model, signature)
+        smatrix, other_sections = smatrix.encode(), other_sections.encode()
+        bounds_offset, sections_size = len(smatrix), len(smatrix)+len(other_sections)
+
+        for file_path, content in ((offset_file, (str(bounds_offset)+"\t"+str(sections_size)+"\n").encode()), 
+                                   (sections_file, smatrix+other_sections)):
+            tmp_file = file_path+".tmp"+str(os.getpid())
+            with open(tmp_file, "wb") as stored_file:
+                stored_file.write(content)
+            os.replace(tmp_file, file_path)
+
+    stored_sections_index[signature] = (sections_file, bounds_offset, sections_size)
+    return stored_sections_index[signature]
+
+### end-function-stored_sections
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION copy_range #######################################################
+
+# COPY 'count' BYTES OF 'source' (from 'offset') TO THE CURRENT POSITION OF 'destination' (unbuffered files)
+# In the kernel if possible (os.copy_file_range, Linux), otherwise through Python.
+# -----------------------------------------------------------------------------
+
+def copy_range(source, destination, offset, count):
+    in_kernel = hasattr(os, "copy_file_range")
+    while count > 0:
+        if in_kernel:
+            try:
+                copied = os.copy_file_range(source.fileno(), destination.fileno(), count, offset)
+            except OSError:  # Not supported (i.e. old kernel or different file systems)
+                in_kernel = False
+                continue
+        else:
+            data = os.pread(source.fileno(), min(count, 1 << 20), offset)
+            write_bytes(destination, data)
+            copied = len(data)
+
+        if copied == 0:  # Unexpected end of the source file
+            break
+        offset += copied
+        count -= copied
+
+### end-function-copy_range
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION write_bytes ######################################################
+
+# WRITE ALL 'data' TO AN UNBUFFERED FILE (a raw write could write only part of it)
+# -----------------------------------------------------------------------------
+
+def write_bytes(destination, data):
+    data = memoryview(data)
+    while data:
+        data = data[destination.write(data):]
+
+### end-function-write_bytes
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION model_to_comets ##################################################
+
+# COMETS MODEL FILE FROM A COBRA MODEL (in memory), spliced from the stored invariant sections
+# of the same base model (same stoichiometry signature) and a freshly rendered BOUNDS section.
+
+# model_to_comets(model, cometsOutputFile)
+# model_to_comets(base_model, cometsOutputFile, bounds={'EX_sucr(e)': (-10, 0), ...})
+# -----------------------------------------------------------------------------
+
+def model_to_comets(model, cometsOutputFile, bounds=None):
+    signature = stoichiometry_signature(model)
+    sections_file, bounds_offset, sections_size = stored_sections(model, signature)
+
+    # The output file could be a hardlink to a model in the cache: never write through it
+    if os.path.lexists(cometsOutputFile):
+        os.remove(cometsOutputFile)
+
+    with open(sections_file, mode='rb', buffering=0) as sections, open(cometsOutputFile, mode='wb', buffering=0) as f:
+        copy_range(sections, f, 0, bounds_offset)
+        write_bytes(f, bounds_section(model, bounds).encode())
+        copy_range(sections, f, bounds_offset, sections_size-bounds_offset)
+
+### end-function-model_to_comets
+###############################################################################
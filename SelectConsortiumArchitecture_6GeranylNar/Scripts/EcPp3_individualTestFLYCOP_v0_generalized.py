@@ -30,6 +30,7 @@ n_line_args = len(sys.argv)
 # OTHER VARIABLES
 sd_cutoff = 0.1
 maxCycles = 240
+n_workers = 1  # COMETS repeats running in parallel (1: sequential repeats)
 
 # STUDY PARAMETERS OPTIMIZED BY SMAC
 # ------------------------------------------
@@ -59,7 +60,7 @@ initial_biomass = [float(init_biomass) for init_biomass in initial_biomass_str.s
 avgfitness,sdfitness,strains_list=EcPp3_generalized.SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FVAGerNar, FVANar,
                                                                                  consortium_arch, initial_biomass, \
                                                                                  fitObj='MaxGerNar', maxCycles = maxCycles, dirPlot='', repeat=5, 
-                                                                                 sd_cutoff = sd_cutoff, models_summary=True)
+                                                                                 sd_cutoff = sd_cutoff, models_summary=True, n_workers=n_workers)
     
 print("\nComplete individualTest execution\n")
 
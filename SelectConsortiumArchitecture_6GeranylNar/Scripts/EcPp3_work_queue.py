@@ -0,0 +1,592 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+"""
+WORK QUEUE for the batch evaluation of the configurations proposed by SMAC, on several nodes.
+
+The queue is a filesystem spool (a folder in a file system shared by all the nodes), so that
+no broker is needed. The wrapper (EcPp3_wrapperFLYCOP_v0_generalized.py) submits every configuration
+to the spool and waits for its result, while the workers (on any node) pull the configurations,
+evaluate them with 'SelectConsortiumArchitecture' (see 'evaluate_request' in EcPp3_evaluation_server.py)
+and post the results back. Several SMAC processes (shared model mode, see FLYCOP.sh) keep
+the workers busy.
+
+Spool folder: FLYCOP_WORK_QUEUE (environment variable). If it is not defined, the wrapper does not
+use the work queue (evaluation server or evaluation in the current process).
+
+    - tmp/: files being written (then renamed, atomic)
+    - pending/<job>.json: configurations submitted by the wrappers ({"argv": [SMAC arguments], "host": node of the wrapper,
+      "store": copy of the results store in stores/, if it exists})
+    - running/<job>.json@<worker>: configurations claimed by a worker (rename from pending/: only one worker succeeds)
+    - heartbeat/<job>.json@<worker>: heartbeat counter of a running job ({"beat": int}), increased by the worker
+      every HEARTBEAT_INTERVAL seconds during the evaluation
+    - done/<job>.json: results ({"avgfitness": float, "sdfitness": float} or {"error": traceback}), removed by the wrapper
+    - cancelled/<job>.json: jobs cancelled by the wrapper (deadline or SIGTERM), never evaluated nor posted
+    - stores/<job>.json: copy of the results store of the wrapper when the job was submitted (SQLite file, for the remote workers)
+    - results/<job>.json/: files written by a remote worker in its results folder (plots, flux archives)
+    - STOP: idle workers exit if this file exists
+
+Jobs of a dead worker (no heartbeat for FLYCOP_WORK_QUEUE_STALE seconds, default 600) are requeued by the other workers.
+Every worker measures this time with its own clock, from the last change of the heartbeat counter it has seen
+(modification times in a shared file system come from the clocks of other nodes, which may differ).
+
+The wrapper waits at most FLYCOP_WORK_QUEUE_TIMEOUT seconds (default 21600, 0: no deadline) for the result.
+Then, or if it is stopped by SMAC (SIGTERM), the job is cancelled (see 'cancel_job') and the wrapper exits
+with an error, so that SMAC registers the run as crashed. Results that nobody is waiting for (cancelled
+jobs, dead wrappers) are removed from done/ by the idle workers (see 'remove_orphan_results').
+
+RESULTS OF REMOTE WORKERS. The results store (SQLite in WAL mode, see 'EcPp3_generalized_results_store.py')
+and the index of the flux archives only work in a local file system. A worker on the node of the wrapper
+(same host) writes the results to the results folder of the wrapper (dirPlots), as the wrapper itself would do.
+A worker on another node evaluates the configuration with a staging results folder in its local file system,
+initialized with the copy of the results store of the wrapper (evaluation cache, multi-fidelity promotion,
+incumbent), and posts back the new configurations, the new entries of the flux index and the new files
+(see 'evaluate_remote'). The wrapper inserts them into its own results store and results folder (see 'import_results').
+
+Call of a worker (from MicrobialCommunities, on every node):
+
+    python3 -W ignore ../Scripts/EcPp3_work_queue.py <spool folder>
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import socket
+import signal
+import tempfile
+import threading
+
+import EcPp3_generalized_results_store  # Standard modules only (sqlite3), so that the wrapper starts fast
+
+POLL_INTERVAL = 1.0  # Seconds between checks of the spool (wrapper and idle workers)
+HEARTBEAT_INTERVAL = 60  # Seconds between heartbeats of a running job
+STALE_TIMEOUT = 600  # Seconds without heartbeat before a running job is requeued
+JOB_TIMEOUT = 6*3600  # Seconds the wrapper waits for the result of a job (FLYCOP_WORK_QUEUE_TIMEOUT)
+ORPHAN_TIMEOUT = 600  # Seconds before a result nobody is waiting for is removed from done/
+SPOOL_FOLDERS = ("tmp", "pending", "running", "heartbeat", "done", "cancelled", "stores", "results")
+STOP_FILE = "STOP"
+
+
+
+###############################################################################
+### FUNCTION work_queue #######################################################
+
+def work_queue():
+    return os.environ.get("FLYCOP_WORK_QUEUE", "")
+
+### end-function-work_queue
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION create_spool #####################################################
+
+def create_spool(spool):
+    for folder in SPOOL_FOLDERS:
+        os.makedirs(os.path.join(spool, folder), exist_ok=True)
+
+### end-function-create_spool
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION write_json #######################################################
+
+# JSON FILE in the spool: written to 'tmp' and then renamed to its final name (atomic)
+# -----------------------------------------------------------------------------
+
+def write_json(spool, destination, content):
+    tmp_file = os.path.join(spool, "tmp", os.path.basename(destination)+"."+uuid.uuid4().hex)
+    with open(tmp_file, "w") as json_file:
+        json.dump(content, json_file)
+        json_file.flush()
+        os.fsync(json_file.fileno())  # Visible with its content from the other nodes
+    os.replace(tmp_file, destination)
+
+### end-function-write_json
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION submit_job #######################################################
+
+# CLIENT SIDE (wrapper): submit a configuration (SMAC arguments) to the spool
+# Job names start with the submission time, so that workers take the oldest job first.
+# results_folder: results folder of the wrapper (dirPlots), whose results store is copied to stores/ for the remote workers
+# RESULT: job name
+# -----------------------------------------------------------------------------
+
+def submit_job(spool, argv, results_folder=None):
+    create_spool(spool)
+    job = "%020d_%s_%d_%s.json" % (time.time_ns(), socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
+
+    request = {"argv": argv, "host": socket.gethostname()}
+    if results_folder is not None and EcPp3_generalized_results_store.backup_results_store(
+            os.path.join(results_folder, EcPp3_generalized_results_store.RESULTS_DATABASE), os.path.join(spool, "stores", job)):
+        request["store"] = job
+
+    write_json(spool, os.path.join(spool, "pending", job), request)
+    return job
+
+### end-function-submit_job
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION request_evaluation ###############################################
+
+# CLIENT SIDE (wrapper): submit the SMAC arguments to the work queue and wait for the result
+# Only standard modules are used, so that the wrapper starts fast.
+# results_folder: results folder of the wrapper (dirPlots, relative to the current directory), where the results
+#                 of a remote worker are imported (see 'import_results')
+# RESULT: (avgfitness, sdfitness), or None if the work queue is not used (FLYCOP_WORK_QUEUE)
+# -----------------------------------------------------------------------------
+
+def request_evaluation(argv, results_folder=None):
+    spool = work_queue()
+    if not spool:
+        return None
+
+    job_timeout = float(os.environ.get("FLYCOP_WORK_QUEUE_TIMEOUT", JOB_TIMEOUT))
+    deadline = time.monotonic()+job_timeout
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))  # Stopped by SMAC: cancel the job (below)
+
+    job = submit_job(spool, argv, results_folder)
+    result_file = os.path.join(spool, "done", job)
+    response = None
+    try:
+        while not os.path.exists(result_file):
+            if job_timeout > 0 and time.monotonic() > deadline:
+                print("ERROR! No result from the work queue in "+str(job_timeout)+" seconds (FLYCOP_WORK_QUEUE_TIMEOUT), job cancelled: "+job)
+                sys.exit(1)
+            time.sleep(POLL_INTERVAL)
+
+        with open(result_file, "r") as json_file:
+            response = json.load(json_file)
+        os.remove(result_file)
+
+        if "results" in response:  # Evaluated by a remote worker
+            import_results(spool, job, response["results"], results_folder)
+
+    finally:
+        if response is None:
+            cancel_job(spool, job)
+        remove_job_files(spool, job)
+
+    if "error" in response:
+        print("ERROR! The worker could not evaluate the configuration:")
+        print(response["error"])
+        sys.exit(1)
+
+    return response["avgfitness"], response["sdfitness"]
+
+### end-function-request_evaluation
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION import_results ###################################################
+
+# CLIENT SIDE (wrapper): results of a remote worker (see 'evaluate_remote'), imported into the results folder of the wrapper
+# The files are moved first, and then the flux archives and the configurations are registered, so that
+# the results store never refers to files which are not in the results folder yet.
+# results: {"configurations": [...], "flux_archives": [...], "files": [paths relative to the results folder]}
+# -----------------------------------------------------------------------------
+
+def import_results(spool, job, results, results_folder):
+    if results_folder is None:
+        print("ERROR! Results of a remote worker, but no results folder to import them")
+        sys.exit(1)
+
+    for file_name in results["files"]:
+        destination = os.path.join(results_folder, file_name)
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        shutil.move(os.path.join(spool, "results", job, file_name), destination)
+
+    if results["flux_archives"]:
+        import EcPp3_generalized_flux_archive
+        EcPp3_generalized_flux_archive.register_flux_archives(os.path.join(results_folder, EcPp3_generalized_flux_archive.ARCHIVE_FOLDER),
+                                                              results["flux_archives"])
+
+    EcPp3_generalized_results_store.import_configurations(os.path.join(results_folder, EcPp3_generalized_results_store.RESULTS_DATABASE),
+                                                          results["configurations"], results_folder)
+
+### end-function-import_results
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION remove_job_files #################################################
+
+# Copy of the results store (stores/) and files of a remote worker (results/) of a job
+# -----------------------------------------------------------------------------
+
+def remove_job_files(spool, job):
+    try:
+        os.remove(os.path.join(spool, "stores", job))
+    except OSError:  # No copy of the results store (or already removed)
+        pass
+    shutil.rmtree(os.path.join(spool, "results", job), ignore_errors=True)
+
+### end-function-remove_job_files
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION cancel_job #######################################################
+
+# CLIENT SIDE (wrapper): cancel a job nobody is going to wait for
+# A pending job is removed. A running job is marked as cancelled: the worker discards its result
+# (see 'worker'). A result already posted is removed.
+# -----------------------------------------------------------------------------
+
+def cancel_job(spool, job):
+    cancelled_file = os.path.join(spool, "cancelled", job)
+    write_json(spool, cancelled_file, {})
+
+    try:
+        os.remove(os.path.join(spool, "pending", job))
+        os.remove(cancelled_file)  # Never claimed: nothing else to do
+        return
+    except OSError:  # Claimed by a worker (or already finished)
+        pass
+
+    if os.path.exists(os.path.join(spool, "done", job)):
+        for finished_file in (os.path.join(spool, "done", job), cancelled_file):
+            try:
+                os.remove(finished_file)
+            except OSError:  # Removed by an idle worker (see 'remove_orphan_results')
+                pass
+
+### end-function-cancel_job
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION claim_job ########################################################
+
+# WORKER SIDE: oldest pending job, moved to 'running' (rename: only one worker succeeds)
+# worker_id: '<host>_<pid>', added to the name of the running file (every worker only removes its own files)
+# RESULT: (job name, running file, request), or None if there are no pending jobs
+# -----------------------------------------------------------------------------
+
+def claim_job(spool, worker_id):
+    for job in sorted(os.listdir(os.path.join(spool, "pending"))):
+        running_file = os.path.join(spool, "running", job+"@"+worker_id)
+        try:
+            os.rename(os.path.join(spool, "pending", job), running_file)
+        except OSError:  # Claimed by another worker
+            continue
+
+        if discard_cancelled(spool, job, running_file):
+            continue
+
+        write_json(spool, os.path.join(spool, "heartbeat", os.path.basename(running_file)), {"beat": 0})  # First heartbeat
+        with open(running_file, "r") as json_file:
+            return job, running_file, json.load(json_file)
+
+    return None
+
+### end-function-claim_job
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION discard_cancelled ################################################
+
+# WORKER SIDE: if 'job' was cancelled by the wrapper, remove its running file and its cancelled mark
+# RESULT: True if the job was cancelled
+# -----------------------------------------------------------------------------
+
+def discard_cancelled(spool, job, running_file):
+    cancelled_file = os.path.join(spool, "cancelled", job)
+    if not os.path.exists(cancelled_file):
+        return False
+
+    for job_file in (running_file, os.path.join(spool, "heartbeat", os.path.basename(running_file)), cancelled_file):
+        try:
+            os.remove(job_file)
+        except OSError:
+            pass
+    print("Cancelled job discarded: "+job)
+
+    return True
+
+### end-function-discard_cancelled
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION remove_orphan_results ############################################
+
+# WORKER SIDE: results in done/ that nobody is waiting for. Results of cancelled jobs are removed at once,
+# other results when they are still in done/ 'orphan_timeout' seconds after this worker first saw them
+# (the wrapper was killed). Times are measured with the clock of the worker only ('first_seen', in memory).
+# first_seen: dictionary, result file : time when it was first seen (time.monotonic), updated here
+# RESULT: number of results removed
+# -----------------------------------------------------------------------------
+
+def remove_orphan_results(spool, first_seen, orphan_timeout=ORPHAN_TIMEOUT):
+    n_removed = 0
+    now = time.monotonic()
+    results = set(os.listdir(os.path.join(spool, "done")))
+
+    for job in results:
+        first_seen.setdefault(job, now)
+        cancelled_file = os.path.join(spool, "cancelled", job)
+        cancelled = os.path.exists(cancelled_file)
+        if not cancelled and now - first_seen[job] <= orphan_timeout:
+            continue
+
+        try:
+            os.remove(os.path.join(spool, "done", job))
+            if cancelled:
+                os.remove(cancelled_file)
+            remove_job_files(spool, job)
+            n_removed += 1
+            print("Orphan result removed: "+job)
+        except OSError:  # Read by the wrapper, or removed by another worker
+            continue
+
+    for job in list(first_seen):
+        if job not in results:
+            del first_seen[job]
+
+    return n_removed
+
+### end-function-remove_orphan_results
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION read_heartbeat ###################################################
+
+# Heartbeat counter of a running job ('running_job': '<job>.json@<worker>'), or None if there is no heartbeat yet
+# -----------------------------------------------------------------------------
+
+def read_heartbeat(spool, running_job):
+    try:
+        with open(os.path.join(spool, "heartbeat", running_job), "r") as json_file:
+            return json.load(json_file)["beat"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+### end-function-read_heartbeat
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION requeue_stale_jobs ###############################################
+
+# WORKER SIDE: running jobs whose heartbeat counter has not changed for 'stale_timeout' seconds (dead worker), back to 'pending'
+# Only the clock of the current worker is used: 'beats_seen' keeps, for every running job, the last counter seen
+# and when it was seen (time.monotonic). A job is never stale before this worker has watched it for 'stale_timeout'.
+# beats_seen: dictionary, running job : (heartbeat counter, time), updated here
+# RESULT: number of jobs requeued
+# -----------------------------------------------------------------------------
+
+def requeue_stale_jobs(spool, beats_seen, stale_timeout=STALE_TIMEOUT):
+    n_requeued = 0
+    now = time.monotonic()
+    running_jobs = set(os.listdir(os.path.join(spool, "running")))
+
+    for running_job in running_jobs:
+        beat = read_heartbeat(spool, running_job)
+        if running_job not in beats_seen or beats_seen[running_job][0] != beat:
+            beats_seen[running_job] = (beat, now)
+            continue
+        if now - beats_seen[running_job][1] <= stale_timeout:
+            continue
+
+        running_file = os.path.join(spool, "running", running_job)
+        job = running_job.rsplit("@", 1)[0]
+        try:
+            os.rename(running_file, os.path.join(spool, "pending", job))
+        except OSError:  # Finished or requeued by another worker
+            continue
+        try:
+            os.remove(os.path.join(spool, "heartbeat", running_job))
+        except OSError:
+            pass
+        n_requeued += 1
+        print("Stale job requeued: "+job)
+
+    for running_job in list(beats_seen):
+        if running_job not in running_jobs:
+            del beats_seen[running_job]
+
+    return n_requeued
+
+### end-function-requeue_stale_jobs
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION heartbeat ########################################################
+
+# WORKER SIDE: increase the heartbeat counter of the running job until 'finished' is set (thread)
+# -----------------------------------------------------------------------------
+
+def heartbeat(spool, running_file, finished, interval=HEARTBEAT_INTERVAL):
+    heartbeat_file = os.path.join(spool, "heartbeat", os.path.basename(running_file))
+    beat = 0
+    while not finished.wait(interval):
+        if not os.path.exists(running_file):  # Requeued (i.e. the node was too slow): the result is posted anyway
+            return
+        beat += 1
+        try:
+            write_json(spool, heartbeat_file, {"beat": beat})
+        except OSError:
+            return
+
+### end-function-heartbeat
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION evaluate_remote ##################################################
+
+# WORKER SIDE: evaluation of a job submitted from another node (see RESULTS OF REMOTE WORKERS)
+# The configuration is evaluated with a staging results folder (local file system), initialized with the copy
+# of the results store of the wrapper. The new files are moved to results/<job>/ in the spool, and the new
+# configurations and flux archives are added to the response (see 'import_results').
+# RESULT: response, {"avgfitness": float, "sdfitness": float, "results": {...}} or {"error": traceback}
+# -----------------------------------------------------------------------------
+
+def evaluate_remote(spool, job, request):
+    import EcPp3_evaluation_server
+    import EcPp3_generalized_flux_archive
+
+    staging_folder = tempfile.mkdtemp(prefix="FLYCOP_results_")
+    database = os.path.join(staging_folder, EcPp3_generalized_results_store.RESULTS_DATABASE)
+    archive_folder = os.path.join(staging_folder, EcPp3_generalized_flux_archive.ARCHIVE_FOLDER)
+    try:
+        if "store" in request:
+            shutil.copyfile(os.path.join(spool, "stores", request["store"]), database)
+        last_id = EcPp3_generalized_results_store.last_configuration_id(database)
+
+        response = EcPp3_evaluation_server.evaluate_request(request["argv"], dirPlot=staging_folder+os.sep)
+        if "error" in response:
+            return response
+
+        configurations = EcPp3_generalized_results_store.export_configurations(database, last_id)
+        flux_archives = EcPp3_generalized_flux_archive.export_flux_index(archive_folder)
+
+        # New files (plots, flux archives): moved to the spool, then renamed to results/<job>/ (atomic). Not the databases
+        # (nor their -wal / -shm files) and the legacy TSV tables: written again by the wrapper (see 'import_results')
+        not_posted = (EcPp3_generalized_results_store.RESULTS_DATABASE, "configurationsResults-",
+                      os.path.join(EcPp3_generalized_flux_archive.ARCHIVE_FOLDER, EcPp3_generalized_flux_archive.ARCHIVE_INDEX))
+        results_files = []
+        tmp_folder = os.path.join(spool, "tmp", job+"."+uuid.uuid4().hex)
+        for folder, _, file_names in os.walk(staging_folder):
+            for file_name in file_names:
+                results_file = os.path.relpath(os.path.join(folder, file_name), staging_folder)
+                if results_file.startswith(not_posted):
+                    continue
+                os.makedirs(os.path.dirname(os.path.join(tmp_folder, results_file)), exist_ok=True)
+                shutil.move(os.path.join(folder, file_name), os.path.join(tmp_folder, results_file))
+                results_files.append(results_file)
+
+        if results_files:
+            os.replace(tmp_folder, os.path.join(spool, "results", job))
+        response["results"] = {"configurations": configurations, "flux_archives": flux_archives, "files": results_files}
+
+    finally:
+        shutil.rmtree(staging_folder, ignore_errors=True)
+
+    return response
+
+### end-function-evaluate_remote
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION worker ###########################################################
+
+# WORKER: pull configurations from the spool and evaluate them in the current process, until
+# the STOP file is found in the spool (or 'kill'). Modules and models are loaded only once.
+# -----------------------------------------------------------------------------
+
+def worker(spool):
+    import EcPp3_evaluation_server  # Preload the modules for the evaluation: cobra, optlang, pandas
+    import EcPp3_wrapperFLYCOP_v0_generalized
+    import EcPp3_generalized
+
+    create_spool(spool)
+    stale_timeout = float(os.environ.get("FLYCOP_WORK_QUEUE_STALE", STALE_TIMEOUT))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    orphan_timeout = float(os.environ.get("FLYCOP_WORK_QUEUE_ORPHAN", ORPHAN_TIMEOUT))
+    first_seen = {}  # Results in done/ (see 'remove_orphan_results')
+    beats_seen = {}  # Heartbeats of the running jobs (see 'requeue_stale_jobs')
+
+    worker_id = socket.gethostname()+"_"+str(os.getpid())
+    print("Worker "+worker_id+" pulling configurations from "+spool)
+    sys.stdout.flush()
+
+    while True:
+        claimed = claim_job(spool, worker_id)
+        if claimed is None:
+            if os.path.exists(os.path.join(spool, STOP_FILE)):
+                break
+            requeue_stale_jobs(spool, beats_seen, stale_timeout)
+            remove_orphan_results(spool, first_seen, orphan_timeout)
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        job, running_file, request = claimed
+
+        finished = threading.Event()
+        beat = threading.Thread(target=heartbeat, args=(spool, running_file, finished), daemon=True)
+        beat.start()
+        try:
+            if request.get("host", socket.gethostname()) == socket.gethostname():  # Results written to the results folder of the wrapper
+                response = EcPp3_evaluation_server.evaluate_request(request["argv"])
+            else:
+                response = evaluate_remote(spool, job, request)
+        finally:
+            finished.set()
+            beat.join()
+
+        if discard_cancelled(spool, job, running_file):  # Nobody is waiting for the result of a cancelled job
+            remove_job_files(spool, job)
+        else:
+            write_json(spool, os.path.join(spool, "done", job), response)
+            for job_file in (running_file, os.path.join(spool, "heartbeat", os.path.basename(running_file))):
+                if os.path.exists(job_file):
+                    os.remove(job_file)
+
+    print("Worker "+worker_id+" stopped")
+
+### end-function-worker
+###############################################################################
+
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("ERROR! Call: EcPp3_work_queue.py <spool folder>")
+        sys.exit(1)
+
+    worker(sys.argv[1])
@@ -13,11 +13,19 @@ Functions used in the current script:
 
 NOTE THAT the argument 'initial_biomass' is composed as a series of initial biomass
 values returned from SMAC, to be given to the last function as a list.
+
+If the evaluation server is running (EcPp3_evaluation_server.py, started by FLYCOP.sh),
+the wrapper is just a client: it sends the SMAC arguments to the server, which evaluates
+the configuration with the modules and models already loaded in memory. Otherwise, the
+configuration is evaluated in the current process.
+
+If the work queue is used (FLYCOP_WORK_QUEUE, see EcPp3_work_queue.py), the configuration is
+submitted to the queue instead, and evaluated by a worker on any node (batch evaluation).
 """
 
 # FOLDERS
 template_folder='EcPp3_TemplateOptimizeConsortiumV0/Comets'  # Contents
-testTemp='EcPp3_TestTempV0'  # Temporal folder
+testTemp='EcPp3_TestTempV0'  # Temporal folder (prefix of the workspace of every evaluation)
 dirPlots='../smac-output/EcPp3_PlotsScenario0/'  
 
 # OTHER VARIABLES
@@ -25,6 +33,14 @@ fitFunc = "MaxGerNar"
 maxCycles = 240  # See layout_template
 repeats = 5
 sd_cutoff = 0.1
+n_workers = 1  # COMETS repeats running in parallel (1: sequential repeats)
+min_repeats = None  # Adaptive repeats: minimum COMETS repeats before stopping in advance (None: always 'repeats')
+plots = "defer"  # Plots of COMETS runs: 'pdf' (rendered after every run), 'defer' (plot data saved, PDF rendered later), 'skip'
+comets_runner = "process"  # COMETS runner: 'process' (one JVM per COMETS run), 'batch' (one JVM for several repeats)
+memoize = True  # Evaluation cache: configurations already evaluated (same effective configuration) are not run again
+fidelities = [1.0]  # Multi-fidelity: fidelity levels (fraction of 'maxCycles'), i.e. [0.25, 1.0] for a screening of 60 cycles. Last level: full fidelity
+fidelity_mode = "horizon"  # Low fidelity: 'horizon' (shortened simulation) or 'timestep' (same simulated time, coarser time step)
+promotion_fraction = 1/3.0  # Multi-fidelity: best fraction of the configurations at a fidelity level, promoted to the next one
 
 # import cobra
 import sys
@@ -46,109 +62,165 @@ import os.path
 # import spec
 
 # Load code of individual run
+# EcPp3_generalized (cobra, optlang, pandas) is only imported when the configuration
+# is evaluated in the current process, not when it is sent to the evaluation server
 sys.path.append('../Scripts')
-import EcPp3_generalized
-
-# Number of args by command line
-n_line_args = len(sys.argv)
+import EcPp3_evaluation_server
+import EcPp3_work_queue
+import EcPp3_generalized_workspace
+import EcPp3_generalized_results_store
 
 
-# Parsing parameters
-# Reading the first 5 arguments in SMAC
-# -------------------------------------
-instance = sys.argv[1]
-specifics = sys.argv[2]
-cutoff = int(float(sys.argv[3]) + 1)
-runlength = int(sys.argv[4])
-seed = int(sys.argv[5])
 
+###############################################################################
+### FUNCTION parse_arguments ##################################################
 
-# BIOMASSES
-# SMAC returns a certain number of initial biomass values, depending on the selected consortium configuration
+# PARSING PARAMETERS GIVEN BY SMAC (command line)
+# RESULT: dictionary with the parameters for 'SelectConsortiumArchitecture'
 # -----------------------------------------------------------------------------
 
-initial_biomass = []  # List of biomass values for the strains in the current consortium architecture
-append_biomass = False
-
-for i_arg in range(6, n_line_args):
-    if append_biomass:
-        initial_biomass.append(sys.argv[i_arg])
-        append_biomass = False
+def parse_arguments(argv):
     
-    arg = sys.argv[i_arg].split("_")
-    if len(arg) > 1 and arg[1] == "biomass":
-        append_biomass = True
-
-print("Initial biomass: ", initial_biomass)
-
-# REST OF STUDY PARAMETERS OPTIMIZED BY SMAC
-# ------------------------------------------
-# UPTAKE RATES
-sucr1 = float(sys.argv[7])
-frc2 = float(sys.argv[9])
-nh4_Ec = float(sys.argv[11])
-nh4_KT = float(sys.argv[13])
-
-# FVA rates
-FVApCA = float(sys.argv[15])
-FVAfru = float(sys.argv[17])
-FVAGerNar = float(sys.argv[19])
-FVANar = float(sys.argv[21])
-
-# CONSORTIUM ARCH
-consortium_arch = sys.argv[23]
-
-
-# CREATE A TEMP FOLDER TO OPERATE IN THE CURRENT ITERATION
-# Move all files from template_folder to testTemp folder
-# --------------------------------------------------------
-# Copy the template directory
-if (os.path.exists(testTemp)):
-    shutil.rmtree(testTemp)  # Remove content (directory tree)
-try:
-    shutil.copytree(template_folder, testTemp)
+    # Number of args by command line
+    n_line_args = len(argv)
     
-# In case of exception
-except OSError as exc: # python >2.5
-    if exc.errno == errno.ENOTDIR:  # Not a directory
-        shutil.copy(template_folder, testTemp)
-    else: raise
     
-os.chdir(testTemp)  
-
-if not os.path.exists(dirPlots):
-    os.makedirs(dirPlots)
-
-
-# At a higher level: Running the wrapper-script in SMAC 
-# -----------------------------------------------------------------------------
-avgfitness,sdfitness,strains_list=EcPp3_generalized.SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, FVApCA, FVAfru, FVAGerNar, FVANar,
-                                                                                 consortium_arch, initial_biomass, \
-                                                                                 fitFunc, maxCycles, dirPlots, repeats, sd_cutoff)  
-
-# Print wrapper Output:
-# -----------------------------------------------------------------------------
-print("Wrapper Output")
-print("--------------")
-print('Result of algorithm run: SAT, 0, 0, '+str(1-avgfitness)+', 0, '+str(seed)+', '+str(sdfitness)) # fitness maximize
-# print('Result of algorithm run: SAT, 0, 0, '+str(avgfitness)+', 0, '+str(seed)+', '+str(sdfitness)) # fitness minimize
-
-# Remove the temporal dir for this run result
-os.chdir('..')  # Back to MicrobialCommunities
-# shutil.rmtree(testTemp)
-
-
-
+    # Parsing parameters
+    # Reading the first 5 arguments in SMAC
+    # -------------------------------------
+    instance = argv[1]
+    specifics = argv[2]
+    cutoff = int(float(argv[3]) + 1)
+    runlength = int(argv[4])
+    seed = int(argv[5])
+    
+    
+    # BIOMASSES
+    # SMAC returns a certain number of initial biomass values, depending on the selected consortium configuration
+    # -----------------------------------------------------------------------------
+    
+    initial_biomass = []  # List of biomass values for the strains in the current consortium architecture
+    append_biomass = False
+    
+    for i_arg in range(6, n_line_args):
+        if append_biomass:
+            initial_biomass.append(argv[i_arg])
+            append_biomass = False
+        
+        arg = argv[i_arg].split("_")
+        if len(arg) > 1 and arg[1] == "biomass":
+            append_biomass = True
+    
+    print("Initial biomass: ", initial_biomass)
+    
+    # REST OF STUDY PARAMETERS OPTIMIZED BY SMAC
+    # ------------------------------------------
+    parameters = {"initial_biomass": initial_biomass}
+    
+    # UPTAKE RATES
+    parameters["sucr1"] = float(argv[7])
+    parameters["frc2"] = float(argv[9])
+    parameters["nh4_Ec"] = float(argv[11])
+    parameters["nh4_KT"] = float(argv[13])
+    
+    # FVA rates
+    parameters["FVApCA"] = float(argv[15])
+    parameters["FVAfru"] = float(argv[17])
+    parameters["FVAGerNar"] = float(argv[19])
+    parameters["FVANar"] = float(argv[21])
+    
+    # CONSORTIUM ARCH
+    parameters["consortium_arch"] = argv[23]
+    
+    return parameters
 
+### FUNCTION parse_arguments ##################################################
+###############################################################################
 
 
 
+###############################################################################
+### FUNCTION run_configuration ################################################
 
+# EVALUATION OF A CONFIGURATION (in the current process), at the fidelity levels in 'fidelities'
+# Called by the wrapper itself or by the evaluation server (EcPp3_evaluation_server.py)
+# dirPlot: results folder, relative to the workspace (default: 'dirPlots'). Remote workers of the work queue
+#          use a staging folder in their local file system (see 'evaluate_remote' in EcPp3_work_queue.py)
+# DIR: MicrobialCommunities (before and after the evaluation)
+# RESULT: avgfitness, sdfitness
+# -----------------------------------------------------------------------------
 
+def run_configuration(parameters, dirPlot=None):
+    import EcPp3_generalized
+    if dirPlot is None:
+        dirPlot = dirPlots
+    
+    # CREATE A TEMP FOLDER (WORKSPACE) TO OPERATE IN THE CURRENT ITERATION
+    # Unique name, so that several evaluations can run at the same time in MicrobialCommunities
+    # Read-only files from template_folder are linked, not copied (see 'EcPp3_generalized_workspace.py')
+    # --------------------------------------------------------
+    workspace = EcPp3_generalized_workspace.create_workspace(template_folder, testTemp)
+        
+    os.chdir(workspace)  
+    
+    try:
+        if not os.path.exists(dirPlot):
+            os.makedirs(dirPlot)
+        
+        
+        # At a higher level: Running the wrapper-script in SMAC 
+        # MULTI-FIDELITY (successive halving): evaluation at every fidelity level, as long as the configuration
+        # is promoted (see 'promote_configuration'). A configuration not promoted gets the worst fitness stored at the
+        # last fidelity level (see 'worst_fitness'), so that SMAC only compares fitness values on the same scale
+        # -----------------------------------------------------------------------------
+        for n_level, fidelity in enumerate(fidelities):
+            avgfitness,sdfitness,strains_list=EcPp3_generalized.SelectConsortiumArchitecture(parameters["sucr1"], parameters["frc2"], parameters["nh4_Ec"], parameters["nh4_KT"], 
+                                                                                             parameters["FVApCA"], parameters["FVAfru"], parameters["FVAGerNar"], parameters["FVANar"],
+                                                                                             parameters["consortium_arch"], parameters["initial_biomass"], \
+                                                                                             fitFunc, maxCycles, dirPlot, repeats, sd_cutoff,
+                                                                                             n_workers=n_workers, min_repeats=min_repeats, plots=plots, comets_runner=comets_runner, memoize=memoize,
+                                                                                             fidelity=fidelity, fidelity_mode=fidelity_mode)
+            
+            if n_level+1 < len(fidelities) and not EcPp3_generalized.promote_configuration(dirPlot, fidelity, avgfitness, promotion_fraction):
+                worst_fitness = EcPp3_generalized_results_store.worst_fitness(dirPlot+EcPp3_generalized_results_store.RESULTS_DATABASE, fidelities[-1])
+                if worst_fitness is not None:  # Otherwise promoted anyway: no result at the last fidelity level yet
+                    print("Configuration not promoted after fidelity "+str(fidelity)+" (fitness: "+str(avgfitness)+")")
+                    avgfitness, sdfitness = worst_fitness, 0.0
+                    break
+    finally:
+        os.chdir('..')  # Back to MicrobialCommunities
+        
+        # Remove the temporal dir for this run result
+        EcPp3_generalized_workspace.remove_workspace(workspace)
+    
+    return avgfitness, sdfitness
 
+### FUNCTION run_configuration ################################################
+###############################################################################
 
 
 
+if __name__ == "__main__":
+    
+    # Work queue (if used), evaluation server (if running), otherwise evaluation in the current process
+    # -----------------------------------------------------------------------------
+    # dirPlots is relative to the workspace of the evaluation (a folder in MicrobialCommunities, see 'testTemp')
+    result = EcPp3_work_queue.request_evaluation(sys.argv[1:], results_folder=os.path.normpath(os.path.join(testTemp, dirPlots)))
+    if result is None:
+        result = EcPp3_evaluation_server.request_evaluation(sys.argv[1:])
+    if result is None:
+        parameters = parse_arguments(sys.argv)
+        avgfitness, sdfitness = run_configuration(parameters)
+    else:
+        avgfitness, sdfitness = result
+    seed = int(sys.argv[5])
+    
+    # Print wrapper Output:
+    # -----------------------------------------------------------------------------
+    print("Wrapper Output")
+    print("--------------")
+    print('Result of algorithm run: SAT, 0, 0, '+str(1-avgfitness)+', 0, '+str(seed)+', '+str(sdfitness)) # fitness maximize
+    # print('Result of algorithm run: SAT, 0, 0, '+str(avgfitness)+', 0, '+str(seed)+', '+str(sdfitness)) # fitness minimize
 
 
 
@@ -19,20 +19,38 @@ currDir=`pwd`  # FLYCOP/MicrobialCommunities (folder)
 dataAnalysisDir=${currDir}/${domainName}_scenario${id}_FLYCOPdataAnalysis
 mkdir $dataAnalysisDir
 
-seed=123
-cd smac-output/${domainName}_confFLYCOP_scenario_v${id}_generalized/state-run${seed}
+cd smac-output/${domainName}_confFLYCOP_scenario_v${id}_generalized
 
 
 # 1.- Get summary statistics file, $nRuns SMAC configurations
+# All the SMAC processes are considered (FLYCOP_SMAC_PROCESSES, see FLYCOP.sh), one state-run<seed> folder each
 # -----------------------------------------------------------
 
-tail -n${nRuns} runs_and_results-it*.csv | awk -F, '{print NR","1-$4}' > $dataAnalysisDir/fitness.csv
-paste -d, paramstrings-it*.txt $dataAnalysisDir/fitness.csv > $dataAnalysisDir/paramstrings_withFitness.csv	 # SMAC files
-egrep "WARN.*Result of algorithm run|ERROR.*The following algorithm call failed" ../log-warn${seed}.txt | awk -F'Result of algorithm run: ' '{if($2==""){print "X,X,X,1,X,X,1"}else{print $2}}' | cut -d, -f4,7 | awk -F, '{print 1-$1","$2}' > $dataAnalysisDir/avgfitnessAndStdev.txt
+rm -f $dataAnalysisDir/fitness.csv $dataAnalysisDir/paramstrings_withFitness.csv $dataAnalysisDir/avgfitnessAndStdev.txt
+nConfigs=0
+for stateDir in state-run*
+do
+	seed=${stateDir#state-run}
+	cd $stateDir
+	seedRuns=$( cat paramstrings-it*.txt | wc -l )  # Configurations evaluated by this SMAC process
+	tail -n${seedRuns} runs_and_results-it*.csv | awk -F, -v offset=${nConfigs} '{print offset+NR","1-$4}' > $dataAnalysisDir/fitness_seed${seed}.csv
+	paste -d, paramstrings-it*.txt $dataAnalysisDir/fitness_seed${seed}.csv >> $dataAnalysisDir/paramstrings_withFitness.csv	 # SMAC files
+	cat $dataAnalysisDir/fitness_seed${seed}.csv >> $dataAnalysisDir/fitness.csv
+	rm $dataAnalysisDir/fitness_seed${seed}.csv
+	egrep "WARN.*Result of algorithm run|ERROR.*The following algorithm call failed" ../log-warn${seed}.txt | awk -F'Result of algorithm run: ' '{if($2==""){print "X,X,X,1,X,X,1"}else{print $2}}' | cut -d, -f4,7 | awk -F, '{print 1-$1","$2}' >> $dataAnalysisDir/avgfitnessAndStdev.txt
+	nConfigs=$(( nConfigs + seedRuns ))
+	cd ..
+done
 
 
 # Retrieve optimal configuration
-cd ..
+# Final incumbent of the SMAC process with the best estimated quality (minimum, since quality = 1-fitness)
+# Seed 123 (single SMAC process) if the quality is not found in the log-run files
+bestLogRun=$( for logRun in log-run*.txt; do echo "${logRun} $( egrep "Estimated mean quality of final incumbent" ${logRun} | tail -1 | awk -F'test set: ' '{print $2}' | cut -d, -f1 )"; done | awk 'NF==2' | sort -g -k2 | head -1 | cut -d' ' -f1 )
+seed=${bestLogRun#log-run}
+seed=${seed%.txt}
+if [ -z "$seed" ]; then seed=123; fi
+echo "Optimal configuration taken from SMAC process (seed): " $seed
 param1=`tail log-run${seed}.txt | egrep "p01_sucr1" | awk -F'p01_sucr1' '{print $2}' | cut -d' ' -f2 | sed "s/'//g"`
 param2=`tail log-run${seed}.txt | egrep "p01_sucr1" | awk -F'p01_sucr1' '{print $2}' | cut -d' ' -f4 | sed "s/'//g"`
 param3=`tail log-run${seed}.txt | egrep "p01_sucr1" | awk -F'p01_sucr1' '{print $2}' | cut -d' ' -f6 | sed "s/'//g"`
@@ -66,6 +84,10 @@ cd $dataAnalysisDir
 mv ${domainName}_PlotsScenario${id}/configurationsResults* .
 cd ..
 
+# 2b.- Deferred plots (see 'plots' in the wrapper): PDF plots of the best configurations and of those with biomass loss
+# ---------------------------------------------------------------
+python3 -W ignore ../Scripts/${domainName}_render_deferred_plots.py $dataAnalysisDir/${domainName}_PlotsScenario${id} -d $dataAnalysisDir/configurationsResults.sqlite -k 20 -b
+
 # 3.- Individual Test for the optimal configuration
 # -------------------------------------------------
 
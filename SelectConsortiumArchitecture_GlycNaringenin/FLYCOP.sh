@@ -23,8 +23,66 @@ cd MicrobialCommunities
 nmodels_line=$( cat ../Scripts/${domainName}_confFLYCOP_params_v0_generalized.pcs | grep -n nmodels | cut -d':' -f1 )
 python3 -W ignore ../Scripts/${domainName}_define_SMAC_conditionals_arch.py ${domainName}_TemplateOptimizeConsortium${templateID}/SMAC_conditionals_arch.txt ../Scripts/${domainName}_confFLYCOP_params_v0_generalized.pcs
 
-# RUN SMAC
-smac --scenario-file ../Scripts/${domainName}_confFLYCOP_scenario_v${id}_generalized.txt --validation false --numberOfRunsLimit ${numOfRuns} > $logFile
+if [ -n "$FLYCOP_WORK_QUEUE" ]; then
+	# BATCH EVALUATION: the wrapper submits every configuration to the work queue (spool folder FLYCOP_WORK_QUEUE,
+	# in a shared file system), and the workers evaluate them: FLYCOP_LOCAL_WORKERS on this node (default 1), plus
+	# the workers started on other nodes (python3 -W ignore ../Scripts/${domainName}_work_queue.py $FLYCOP_WORK_QUEUE)
+	mkdir -p $FLYCOP_WORK_QUEUE
+	rm -f $FLYCOP_WORK_QUEUE/STOP
+	worker_pids=""
+	for n_worker in $(seq 1 ${FLYCOP_LOCAL_WORKERS:-1})
+	do
+		FLYCOP_COMETS_EVALUATIONS=${FLYCOP_COMETS_EVALUATIONS:-${FLYCOP_LOCAL_WORKERS:-1}} python3 -W ignore ../Scripts/${domainName}_work_queue.py $FLYCOP_WORK_QUEUE > ${domainName}_worker${n_worker}_log.txt 2>&1 &
+		worker_pids="$worker_pids $!"
+	done
+
+	# RUN SMAC: FLYCOP_SMAC_PROCESSES processes in shared model mode (default 1), seeds 123, 124, ...
+	# numOfRuns is split among them. The first one (seed 123) writes to $logFile. The analysis gathers all
+	# of them, and takes the optimal configuration from the best final incumbent (log-run<seed>.txt)
+	smac_processes=${FLYCOP_SMAC_PROCESSES:-1}
+	runs_per_process=$(( (numOfRuns + smac_processes - 1) / smac_processes ))
+	smac_pids=""
+	for n_smac in $(seq 0 $(( smac_processes - 1 )))
+	do
+		seed=$(( 123 + n_smac ))
+		smacLogFile=$logFile
+		if [ $n_smac -gt 0 ]; then smacLogFile=FLYCOP_${domainName}_${id}_log_seed${seed}.txt; fi
+		smac --scenario-file ../Scripts/${domainName}_confFLYCOP_scenario_v${id}_generalized.txt --validation false --numberOfRunsLimit ${runs_per_process} \
+			--seed ${seed} --shared-model-mode true > $smacLogFile &
+		smac_pids="$smac_pids $!"
+	done
+	wait $smac_pids
+
+	# STOP WORKERS (all nodes): idle workers exit when the STOP file is found
+	touch $FLYCOP_WORK_QUEUE/STOP
+	wait $worker_pids 2>/dev/null
+
+else
+	# START EVALUATION SERVER (the wrapper sends every configuration to this long-lived process)
+	export FLYCOP_EVALUATION_SOCKET=${FLYCOP_EVALUATION_SOCKET:-${domainName}_evaluation_server.sock}  # Also read by the server and the wrapper
+	socket_file=$FLYCOP_EVALUATION_SOCKET
+	rm -f $socket_file  # Socket file from a previous server
+	python3 -W ignore ../Scripts/${domainName}_evaluation_server.py > ${domainName}_evaluation_server_log.txt 2>&1 &
+	server_pid=$!
+
+	# WAIT FOR THE SERVER (modules preloaded, socket listening), at most FLYCOP_SERVER_WAIT seconds (default 300).
+	# Otherwise, the configurations are evaluated by the wrapper itself
+	for n_wait in $(seq 1 ${FLYCOP_SERVER_WAIT:-300})
+	do
+		if [ -S $socket_file ] || ! kill -0 $server_pid 2>/dev/null; then break; fi
+		sleep 1
+	done
+	if [ ! -S $socket_file ]; then
+		echo "ERROR! The evaluation server is not listening (see ${domainName}_evaluation_server_log.txt), configurations evaluated by the wrapper"
+	fi
+
+	# RUN SMAC
+	smac --scenario-file ../Scripts/${domainName}_confFLYCOP_scenario_v${id}_generalized.txt --validation false --numberOfRunsLimit ${numOfRuns} > $logFile
+
+	# STOP EVALUATION SERVER
+	kill $server_pid
+	wait $server_pid 2>/dev/null
+fi
 
 # RUN FLYCOP ANALYSIS THROUGH BASH
 bash ../Scripts/FLYCOPanalyzingResults_${domainName}.sh $id $templateID $fitness $numOfRuns $domainName "$cons_arch" $nmodels_line
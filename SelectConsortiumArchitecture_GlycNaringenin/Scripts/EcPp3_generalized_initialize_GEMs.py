@@ -29,7 +29,9 @@ Current series of initialize_update functions:
         * "initialize_models_iEC1364_W_unique_nar7glu" function: complex E.coli W model (p-coumarate + fructose secretion, glycosilation)
         * "initialize_models_iJN1463_narB12" function: basic P.putida KT2440 model
         
-Aditionally, the function 'mat_to_comets' is contained here and executed within each of the initialize_update functions.
+Aditionally, the function 'mat_to_comets' is contained here, to export a model (mat file or cobra model in memory, with
+optional bound overrides) to COMETS format (the initialize_update functions export the updated model in memory, see 
+'EcPp3_generalized_export_COMETS.py').
 
 
 -------------------------------------------------------------------------------
@@ -40,20 +42,31 @@ IMPORTANT CONSIDERATIONS FOR DEFINING AN INITIALIZE_UPDATE GEM MODEL FUNCTION
 1. Please, copy and adapt the first 6 lines from any other function here, where 
 the verification of the presence of the xml model in the expected folder is performed.
 
-2. The INITIALIZE MODEL section in your function is only executed if the model does
-not already exist in mat format; i.e. 
+2. The INITIALIZE MODEL section in your function is only executed if the base model does
+not already exist (snapshot, see 'save_base_model'); i.e. 
 
-    if not os.path.exists('your_model_name_tmp.mat'):
+    if not base_model_exists('your_model_name_tmp.pkl', 'your_model_name.xml'):
         
   In the same section, perform:
       
-      a. MODEL TRADUCTION (new to old COBRA version, since Docker uses old COBRA version)
+      a. MODEL TRADUCTION (new to old COBRA version, since Docker uses old COBRA version):
+         already performed in the compiled model, i.e. model=load_compiled_model('your_model_name.xml')
       B. MODEL ADJUSTEMENTS
+      C. SAVE BASE MODEL, i.e. save_base_model(model, 'your_model_name_tmp.pkl', 'your_model_name.xml')
       
-3. The UPDATE MODEL section in your function is only executed if the model does
-not already exists in txt format; i.e.
+3. The UPDATE MODEL section in your function adapts the base model to the current parameter values.
+The whole function is not called at all if its outputs are already cached for the same values of its
+variables in 'initialize_variables.txt' (see 'init_function_key' in 'EcPp3_generalized_model_cache.py').
 
-    if not os.path.exists('iEC1364_W_p_coumarate_tmp.mat.txt'):
+  In the same section, the updated model is kept in memory (the base model 'your_model_name_tmp.pkl'
+  is kept unchanged for later updates): export it directly to 'your_model_name_tmp.mat.txt' in the temporal
+  folder. The updated model in mat format ('your_model_name_updated_tmp.mat')
+  is only an optional artifact (see 'save_updated_model'). Every evaluation writes its own files, in its own 
+  temporal folder (see 'EcPp3_generalized_workspace.py'):
+
+    save_updated_model(model, os.path.join(temporal_folder, 'your_model_name_updated_tmp.mat'), models_summary)
+    EcPp3_generalized_export_COMETS.model_to_comets(model, os.path.join(temporal_folder, 'your_model_name_tmp.mat.txt'))
+    if models_summary: final_model_summary(os.path.join(temporal_folder, 'your_model_name_updated_tmp.mat'), model)
 
 4. Go back to the original_path at the end of your function.
 
@@ -68,11 +81,16 @@ import sys
 import re
 import collections
 import shutil
+import pickle
 
 import cobra
 import cobra.flux_analysis.variability
 from cobra import Reaction
 from cobra import Metabolite
+
+# OUR MODULES FOR FLYCOP TO WORK
+import EcPp3_generalized_export_COMETS
+import EcPp3_generalized_model_cache
 # -----------------------------------------------------------------------------
 
 
@@ -81,13 +99,16 @@ from cobra import Metabolite
 # FINAL MODEL SUMMARY, depending on the particular consortium architecture
 # MUST BE IN DIR: EcPp3_TemplateOptimizeConsortiumV0/ModelsInput
 
-def final_model_summary(strain_model):
+# model: updated cobra model, if it is already in memory (otherwise, it is loaded from 'strain_model')
+
+def final_model_summary(strain_model, model=None):
+  if model is None:
+      model = cobra.io.load_matlab_model(strain_model)
     
   if not os.path.exists("optimal_model_summary.txt"):
       with open("optimal_model_summary.txt", "w") as model_sum:
-          model = cobra.io.load_matlab_model(strain_model)
           model.optimize()
-          model_sum.write("\nMODEL SUMMARY FOR "+strain_model)
+          model_sum.write("\nMODEL SUMMARY FOR "+os.path.basename(strain_model))
           model_sum.write("\n--------------------------------------------------\n")
           model_sum.write(str(model.summary()) if not Exception else "Exception: model solution was not optimal")
           model_sum.write("\n\n")
@@ -95,9 +116,8 @@ def final_model_summary(strain_model):
       
   else:
       with open("optimal_model_summary.txt", "a") as model_sum:
-          model = cobra.io.load_matlab_model(strain_model)
           model.optimize()
-          model_sum.write("\nMODEL SUMMARY FOR "+strain_model)
+          model_sum.write("\nMODEL SUMMARY FOR "+os.path.basename(strain_model))
           model_sum.write("\n--------------------------------------------------\n")
           model_sum.write(str(model.summary()) if not Exception else "Exception: model solution was not optimal")
           model_sum.write("\n\n")
@@ -107,6 +127,238 @@ def final_model_summary(strain_model):
 ###############################################################################
 
 
+###############################################################################
+###############################################################################
+# UPDATED MODEL IN MAT FORMAT ('your_model_name_updated_tmp.mat'): optional artifact
+# The COMETS model is exported from the updated model in memory, so the mat file is only
+# saved for the individual tests (models_summary) or if FLYCOP_SAVE_MAT=1 (environment variable)
+
+def save_updated_model(model, matOutputFile, models_summary=False):
+  if models_summary or os.environ.get("FLYCOP_SAVE_MAT", "0") == "1":
+      cobra.io.save_matlab_model(model, matOutputFile)
+      
+###############################################################################
+###############################################################################
+
+
+###############################################################################
+###############################################################################
+
+# BASE MODELS (initialized models, '*_tmp.pkl'), saved as a binary snapshot and KEPT IN MEMORY
+# -----------------------------------------------------------------------------
+
+"""
+The INITIALIZE MODEL section saves the initialized (base) model as a pickled snapshot 
+('your_model_name_tmp.pkl', see 'save_base_model'), the same format as the compiled models: 
+the base model is not saved / loaded again in mat format. The mat file ('your_model_name_tmp.mat')
+is only an optional artifact, saved if FLYCOP_SAVE_MAT=1 (environment variable).
+
+The snapshot stores the checksum of the source xml model, a snapshot version and the cobra 
+version: the model is initialized again if any of them changes (see 'base_model_exists').
+
+In a long-lived process (evaluation server, see EcPp3_evaluation_server.py), every
+base model is read only once; the UPDATE MODEL section works on a copy of it.
+The model is read again if the snapshot changes (modification time or size).
+"""
+
+base_models = {}  # Absolute path of the snapshot : ((mtime, size), cobra model, checksum of the xml model)
+
+def save_base_model(model, baseModelFile, xmlInputFile):
+    snapshot = {"version": SNAPSHOT_VERSION, "cobra_version": cobra.__version__, 
+                "checksum": EcPp3_generalized_model_cache.file_checksum(xmlInputFile), "model": model}
+    tmp_file = baseModelFile+".tmp"+str(os.getpid())
+    with open(tmp_file, "wb") as snapshot_file:
+        pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, baseModelFile)
+    
+    if os.environ.get("FLYCOP_SAVE_MAT", "0") == "1":
+        cobra.io.save_matlab_model(model, os.path.splitext(baseModelFile)[0]+".mat")
+
+
+def read_base_model(baseModelFile, xmlInputFile=''):
+    try:
+        file_stat = os.stat(baseModelFile)
+    except OSError:  # Not initialized yet
+        return None
+    file_id = (file_stat.st_mtime_ns, file_stat.st_size)
+    file_path = os.path.abspath(baseModelFile)
+    
+    if file_path not in base_models or base_models[file_path][0] != file_id:
+        try:
+            with open(baseModelFile, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+        except Exception:  # Unreadable snapshot (i.e. incompatible version of a module): initialize again
+            return None
+        if (snapshot["version"], snapshot["cobra_version"]) != (SNAPSHOT_VERSION, cobra.__version__):
+            return None
+        base_models[file_path] = (file_id, snapshot["model"], snapshot["checksum"])
+        
+    if xmlInputFile and base_models[file_path][2] != EcPp3_generalized_model_cache.file_checksum(xmlInputFile):
+        return None  # The xml model has changed since the model was initialized
+    
+    return base_models[file_path][1]
+
+
+def base_model_exists(baseModelFile, xmlInputFile):
+    return read_base_model(baseModelFile, xmlInputFile) is not None
+
+
+def load_base_model(baseModelFile):
+    return read_base_model(baseModelFile).copy()
+
+###############################################################################
+###############################################################################
+
+
+###############################################################################
+###############################################################################
+
+# COMPILED MODELS: translated and repaired xml models, saved as a binary snapshot
+# -----------------------------------------------------------------------------
+
+"""
+The MODEL TRADUCTION (metabolite and reaction ids) is the same for every xml model. It is
+performed only once per xml model ('compile models' step), and the resulting cobra model is
+saved as a pickled snapshot next to the xml model ('your_model_name_compiled.pkl'). The 
+INITIALIZE MODEL section of every initialize_update function loads the model from the snapshot, 
+instead of parsing the xml model (SBML) and saving / loading it twice in mat format.
+
+The snapshot stores the checksum of the source xml model, a snapshot version and the cobra 
+version: the model is compiled again if any of them changes.
+
+        - 'compile models' step (optional, run once from 'ModelsInput'; otherwise, the models 
+          are compiled the first time they are loaded):
+            
+            python3 EcPp3_generalized_initialize_GEMs.py iEC1364_W_p_coumarate.xml iJN1463_naringeninB12.xml
+"""
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = "_compiled.pkl"
+
+def compile_model(xmlInputFile, snapshotFile=''):
+    if snapshotFile == '':
+        snapshotFile = os.path.splitext(xmlInputFile)[0]+SNAPSHOT_SUFFIX
+    model=cobra.io.read_sbml_model(xmlInputFile)
+    
+    # MODEL TRADUCTION
+    # ================
+    # Replace brackets with compartment location (e.g. "[c]") in metabolite ids by '_' (e.g. "_c") 
+    for metabolite in model.metabolites:
+      metabolite.id = re.sub('__91__c__93__',r'[c]',metabolite.id)
+      metabolite.id = re.sub('__91__p__93__$',r'[p]',metabolite.id)
+      metabolite.id = re.sub('__91__e__93__',r'[e]',metabolite.id)
+      # metabolite.id = re.sub('__',r'_',metabolite.id)
+      metabolite.compartment = ''
+      
+    # Replace brackets with compartment location (e.g. "[c]") in rxn ids by '_' (e.g. "_c") 
+    for rxn in model.reactions:
+      rxn.id = re.sub('__40__p__41__',r'(p)',rxn.id)
+      rxn.id = re.sub('__40__c__41__',r'(c)',rxn.id)
+      rxn.id = re.sub('__40__e__41__',r'(e)',rxn.id)    
+    # To solve possible problems in changing names     
+    model.repair()
+    
+    # SAVE SNAPSHOT (temporary file + rename, in case several SMAC evaluations compile the same model)
+    snapshot = {"version": SNAPSHOT_VERSION, "cobra_version": cobra.__version__, 
+                "checksum": EcPp3_generalized_model_cache.file_checksum(xmlInputFile), "model": model}
+    tmp_file = snapshotFile+".tmp"+str(os.getpid())
+    with open(tmp_file, "wb") as snapshot_file:
+        pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, snapshotFile)
+    print("Model "+os.path.basename(xmlInputFile)+" successfully compiled")
+    
+    return model
+
+
+def load_compiled_model(xmlInputFile):
+    snapshotFile = os.path.splitext(xmlInputFile)[0]+SNAPSHOT_SUFFIX
+    
+    if os.path.exists(snapshotFile):
+        try:
+            with open(snapshotFile, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            if (snapshot["version"], snapshot["cobra_version"], snapshot["checksum"]) == \
+               (SNAPSHOT_VERSION, cobra.__version__, EcPp3_generalized_model_cache.file_checksum(xmlInputFile)):
+                return snapshot["model"]
+        except Exception:  # Unreadable snapshot (i.e. incompatible version of a module): compile again
+            pass
+        
+    return compile_model(xmlInputFile, snapshotFile)
+
+###############################################################################
+###############################################################################
+
+
+###############################################################################
+###############################################################################
+
+# BATCHED FLUX VARIABILITY ANALYSIS (FVA) for several target reactions of a model
+# -----------------------------------------------------------------------------
+
+"""
+All the target reactions of a model, with their 'fraction_of_optimum', are solved in one
+pass on the same model state: the model is optimized only once, and the optimal objective
+value is shared by all the targets (instead of one optimize-then-FVA cycle per reaction).
+
+        - fva_targets: list of (reaction_id, fraction_of_optimum)
+        - processes: number of processes for the FVA (FLYCOP_FVA_PROCESSES environment variable, default 1).
+                     If > 1, the targets are solved with cobra's FVA ('processes' argument), in one call
+                     per different fraction_of_optimum.
+                     
+        - RESULT: dictionary with the former FVA shape, i.e. dictOptValue['EX_fru(e)']['maximum']
+                  Infeasible model: cobra.exceptions.Infeasible is raised, as by cobra's FVA
+        
+        EXAMPLE:
+            dictOptValue = flux_variability_batch(model, [('EX_fru(e)', 1-0.20), ('EX_T4hcinnm(e)', 1-0.20)])
+"""
+
+def flux_variability_batch(model, fva_targets, processes=None):
+    if processes is None:
+        processes = int(os.environ.get("FLYCOP_FVA_PROCESSES", 1))
+    fva_results = {}
+    
+    # FAN-OUT with cobra's FVA: one call per different fraction_of_optimum
+    if processes > 1 and len(fva_targets) > 1:
+        fva_fractions = collections.OrderedDict()
+        for reaction_id, fraction_of_optimum in fva_targets:
+            fva_fractions.setdefault(fraction_of_optimum, []).append(reaction_id)
+            
+        for fraction_of_optimum, reaction_ids in fva_fractions.items():
+            fva_table = cobra.flux_analysis.flux_variability_analysis(model, reaction_ids, fraction_of_optimum=fraction_of_optimum, processes=processes)
+            for reaction_id in reaction_ids:
+                fva_results[reaction_id] = {"minimum": float(fva_table["minimum"][reaction_id]), "maximum": float(fva_table["maximum"][reaction_id])}
+                
+        return fva_results
+    
+    # ONE PASS: the optimal objective value is shared by all the targets
+    with model:
+        optimum = model.slim_optimize(error_value=None)  # Infeasible model: exception (as cobra's FVA), not NaN bounds
+        direction = model.solver.objective.direction
+        
+        # Old objective constrained to 'fraction_of_optimum' * optimum (as in cobra's FVA)
+        fva_old_objective = model.problem.Variable("fva_old_objective", lb=None, ub=None)
+        fva_old_objective_constraint = model.problem.Constraint(model.solver.objective.expression - fva_old_objective, 
+                                                                lb=0, ub=0, name="fva_old_objective_constraint")
+        model.add_cons_vars([fva_old_objective, fva_old_objective_constraint])
+        
+        for reaction_id, fraction_of_optimum in fva_targets:
+            if direction == "max":
+                fva_old_objective.lb = fraction_of_optimum*optimum
+            else:
+                fva_old_objective.ub = fraction_of_optimum*optimum
+                
+            model.objective = model.reactions.get_by_id(reaction_id)
+            fva_results[reaction_id] = {}
+            for bound, sense in (("minimum", "min"), ("maximum", "max")):
+                model.objective_direction = sense
+                fva_results[reaction_id][bound] = model.slim_optimize()
+                
+    return fva_results
+
+###############################################################################
+###############################################################################
+
+
 ###############################################################################
 # FUNCTIONS to individually initialize GEM models   
 ###############################################################################
@@ -122,40 +374,15 @@ def initialize_models_iEC1364_W_p_coumarate(sucr1, nh4_Ec, temporal_folder, mode
   
   # ---------------------------------------------------------------------------
   # INITIALIZE MODEL
-  # Only create the model in MAT format if it does not exist yet
+  # Only create the base model (snapshot) if it does not exist yet
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iEC1364_W_p_coumarate_tmp.mat'):
+  if not base_model_exists('iEC1364_W_p_coumarate_tmp.pkl', 'iEC1364_W_p_coumarate.xml'):
       # ---------------------------------------------------------------------------
       # E. coli W for taking sucrose and excreting fructose and T4hcinnm
       # ---------------------------------------------------------------------------
-      model=cobra.io.read_sbml_model("iEC1364_W_p_coumarate.xml")
-      
-      # MODEL TRADUCTION
-      # ================
-      # Replace brackets with compartment location (e.g. "[c]") in metabolite ids by '_' (e.g. "_c") 
-      for metabolite in model.metabolites:
-        metabolite.id = re.sub('__91__c__93__',r'[c]',metabolite.id)
-        metabolite.id = re.sub('__91__p__93__$',r'[p]',metabolite.id)
-        metabolite.id = re.sub('__91__e__93__',r'[e]',metabolite.id)
-        # metabolite.id = re.sub('__',r'_',metabolite.id)
-        metabolite.compartment = ''
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_p_coumarate.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_p_coumarate.mat")
-      
-      # Replace brackets with compartment location (e.g. "[c]") in rxn ids by '_' (e.g. "_c") 
-      for rxn in model.reactions:
-        rxn.id = re.sub('__40__p__41__',r'(p)',rxn.id)
-        rxn.id = re.sub('__40__c__41__',r'(c)',rxn.id)
-        rxn.id = re.sub('__40__e__41__',r'(e)',rxn.id)    
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_p_coumarate.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_p_coumarate.mat")
+      model=load_compiled_model("iEC1364_W_p_coumarate.xml")
+      # MODEL TRADUCTION: already performed in the compiled model (see 'compile_model')
       
       
       # MODEL ADJUSTEMENTS
@@ -194,77 +421,74 @@ def initialize_models_iEC1364_W_p_coumarate(sucr1, nh4_Ec, temporal_folder, mode
       # Optimize T4hcinnm production from tyrosine
       model.reactions.get_by_id('TAL').bounds=(0,1000)  # TAL: tyr_L[c] --> T4hcinnm[c] + nh4[c]
       
-      # SAVE MODEL (tmp)
-      cobra.io.save_matlab_model(model,"iEC1364_W_p_coumarate_tmp.mat")
+      # SAVE BASE MODEL (tmp snapshot; mat file only if FLYCOP_SAVE_MAT=1)
+      save_base_model(model, "iEC1364_W_p_coumarate_tmp.pkl", "iEC1364_W_p_coumarate.xml")
       del(model)
       print("Model iEC1364_W_p_coumarate successfully initialized")
       
   # ---------------------------------------------------------------------------
   # UPDATE MODEL
-  # Only create the model in txt from mat format if it does not exist yet
+  # Model in txt from the base model, adapted to the parameter values. The outputs of the whole function are
+  # cached by 'SelectConsortiumArchitecture' (see 'init_function_key' in 'EcPp3_generalized_model_cache.py')
   # ---------------------------------------------------------------------------
-    
-  if not os.path.exists('iEC1364_W_p_coumarate_tmp.mat.txt'):
-    # ========================================================================= 
-    # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'EcoliPputidaFLYCOP_selectConsortiumArchitecture' function
-    # E.coli W model: iEC1364_W_p_coumarate_tmp, specific to '3models' architecture
-    # ========================================================================= 
-    
-    model=cobra.io.load_matlab_model('iEC1364_W_p_coumarate_tmp.mat')
-    model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, instead of 'core'
-    
-    # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli W
-    model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
-    # The rest of reactions depend on the sucr flux already specified
-    model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
-    model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
-    model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
-    model.optimize()
-    
-    # NH4 uptake rate
-    model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
+  
+  # ========================================================================= 
+  # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'EcoliPputidaFLYCOP_selectConsortiumArchitecture' function
+  # E.coli W model: iEC1364_W_p_coumarate_tmp, specific to '3models' architecture
+  # ========================================================================= 
+  
+  model=load_base_model('iEC1364_W_p_coumarate_tmp.pkl')
+  model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, instead of 'core'
+  
+  # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli W
+  model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
+  # The rest of reactions depend on the sucr flux already specified
+  model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
+  model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
+  model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
+  model.optimize()
+  
+  # NH4 uptake rate
+  model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
 
-    
-    # -------------------------------------------------------------------------
-    # FLUX VARIABILITY ANALYSIS: pCA, fructose. 20% over global objective (optimize biomass production)
-    dictOptValueFru = cobra.flux_analysis.flux_variability_analysis(model, {'EX_fru(e)'}, fraction_of_optimum=(1-0.20))
-    dictOptValuepCA = cobra.flux_analysis.flux_variability_analysis(model, {'EX_T4hcinnm(e)'}, fraction_of_optimum=((1-0.20)))
-   
-    
-    # FRUCTOSA
-    # ======================
-    FruExLimit=dictOptValueFru['EX_fru(e)']['maximum']
-    model.reactions.get_by_id("FRUtpp").bounds=(0, FruExLimit)
-    model.reactions.get_by_id("FRUtex").bounds=(-FruExLimit, 0)
-    model.reactions.get_by_id("EX_fru(e)").bounds=(FruExLimit, FruExLimit)  
-    
-    
-    # pCUMARATO
-    # ======================
-    pCALimit=dictOptValuepCA['EX_T4hcinnm(e)']['maximum']
-    model.reactions.get_by_id('T4HCINNMtpp').bounds=(pCALimit,1000)
-    model.reactions.get_by_id('T4HCINNMtex').bounds=(pCALimit,1000)
-    model.reactions.get_by_id('EX_T4hcinnm(e)').bounds=(pCALimit,pCALimit)  
-    
-    
-    cobra.io.save_matlab_model(model,'iEC1364_W_p_coumarate_tmp.mat')
-    # -------------------------------------------------------------------------
-    
-    model.optimize()
-    cobra.io.save_matlab_model(model,'iEC1364_W_p_coumarate_tmp.mat')
-    del(model)                                
-    print("Model iEC1364_W_p_coumarate successfully updated")    
-    
-    # MAT TO COMETS
-    mat_to_comets('iEC1364_W_p_coumarate_tmp.mat')
-    # =========================================================================
-    # =========================================================================
-      
-  # Copy the txt model to temporal folder where COMETS is run
-  shutil.copy("iEC1364_W_p_coumarate_tmp.mat.txt", temporal_folder)
+  
+  # -------------------------------------------------------------------------
+  # FLUX VARIABILITY ANALYSIS: pCA, fructose. 20% over global objective (optimize biomass production)
+  dictOptValue = flux_variability_batch(model, [('EX_fru(e)', 1-0.20), ('EX_T4hcinnm(e)', 1-0.20)])
+ 
+  
+  # FRUCTOSA
+  # ======================
+  FruExLimit=dictOptValue['EX_fru(e)']['maximum']
+  model.reactions.get_by_id("FRUtpp").bounds=(0, FruExLimit)
+  model.reactions.get_by_id("FRUtex").bounds=(-FruExLimit, 0)
+  model.reactions.get_by_id("EX_fru(e)").bounds=(FruExLimit, FruExLimit)  
+  
+  
+  # pCUMARATO
+  # ======================
+  pCALimit=dictOptValue['EX_T4hcinnm(e)']['maximum']
+  model.reactions.get_by_id('T4HCINNMtpp').bounds=(pCALimit,1000)
+  model.reactions.get_by_id('T4HCINNMtex').bounds=(pCALimit,1000)
+  model.reactions.get_by_id('EX_T4hcinnm(e)').bounds=(pCALimit,pCALimit)  
+  
+  
+  # -------------------------------------------------------------------------
+  
+  model.optimize()
+  save_updated_model(model, os.path.join(temporal_folder, 'iEC1364_W_p_coumarate_updated_tmp.mat'), models_summary)
+  print("Model iEC1364_W_p_coumarate successfully updated")    
+  
+  # MODEL TO COMETS (in memory, the updated model is not loaded again from a mat file)
+  EcPp3_generalized_export_COMETS.model_to_comets(model, os.path.join(temporal_folder, 'iEC1364_W_p_coumarate_tmp.mat.txt'))
   
   # MODEL SUMMARY
-  if models_summary: final_model_summary('iEC1364_W_p_coumarate_tmp.mat')
+  if models_summary: final_model_summary(os.path.join(temporal_folder, 'iEC1364_W_p_coumarate_updated_tmp.mat'), model)
+  del(model)
+  # =========================================================================
+  # =========================================================================
+      
+  # The txt model is already in the temporal folder where COMETS is run
   
   # BACK TO 'Microbial Communities' folder 
   os.chdir(path)
@@ -285,40 +509,15 @@ def initialize_models_iEC1364_W_exc_glycosilator(sucr1, nh4_Ec, temporal_folder,
   
   # ---------------------------------------------------------------------------
   # INITIALIZE MODEL
-  # Only create the model in MAT format if it does not exist yet
+  # Only create the base model (snapshot) if it does not exist yet
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iEC1364_W_exc_glycosilator_tmp.mat'):
+  if not base_model_exists('iEC1364_W_exc_glycosilator_tmp.pkl', 'iEC1364_W_unique_nar7glu.xml'):
       # ---------------------------------------------------------------------------
       # E. coli W for glycosilating naringenin
       # ---------------------------------------------------------------------------
-      model=cobra.io.read_sbml_model("iEC1364_W_unique_nar7glu.xml")
-      
-      # MODEL TRADUCTION
-      # ================
-      # Replace brackets with compartment location (e.g. "[c]") in metabolite ids by '_' (e.g. "_c") 
-      for metabolite in model.metabolites:
-        metabolite.id = re.sub('__91__c__93__',r'[c]',metabolite.id)
-        metabolite.id = re.sub('__91__p__93__$',r'[p]',metabolite.id)
-        metabolite.id = re.sub('__91__e__93__',r'[e]',metabolite.id)
-        # metabolite.id = re.sub('__',r'_',metabolite.id)
-        metabolite.compartment = ''
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_exc_glycosilator.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_exc_glycosilator.mat")
-      
-      # Replace brackets with compartment location (e.g. "[c]") in rxn ids by '_' (e.g. "_c") 
-      for rxn in model.reactions:
-        rxn.id = re.sub('__40__p__41__',r'(p)',rxn.id)
-        rxn.id = re.sub('__40__c__41__',r'(c)',rxn.id)
-        rxn.id = re.sub('__40__e__41__',r'(e)',rxn.id)    
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_exc_glycosilator.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_exc_glycosilator.mat")
+      model=load_compiled_model("iEC1364_W_unique_nar7glu.xml")
+      # MODEL TRADUCTION: already performed in the compiled model (see 'compile_model')
       
       
       # MODEL ADJUSTEMENTS
@@ -374,67 +573,65 @@ def initialize_models_iEC1364_W_exc_glycosilator(sucr1, nh4_Ec, temporal_folder,
       model.reactions.get_by_id("nar7glu_tpp").bounds = (0, 1000)  # nar7glu_tpp: nar7glu[c] --> nar7glu[p]
       model.reactions.get_by_id("nar7glu_tex").bounds = (0, 1000)  # nar7glu_tex: nar7glu[p] --> nar7glu[e]
       
-      # SAVE MODEL (tmp)
-      cobra.io.save_matlab_model(model,"iEC1364_W_exc_glycosilator_tmp.mat")
+      # SAVE BASE MODEL (tmp snapshot; mat file only if FLYCOP_SAVE_MAT=1)
+      save_base_model(model, "iEC1364_W_exc_glycosilator_tmp.pkl", "iEC1364_W_unique_nar7glu.xml")
       del(model)
       print("Model iEC1364_W_exc_glycosilator successfully initialized")
       
   # ---------------------------------------------------------------------------
   # UPDATE MODEL
-  # Only create the model in txt from mat format if it does not exist yet
+  # Model in txt from the base model, adapted to the parameter values. The outputs of the whole function are
+  # cached by 'SelectConsortiumArchitecture' (see 'init_function_key' in 'EcPp3_generalized_model_cache.py')
   # ---------------------------------------------------------------------------
-    
-  if not os.path.exists('iEC1364_W_exc_glycosilator_tmp.mat.txt'):
-    # =========================================================================
-    # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
-    # E.coli W model: iEC1364_W_exc_glycosilator_tmp, specific to '3models' architecture
-    # =========================================================================
-    
-    model=cobra.io.load_matlab_model('iEC1364_W_exc_glycosilator_tmp.mat')
-    model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, instead of 'core'
-    
-    # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli W
-    model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
-    # The rest of reactions depend on the sucr flux already specified
-    model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
-    model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
-    model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
-    model.optimize()
-    
-    # NH4 uptake rate
-    model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
+  
+  # =========================================================================
+  # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
+  # E.coli W model: iEC1364_W_exc_glycosilator_tmp, specific to '3models' architecture
+  # =========================================================================
+  
+  model=load_base_model('iEC1364_W_exc_glycosilator_tmp.pkl')
+  model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, instead of 'core'
+  
+  # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli W
+  model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
+  # The rest of reactions depend on the sucr flux already specified
+  model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
+  model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
+  model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
+  model.optimize()
+  
+  # NH4 uptake rate
+  model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
 
-    
-    # -------------------------------------------------------------------------
-    # FLUX VARIABILITY ANALYSIS: glycosilated naringenin. 20% over global objective (optimize biomass production)
-    dictOptValueglycnar = cobra.flux_analysis.flux_variability_analysis(model, {'EX_nar7glu(e)'}, fraction_of_optimum=((1-0.20)))
-   
-    # Glycosilated naringenin
-    # =======================
-    GlycNarLimit=dictOptValueglycnar['EX_nar7glu(e)']['maximum']
-    model.reactions.get_by_id("nar7glu_tpp").bounds=(GlycNarLimit, 1000)  
-    model.reactions.get_by_id("nar7glu_tex").bounds=(GlycNarLimit, 1000)  
-    model.reactions.get_by_id("EX_nar7glu(e)").bounds=(GlycNarLimit, GlycNarLimit)  
-    
-    
-    cobra.io.save_matlab_model(model,'iEC1364_W_exc_glycosilator_tmp.mat')
-    # -------------------------------------------------------------------------
-    
-    model.optimize()
-    cobra.io.save_matlab_model(model,'iEC1364_W_exc_glycosilator_tmp.mat')
-    del(model)                                    
-    print("Model iEC1364_W_exc_glycosilator successfully updated")
-    
-    # MAT TO COMETS
-    mat_to_comets('iEC1364_W_exc_glycosilator_tmp.mat')
-    # =========================================================================
-    # =========================================================================
   
-  # Copy the txt model to temporal folder where COMETS is run
-  shutil.copy("iEC1364_W_exc_glycosilator_tmp.mat.txt", temporal_folder)
+  # -------------------------------------------------------------------------
+  # FLUX VARIABILITY ANALYSIS: glycosilated naringenin. 20% over global objective (optimize biomass production)
+  dictOptValue = flux_variability_batch(model, [('EX_nar7glu(e)', 1-0.20)])
+ 
+  # Glycosilated naringenin
+  # =======================
+  GlycNarLimit=dictOptValue['EX_nar7glu(e)']['maximum']
+  model.reactions.get_by_id("nar7glu_tpp").bounds=(GlycNarLimit, 1000)  
+  model.reactions.get_by_id("nar7glu_tex").bounds=(GlycNarLimit, 1000)  
+  model.reactions.get_by_id("EX_nar7glu(e)").bounds=(GlycNarLimit, GlycNarLimit)  
+  
+  
+  # -------------------------------------------------------------------------
+  
+  model.optimize()
+  save_updated_model(model, os.path.join(temporal_folder, 'iEC1364_W_exc_glycosilator_updated_tmp.mat'), models_summary)
+  print("Model iEC1364_W_exc_glycosilator successfully updated")
+  
+  # MODEL TO COMETS (in memory, the updated model is not loaded again from a mat file)
+  EcPp3_generalized_export_COMETS.model_to_comets(model, os.path.join(temporal_folder, 'iEC1364_W_exc_glycosilator_tmp.mat.txt'))
   
   # MODEL SUMMARY
-  if models_summary: final_model_summary('iEC1364_W_exc_glycosilator_tmp.mat')
+  if models_summary: final_model_summary(os.path.join(temporal_folder, 'iEC1364_W_exc_glycosilator_updated_tmp.mat'), model)
+  del(model)
+  # =========================================================================
+  # =========================================================================
+  
+  # The txt model is already in the temporal folder where COMETS is run
   
   # BACK TO 'Microbial Communities' folder  
   os.chdir(path)
@@ -455,40 +652,15 @@ def initialize_models_iEC1364_W_unique_nar7glu(sucr1, nh4_Ec, temporal_folder, m
   
   # ---------------------------------------------------------------------------
   # INITIALIZE MODEL
-  # Only create the model in MAT format if it does not exist yet
+  # Only create the base model (snapshot) if it does not exist yet
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iEC1364_W_unique_nar7glu_tmp.mat'):
+  if not base_model_exists('iEC1364_W_unique_nar7glu_tmp.pkl', 'iEC1364_W_unique_nar7glu.xml'):
       # ---------------------------------------------------------------------------
       # E. coli W for taking sucrose and excreting fructose
       # ---------------------------------------------------------------------------
-      model=cobra.io.read_sbml_model("iEC1364_W_unique_nar7glu.xml")
-      
-      # MODEL TRADUCTION
-      # ================
-      # Replace brackets with compartment location (e.g. "[c]") in metabolite ids by '_' (e.g. "_c") 
-      for metabolite in model.metabolites:
-        metabolite.id = re.sub('__91__c__93__',r'[c]',metabolite.id)
-        metabolite.id = re.sub('__91__p__93__$',r'[p]',metabolite.id)
-        metabolite.id = re.sub('__91__e__93__',r'[e]',metabolite.id)
-        # metabolite.id = re.sub('__',r'_',metabolite.id)
-        metabolite.compartment = ''
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_unique_nar7glu.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_unique_nar7glu.mat")
-      
-      # Replace brackets with compartment location (e.g. "[c]") in rxn ids by '_' (e.g. "_c") 
-      for rxn in model.reactions:
-        rxn.id = re.sub('__40__p__41__',r'(p)',rxn.id)
-        rxn.id = re.sub('__40__c__41__',r'(c)',rxn.id)
-        rxn.id = re.sub('__40__e__41__',r'(e)',rxn.id)    
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iEC1364_W_unique_nar7glu.mat")
-      del(model)
-      model = cobra.io.load_matlab_model("iEC1364_W_unique_nar7glu.mat")
+      model=load_compiled_model("iEC1364_W_unique_nar7glu.xml")
+      # MODEL TRADUCTION: already performed in the compiled model (see 'compile_model')
       
       # MODEL ADJUSTEMENTS
       # ==================
@@ -540,87 +712,84 @@ def initialize_models_iEC1364_W_unique_nar7glu(sucr1, nh4_Ec, temporal_folder, m
       model.reactions.get_by_id("nar7glu_tpp").bounds = (0, 1000)  # nar7glu_tpp: nar7glu[c] --> nar7glu[p]
       model.reactions.get_by_id("nar7glu_tex").bounds = (0, 1000)  # nar7glu_tex: nar7glu[p] --> nar7glu[e]
       
-      # SAVE MODEL (tmp)
-      cobra.io.save_matlab_model(model,"iEC1364_W_unique_nar7glu_tmp.mat")
+      # SAVE BASE MODEL (tmp snapshot; mat file only if FLYCOP_SAVE_MAT=1)
+      save_base_model(model, "iEC1364_W_unique_nar7glu_tmp.pkl", "iEC1364_W_unique_nar7glu.xml")
       del(model)
       print("Model iEC1364_W_unique_nar7glu successfully initialized")
       
   
   # ---------------------------------------------------------------------------
   # UPDATE MODEL
-  # Only create the model in txt from mat format if it does not exist yet
+  # Model in txt from the base model, adapted to the parameter values. The outputs of the whole function are
+  # cached by 'SelectConsortiumArchitecture' (see 'init_function_key' in 'EcPp3_generalized_model_cache.py')
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iEC1364_W_unique_nar7glu_tmp.mat.txt'):
-    # ========================================================================= 
-    # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
-    # E.coli W model: iEC1364_W_unique_nar7glu_tmp, specific to '2models' architecture
-    # ========================================================================= 
-    
-    model=cobra.io.load_matlab_model('iEC1364_W_unique_nar7glu_tmp.mat')
-    model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, en lugar de 'core'
-    
-    # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli
-    model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
-    # The rest of reactions depend on the sucr flux already specified
-    model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
-    model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
-    model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
-    model.optimize()
-    
-    # NH4 uptake rate
-    model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
+  # ========================================================================= 
+  # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
+  # E.coli W model: iEC1364_W_unique_nar7glu_tmp, specific to '2models' architecture
+  # ========================================================================= 
+  
+  model=load_base_model('iEC1364_W_unique_nar7glu_tmp.pkl')
+  model.objective = "BIOMASS_Ec_iJO1366_WT_53p95M"  # WT, en lugar de 'core'
+  
+  # This reaction ('EX_sucr(e)') controls the global sucr exchange flux for E. coli
+  model.reactions.get_by_id("EX_sucr(e)").bounds=(sucr1, 0)
+  # The rest of reactions depend on the sucr flux already specified
+  model.reactions.get_by_id("SUCtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]  
+  model.reactions.get_by_id("SUCRtpp").bounds=(0, 1000)  # sucr[p] --> sucr[c]
+  model.reactions.get_by_id("SUCRtex").bounds=(0, 1000)  # sucr[e] --> sucr[p]
+  model.optimize()
+  
+  # NH4 uptake rate
+  model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_Ec, 0)
 
-    
-    # -------------------------------------------------------------------------
-    # FLUX VARIABILITY ANALYSIS: pCA, fructose, glycosilated naringenin. 20% over global objective (optimize biomass production)
-    # dictOptValueFru = cobra.flux_analysis.flux_variability_analysis(model, {'EX_fru(e)'}, fraction_of_optimum=(1-0.20))  # SBC
-    dictOptValuepCA = cobra.flux_analysis.flux_variability_analysis(model, {'EX_T4hcinnm(e)'}, fraction_of_optimum=((1-0.20)))
-    dictOptValueglycnar = cobra.flux_analysis.flux_variability_analysis(model, {'EX_nar7glu(e)'}, fraction_of_optimum=((1-0.20)))
-   
-    
-    # FRUCTOSE --> SBC
-    # ======================
-    # FruExLimit=dictOptValueFru['EX_fru(e)']['maximum']
-    # model.reactions.get_by_id("FRUtpp").bounds=(0, FruExLimit)
-    # model.reactions.get_by_id("FRUtex").bounds=(-FruExLimit, 0)
-    # model.reactions.get_by_id("EX_fru(e)").bounds=(FruExLimit, FruExLimit)  
-    
-    
-    # p-COUMARATE
-    # ======================
-    pCALimit=dictOptValuepCA['EX_T4hcinnm(e)']['maximum']
-    model.reactions.get_by_id('T4HCINNMtpp').bounds=(pCALimit,1000)
-    model.reactions.get_by_id('T4HCINNMtex').bounds=(pCALimit,1000)
-    model.reactions.get_by_id('EX_T4hcinnm(e)').bounds=(pCALimit,pCALimit)  
-    
-    
-    # Glycosilated naringenin
-    # =======================
-    GlycNarLimit=dictOptValueglycnar['EX_nar7glu(e)']['maximum']
-    model.reactions.get_by_id("nar7glu_tpp").bounds=(GlycNarLimit, 1000)  
-    model.reactions.get_by_id("nar7glu_tex").bounds=(GlycNarLimit, 1000)  
-    model.reactions.get_by_id("EX_nar7glu(e)").bounds=(GlycNarLimit, GlycNarLimit)  
-    
-    
-    cobra.io.save_matlab_model(model,'iEC1364_W_unique_nar7glu_tmp.mat')
-    # -------------------------------------------------------------------------
-    
-    model.optimize()
-    cobra.io.save_matlab_model(model,'iEC1364_W_unique_nar7glu_tmp.mat')
-    del(model)           
-    print("Model iEC1364_W_unique_nar7glu successfully updated")   
-                  
-    # MAT TO COMETS
-    mat_to_comets('iEC1364_W_unique_nar7glu_tmp.mat')
-    # =========================================================================
-    # =========================================================================
-    
-  # Copy the txt model to temporal folder where COMETS is run
-  shutil.copy("iEC1364_W_unique_nar7glu_tmp.mat.txt", temporal_folder)
+  
+  # -------------------------------------------------------------------------
+  # FLUX VARIABILITY ANALYSIS: pCA, fructose, glycosilated naringenin. 20% over global objective (optimize biomass production)
+  # dictOptValueFru = cobra.flux_analysis.flux_variability_analysis(model, {'EX_fru(e)'}, fraction_of_optimum=(1-0.20))  # SBC
+  dictOptValue = flux_variability_batch(model, [('EX_T4hcinnm(e)', 1-0.20), ('EX_nar7glu(e)', 1-0.20)])
+ 
+  
+  # FRUCTOSE --> SBC
+  # ======================
+  # FruExLimit=dictOptValueFru['EX_fru(e)']['maximum']
+  # model.reactions.get_by_id("FRUtpp").bounds=(0, FruExLimit)
+  # model.reactions.get_by_id("FRUtex").bounds=(-FruExLimit, 0)
+  # model.reactions.get_by_id("EX_fru(e)").bounds=(FruExLimit, FruExLimit)  
+  
+  
+  # p-COUMARATE
+  # ======================
+  pCALimit=dictOptValue['EX_T4hcinnm(e)']['maximum']
+  model.reactions.get_by_id('T4HCINNMtpp').bounds=(pCALimit,1000)
+  model.reactions.get_by_id('T4HCINNMtex').bounds=(pCALimit,1000)
+  model.reactions.get_by_id('EX_T4hcinnm(e)').bounds=(pCALimit,pCALimit)  
+  
+  
+  # Glycosilated naringenin
+  # =======================
+  GlycNarLimit=dictOptValue['EX_nar7glu(e)']['maximum']
+  model.reactions.get_by_id("nar7glu_tpp").bounds=(GlycNarLimit, 1000)  
+  model.reactions.get_by_id("nar7glu_tex").bounds=(GlycNarLimit, 1000)  
+  model.reactions.get_by_id("EX_nar7glu(e)").bounds=(GlycNarLimit, GlycNarLimit)  
+  
+  
+  # -------------------------------------------------------------------------
+  
+  model.optimize()
+  save_updated_model(model, os.path.join(temporal_folder, 'iEC1364_W_unique_nar7glu_updated_tmp.mat'), models_summary)
+  print("Model iEC1364_W_unique_nar7glu successfully updated")   
+  
+  # MODEL TO COMETS (in memory, the updated model is not loaded again from a mat file)
+  EcPp3_generalized_export_COMETS.model_to_comets(model, os.path.join(temporal_folder, 'iEC1364_W_unique_nar7glu_tmp.mat.txt'))
   
   # MODEL SUMMARY
-  if models_summary: final_model_summary('iEC1364_W_unique_nar7glu_tmp.mat')
+  if models_summary: final_model_summary(os.path.join(temporal_folder, 'iEC1364_W_unique_nar7glu_updated_tmp.mat'), model)
+  del(model)
+  # =========================================================================
+  # =========================================================================
+    
+  # The txt model is already in the temporal folder where COMETS is run
   
   # BACK TO 'Microbial Communities' folder  
   os.chdir(path)
@@ -641,40 +810,15 @@ def initialize_models_iJN1463_narB12(frc2, nh4_KT, temporal_folder, models_summa
   
   # ---------------------------------------------------------------------------
   # INITIALIZE MODEL
-  # Only create the model in MAT format if it does not exist yet
+  # Only create the base model (snapshot) if it does not exist yet
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iJN1463_naringeninB12_tmp.mat'):
+  if not base_model_exists('iJN1463_naringeninB12_tmp.pkl', 'iJN1463_naringeninB12.xml'):
       # ---------------------------------------------------------------------------
       # P.putida KT2440 model for taking fructose and secreting B12
       # ---------------------------------------------------------------------------
-      model=cobra.io.read_sbml_model('iJN1463_naringeninB12.xml')
-    
-      # MODEL TRADUCTION
-      # ================
-      # Replace brackets with compartment location (e.g. "[c]") in metabolite ids by '_' (e.g. "_c") 
-      for metabolite in model.metabolites:
-        metabolite.id = re.sub('__91__c__93__',r'[c]',metabolite.id)
-        metabolite.id = re.sub('__91__p__93__$',r'[p]',metabolite.id)
-        metabolite.id = re.sub('__91__e__93__',r'[e]',metabolite.id)
-        # metabolite.id = re.sub('__',r'_',metabolite.id)
-        metabolite.compartment = ''
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iJN1463_naringeninB12.mat")
-      del(model)
-      model=cobra.io.load_matlab_model('iJN1463_naringeninB12.mat') 
-      
-      # Replace brackets with compartment location (e.g. "[c]") in rxn ids by '_' (e.g. "_c") 
-      for rxn in model.reactions:
-        rxn.id = re.sub('__40__p__41__',r'(p)',rxn.id)
-        rxn.id = re.sub('__40__c__41__',r'(c)',rxn.id)
-        rxn.id = re.sub('__40__e__41__',r'(e)',rxn.id)    
-      # To solve possible problems in changing names     
-      model.repair()
-      cobra.io.save_matlab_model(model,"iJN1463_naringeninB12.mat")
-      del(model)
-      model=cobra.io.load_matlab_model('iJN1463_naringeninB12.mat') 
+      model=load_compiled_model('iJN1463_naringeninB12.xml')
+      # MODEL TRADUCTION: already performed in the compiled model (see 'compile_model')
       
       
       # MODEL ADJUSTEMENTS
@@ -719,62 +863,61 @@ def initialize_models_iJN1463_narB12(frc2, nh4_KT, temporal_folder, models_summa
       model.reactions.get_by_id("naringenintex").bounds = (0, 1000)  # naringenintex: nar[p] --> nar[e]
       model.reactions.get_by_id("naringenintpp").bounds = (0, 1000)  # naringenintpp: nar[c] --> nar[p]
       
-      # SAVE MODEL (tmp)
-      cobra.io.save_matlab_model(model,"iJN1463_naringeninB12_tmp.mat")
+      # SAVE BASE MODEL (tmp snapshot; mat file only if FLYCOP_SAVE_MAT=1)
+      save_base_model(model, "iJN1463_naringeninB12_tmp.pkl", "iJN1463_naringeninB12.xml")
       del(model)
       print("Model initialize_models_iJN1463_narB12 successfully initialized")
       
   # ---------------------------------------------------------------------------
   # UPDATE MODEL
-  # Only create the model in txt from mat format if it does not exist yet
+  # Model in txt from the base model, adapted to the parameter values. The outputs of the whole function are
+  # cached by 'SelectConsortiumArchitecture' (see 'init_function_key' in 'EcPp3_generalized_model_cache.py')
   # ---------------------------------------------------------------------------
   
-  if not os.path.exists('iJN1463_naringeninB12_tmp.mat.txt'):
-    # =========================================================================
-    # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
-    # P.putida KT2440 model: iJN1463_naringeninB12_tmp
-    # =========================================================================
-    
-    model=cobra.io.load_matlab_model('iJN1463_naringeninB12_tmp.mat')
-    model.objective = "BIOMASS_KT2440_WT3"  # WT, en lugar de 'core'  - asegurar objetivo biomasa (clave)
-    
-    # This reaction ('EX_fru(e)') controls the global fru exchange flux for P. putida KT
-    model.reactions.get_by_id("EX_fru(e)").bounds=(frc2, 0)
-    # The rest of reactions depend on the 'fru' flux already specified
-    model.reactions.get_by_id("FRUtex").bounds=(0, 1000)   # fru[e] --> fru[p]
-    model.reactions.get_by_id("FRUptspp").bounds=(0, 1000)   # fru[p] + pep[c] --> f1p[c] + pyr[c]
-    model.optimize()
-    
-    # NH4 uptake rate
-    model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_KT, 0)
+  # =========================================================================
+  # MODEL ADAPTATION TO THE PARAMETERS PASSED TO THE 'SelectConsortiumArchitecture' function
+  # P.putida KT2440 model: iJN1463_naringeninB12_tmp
+  # =========================================================================
+  
+  model=load_base_model('iJN1463_naringeninB12_tmp.pkl')
+  model.objective = "BIOMASS_KT2440_WT3"  # WT, en lugar de 'core'  - asegurar objetivo biomasa (clave)
+  
+  # This reaction ('EX_fru(e)') controls the global fru exchange flux for P. putida KT
+  model.reactions.get_by_id("EX_fru(e)").bounds=(frc2, 0)
+  # The rest of reactions depend on the 'fru' flux already specified
+  model.reactions.get_by_id("FRUtex").bounds=(0, 1000)   # fru[e] --> fru[p]
+  model.reactions.get_by_id("FRUptspp").bounds=(0, 1000)   # fru[p] + pep[c] --> f1p[c] + pyr[c]
+  model.optimize()
+  
+  # NH4 uptake rate
+  model.reactions.get_by_id("EX_nh4(e)").bounds=(nh4_KT, 0)
 
-    
-    # -------------------------------------------------------------------------
-    # FLUX VARIABILITY ANALYSIS: naringenin. 15% over global objective (optimize biomass production)
-    dictNarValue=cobra.flux_analysis.variability.flux_variability_analysis(model,{'EX_nar(e)'},fraction_of_optimum=(1 - 0.20))
-    NarLimit=dictNarValue['EX_nar(e)']['maximum']
-    
-    model.reactions.get_by_id('matB').bounds=(0, NarLimit)
-    model.reactions.get_by_id('naringenintpp').bounds=(NarLimit,1000)
-    model.reactions.get_by_id('naringenintex').bounds=(NarLimit,1000)
-    model.reactions.get_by_id('EX_nar(e)').bounds=(NarLimit,NarLimit)
-    # -------------------------------------------------------------------------
-    
-    model.optimize()
-    cobra.io.save_matlab_model(model,'iJN1463_naringeninB12_tmp.mat')
-    del(model)
-    print("Model initialize_models_iJN1463_narB12 successfully updated")
-    
-    # MAT TO COMETS
-    mat_to_comets('iJN1463_naringeninB12_tmp.mat')
-    # =========================================================================
-    # =========================================================================
   
-  # Copy the txt model to temporal folder where COMETS is run
-  shutil.copy("iJN1463_naringeninB12_tmp.mat.txt", temporal_folder)
+  # -------------------------------------------------------------------------
+  # FLUX VARIABILITY ANALYSIS: naringenin. 15% over global objective (optimize biomass production)
+  dictNarValue = flux_variability_batch(model, [('EX_nar(e)', 1 - 0.20)])
+  NarLimit=dictNarValue['EX_nar(e)']['maximum']
+  
+  model.reactions.get_by_id('matB').bounds=(0, NarLimit)
+  model.reactions.get_by_id('naringenintpp').bounds=(NarLimit,1000)
+  model.reactions.get_by_id('naringenintex').bounds=(NarLimit,1000)
+  model.reactions.get_by_id('EX_nar(e)').bounds=(NarLimit,NarLimit)
+  # -------------------------------------------------------------------------
+  
+  model.optimize()
+  save_updated_model(model, os.path.join(temporal_folder, 'iJN1463_naringeninB12_updated_tmp.mat'), models_summary)
+  print("Model initialize_models_iJN1463_narB12 successfully updated")
+  
+  # MODEL TO COMETS (in memory, the updated model is not loaded again from a mat file)
+  EcPp3_generalized_export_COMETS.model_to_comets(model, os.path.join(temporal_folder, 'iJN1463_naringeninB12_tmp.mat.txt'))
   
   # MODEL SUMMARY
-  if models_summary: final_model_summary('iJN1463_naringeninB12_tmp.mat')
+  if models_summary: final_model_summary(os.path.join(temporal_folder, 'iJN1463_naringeninB12_updated_tmp.mat'), model)
+  del(model)
+  # =========================================================================
+  # =========================================================================
+  
+  # The txt model is already in the temporal folder where COMETS is run
   
   # BACK TO 'Microbial Communities' folder  
   os.chdir(path)
@@ -789,64 +932,26 @@ def initialize_models_iJN1463_narB12(frc2, nh4_KT, temporal_folder, models_summa
 
 ###############################################################################   
 ### FUNCTION mat_to_comets ####################################################    
-# mat_to_comets(modelPath)
-def mat_to_comets(matInputFile):
-    model=cobra.io.load_matlab_model(matInputFile)
-    # Open output file:
-    with open(matInputFile+'.txt', mode='w') as f:
-        # Print the S matrix
-        f.write("SMATRIX  "+str(len(model.metabolites))+"  "+str(len(model.reactions))+"\n")
-        for x in range(len(model.metabolites)):
-            for y in range(len(model.reactions)):
-                if (model.metabolites[x] in model.reactions[y].metabolites):
-                    coeff=model.reactions[y].get_coefficient(model.metabolites[x])
-                    f.write("    "+str(x+1)+"   "+str(y+1)+"   "+str(coeff)+"\n")
-        f.write("//\n")
-        
-        # Print the bounds
-        f.write("BOUNDS  -1000  1000\n");
-        for y in range(len(model.reactions)):
-            lb=model.reactions[y].lower_bound
-            up=model.reactions[y].upper_bound
-            f.write("    "+str(y+1)+"   "+str(lb)+"   "+str(up)+"\n")
-        f.write("//\n")
-        
-        # Print the objective reaction
-        f.write('OBJECTIVE\n')
-        for y in range(len(model.reactions)):
-            if (model.reactions[y] in model.objective):   # Cambio línea ejecución Docker
-            # if (str(model.reactions[y].id) in str(model.objective.expression)):  # Cambio línea ejecución MiOrdenador
-                indexObj=y+1
-        f.write("    "+str(indexObj)+"\n")
-        f.write("//\n")
-        
-        # Print metabolite names
-        f.write("METABOLITE_NAMES\n")
-        for x in range(len(model.metabolites)):
-            f.write("    "+model.metabolites[x].id+"\n")
-        f.write("//\n")
-
-        # Print reaction names
-        f.write("REACTION_NAMES\n")
-        for y in range(len(model.reactions)):
-            f.write("    "+model.reactions[y].id+"\n")
-        f.write("//\n")
-
-        # Print exchange reactions
-        f.write("EXCHANGE_REACTIONS\n")
-        for y in range(len(model.reactions)):
-            if (model.reactions[y].id.find('EX_')==0):
-                f.write(" "+str(y+1))
-        f.write("\n//\n")            
+# mat_to_comets(modelPath, cometsOutputFile)
+# mat_to_comets(model, cometsOutputFile, bounds): cobra model in memory (i.e. compiled base model), 
+# with optional bound overrides {reaction id: (lower bound, upper bound)}
+# Default cometsOutputFile: modelPath+'.txt'
+def mat_to_comets(matInputFile, cometsOutputFile='', bounds=None):
+    if isinstance(matInputFile, cobra.Model):
+        model=matInputFile
+    else:
+        model=cobra.io.load_matlab_model(matInputFile)
+        if not cometsOutputFile:
+            cometsOutputFile = matInputFile+'.txt'
+    # Sparse (COO) export, only the BOUNDS section for a known stoichiometry, see 'EcPp3_generalized_export_COMETS.py'
+    EcPp3_generalized_export_COMETS.model_to_comets(model, cometsOutputFile, bounds)
     del(model)
 ### end-function-mat_to_comets    
 ###############################################################################
 
 
 
-
-
-
-
-
-
+# 'COMPILE MODELS' STEP: python3 EcPp3_generalized_initialize_GEMs.py your_model_name.xml [...]
+if __name__ == "__main__":
+    for xmlInputFile in sys.argv[1:]:
+        compile_model(xmlInputFile)
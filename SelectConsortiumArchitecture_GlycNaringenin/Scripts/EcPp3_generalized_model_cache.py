@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+MODEL CACHE
+-------------------------------------------------------------------------------
+In the current script, a content-addressed cache for the outputs of the initialize_update
+functions (COMETS model files, '*_tmp.mat.txt') is defined, so that an initialize function
+(model loading, FVA + COMETS export) is not called when its outputs have already been
+computed for the same parameter values (SMAC revisits many parameter combinations).
+
+Series of functions:
+
+    - "evict_cached_models" function: bound the size of the cache (LRU eviction of whole cached entries)
+    - "code_sources" function: source code of a function and of the functions / FLYCOP modules it calls
+    - "init_function_key" function: key for an initialize function, from its dependencies in 'initialize_variables.txt'
+    - "folder_state" function: files of a folder (size, modification time, inode), to find the outputs of an initialize function
+    - "get_cached_init" function: link the outputs of a cached initialize function to the working folder
+    - "store_cached_init" function: store the outputs of an initialize function in the cache
+
+
+-------------------------------------------------------------------------------
+DEPENDENCY-AWARE CACHE OF THE INITIALIZE FUNCTIONS
+-------------------------------------------------------------------------------
+
+Every initialize function registered in 'initialize_models.txt' depends only on the parameters listed
+for it in 'initialize_variables.txt' (i.e. initialize_models_iJN1463_narB12: frc2, nh4_KT, FVANar).
+'SelectConsortiumArchitecture' caches the outputs of every initialize function (files written to the
+temporal folder) by exactly those parameter values, plus the xml models in 'ModelsInput' and the code
+of the function and of every helper it calls (i.e. 'flux_variability_batch', 'load_compiled_model', the
+'EcPp3_generalized_export_COMETS.py' module; see 'code_sources'), the cobra version and 'INIT_CACHE_VERSION'. When the outputs are cached, the function is not called at all (no model loading, no FVA):
+a change in 'sucr1' never runs again the initialize functions of P. putida.
+
+
+-------------------------------------------------------------------------------
+CACHE DIRECTORY AND SIZE
+-------------------------------------------------------------------------------
+
+    - FLYCOP_MODEL_CACHE_DIR (environment variable): shared cache directory.
+      Default: 'ModelCache' folder inside 'ModelsInput' (current directory of the
+      initialize_update functions), which is shared by all SMAC evaluations.
+
+    - FLYCOP_MODEL_CACHE_MAX_MB (environment variable): maximum size of the cache (MB).
+      Default: 1024 MB. The least recently used models are removed first.
+
+    - 'CometsSections' folder: invariant sections of every base model (SMATRIX, names...), from which
+      the COMETS models are spliced (see 'EcPp3_generalized_export_COMETS.py'). Not bounded in size:
+      one entry per base model.
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import sys
+import json
+import inspect
+import hashlib
+
+# OUR MODULES FOR FLYCOP TO WORK
+import EcPp3_generalized_workspace
+# -----------------------------------------------------------------------------
+
+
+# DEFAULT CACHE PARAMETERS
+# -----------------------------------------------------------------------------
+CACHE_FOLDER = "ModelCache"
+CACHE_MAX_MB = 1024
+CACHE_SUFFIX = ".mat.txt"  # Outputs of a cached initialize function ('<key>.<n>.mat.txt')
+INIT_SUFFIX = ".init.json"  # Manifest of a cached initialize function ('<key>.init.json', output file : cached file)
+INIT_CACHE_VERSION = 1  # Increase it to invalidate all the cached outputs of the initialize functions
+INPUT_FOLDER = "ModelsInput"  # xml models, and default cache folder (current directory of the initialize functions)
+
+xml_checksums = {}  # Checksum of xml models already read in the current process: (path, mtime, size) : checksum
+# -----------------------------------------------------------------------------
+
+
+###############################################################################
+### FUNCTION cache_directory ##################################################
+
+def cache_directory(default_folder=CACHE_FOLDER):
+    cache_dir = os.environ.get("FLYCOP_MODEL_CACHE_DIR", os.path.abspath(default_folder))
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+### end-function-cache_directory
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION file_checksum ####################################################
+
+# SHA-256 of a given file (xml model), read in blocks
+# -----------------------------------------------------------------------------
+
+def file_checksum(file):
+    file_stat = os.stat(file)
+    file_id = (os.path.abspath(file), file_stat.st_mtime_ns, file_stat.st_size)
+
+    if file_id not in xml_checksums:
+        checksum = hashlib.sha256()
+        with open(file, "rb") as model_file:
+            for block in iter(lambda: model_file.read(1 << 20), b""):
+                checksum.update(block)
+        xml_checksums[file_id] = checksum.hexdigest()
+
+    return xml_checksums[file_id]
+
+### end-function-file_checksum
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION evict_cached_models ##############################################
+
+# REMOVE THE LEAST RECENTLY USED ENTRIES UNTIL THE CACHE FITS IN 'FLYCOP_MODEL_CACHE_MAX_MB'
+# Every entry (cached initialize function) is evicted as a whole: manifest ('<key>.init.json') first, then its
+# outputs ('<key>.<n>.mat.txt'), so that no manifest is left pointing to evicted outputs (or the other way around).
+# -----------------------------------------------------------------------------
+
+def evict_cached_models(cache_dir):
+    max_size = float(os.environ.get("FLYCOP_MODEL_CACHE_MAX_MB", CACHE_MAX_MB)) * 1024 * 1024
+
+    cached_entries = {}  # key : [last access, size, files]
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith(CACHE_SUFFIX) or file_name.endswith(INIT_SUFFIX):
+            try:
+                file_stat = os.stat(os.path.join(cache_dir, file_name))
+            except OSError:
+                continue
+            entry = cached_entries.setdefault(file_name.split(".")[0], [0, 0, []])
+            entry[0] = max(entry[0], file_stat.st_mtime)
+            entry[1] += file_stat.st_size
+            entry[2].append(file_name)
+
+    cache_size = sum([entry_size for _, entry_size, _ in cached_entries.values()])
+    for _, entry_size, file_names in sorted(cached_entries.values()):  # Oldest access first
+        if cache_size <= max_size:
+            break
+        for file_name in sorted(file_names, key=lambda file_name: not file_name.endswith(INIT_SUFFIX)):  # Manifest first
+            try:
+                os.remove(os.path.join(cache_dir, file_name))
+            except OSError:  # Already removed by another SMAC evaluation
+                pass
+        cache_size -= entry_size
+
+### end-function-evict_cached_models
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION code_sources #####################################################
+
+# SOURCE CODE OF A FUNCTION AND OF EVERYTHING IT CALLS, recursively: functions of the same module
+# (i.e. 'flux_variability_batch' for an initialize function) and FLYCOP modules ('EcPp3_*', whole module)
+# RESULT: dictionary, name of the function / module : source code
+# -----------------------------------------------------------------------------
+
+def code_sources(function, sources=None):
+    if sources is None:
+        sources = {}
+    sources[function.__module__+"."+function.__qualname__] = inspect.getsource(function)
+
+    # Global names used by the function (and by its nested functions, comprehensions...)
+    names, code_objects = set(), [function.__code__]
+    while code_objects:
+        code_object = code_objects.pop()
+        names.update(code_object.co_names)
+        code_objects.extend([constant for constant in code_object.co_consts if inspect.iscode(constant)])
+
+    for name in sorted(names):
+        called = function.__globals__.get(name)
+        if inspect.isfunction(called) and called.__module__ == function.__module__:
+            if called.__module__+"."+called.__qualname__ not in sources:
+                code_sources(called, sources)
+        elif inspect.ismodule(called) and called.__name__.startswith("EcPp3_"):
+            module_sources(called, sources)
+
+    return sources
+
+
+def module_sources(module, sources):
+    if module.__name__ in sources:
+        return
+    sources[module.__name__] = inspect.getsource(module)
+
+    for called in list(vars(module).values()):  # FLYCOP modules imported by the module
+        if inspect.ismodule(called) and called.__name__.startswith("EcPp3_"):
+            module_sources(called, sources)
+
+### end-function-code_sources
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION init_function_key ################################################
+
+# KEY FOR THE OUTPUTS OF AN INITIALIZE FUNCTION IN THE CACHE
+# init_function: initialize function (i.e. from 'XXX_generalized_initialize_GEMs.py')
+# dependencies: list of (variable name, value), the variables of the function in 'initialize_variables.txt'
+# The code of the function and of its helpers (see 'code_sources'), the cobra version, 'INIT_CACHE_VERSION' and the xml
+# models in 'input_folder' are part of the key: any change invalidates the cached outputs.
+# -----------------------------------------------------------------------------
+
+def init_function_key(init_function, dependencies, input_folder=INPUT_FOLDER):
+    key = hashlib.sha256()
+    key.update(("init\t"+init_function.__name__+"\t"+str(INIT_CACHE_VERSION)).encode())
+    key.update(("\tcobra="+getattr(sys.modules.get("cobra"), "__version__", "")).encode())
+    for name, source in sorted(code_sources(init_function).items()):
+        key.update(("\t"+name+"\n").encode())
+        key.update(source.encode())
+
+    for file_name in sorted(os.listdir(input_folder)):
+        if file_name.endswith(".xml"):
+            key.update(("\t"+file_name+":"+file_checksum(os.path.join(input_folder, file_name))).encode())
+
+    for variable, value in dependencies:
+        key.update(("\t"+variable+"="+repr(value)).encode())
+
+    return key.hexdigest()
+
+### end-function-init_function_key
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION folder_state #####################################################
+
+# FILES OF A FOLDER: file name : (size, modification time, inode)
+# -----------------------------------------------------------------------------
+
+def folder_state(folder):
+    state = {}
+    for file_name in os.listdir(folder):
+        if os.path.isfile(os.path.join(folder, file_name)):
+            file_stat = os.stat(os.path.join(folder, file_name))
+            state[file_name] = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+
+    return state
+
+### end-function-folder_state
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION get_cached_init ##################################################
+
+# LINK THE CACHED OUTPUTS OF AN INITIALIZE FUNCTION (if they exist) TO 'folder' (hardlink, or copy if not possible)
+# RESULT: True if all the outputs were found in the cache, False otherwise (the function has to be called)
+# -----------------------------------------------------------------------------
+
+def get_cached_init(key, folder, input_folder=INPUT_FOLDER):
+    cache_dir = cache_directory(os.path.join(input_folder, CACHE_FOLDER))
+
+    try:
+        with open(os.path.join(cache_dir, key+INIT_SUFFIX), "r") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        for file_name, cached_name in manifest.items():
+            cached_file = os.path.join(cache_dir, cached_name)
+            EcPp3_generalized_workspace.link_or_copy(cached_file, os.path.join(folder, file_name), symlink=False)
+            os.utime(cached_file)  # Last access (LRU eviction)
+        os.utime(os.path.join(cache_dir, key+INIT_SUFFIX))
+    except (OSError, ValueError):  # Not in the cache, or some output evicted in the meantime
+        return False
+
+    return True
+
+### end-function-get_cached_init
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION store_cached_init ################################################
+
+# STORE THE OUTPUTS OF AN INITIALIZE FUNCTION IN THE CACHE: files of 'folder' new or modified since 'previous_state'
+# (see 'folder_state'). Every output is stored as a cached model ('<key>.<n>.mat.txt', LRU eviction), and the
+# manifest (output file : cached file) is written last, so that other SMAC evaluations never read partial outputs.
+# -----------------------------------------------------------------------------
+
+def store_cached_init(key, folder, previous_state, input_folder=INPUT_FOLDER):
+    cache_dir = cache_directory(os.path.join(input_folder, CACHE_FOLDER))
+
+    outputs = sorted([file_name for file_name, file_state in folder_state(folder).items() if previous_state.get(file_name) != file_state])
+    if not outputs:  # i.e. xml model not found in 'ModelsInput': nothing to cache
+        return
+
+    manifest = {}
+    for n_output, file_name in enumerate(outputs):
+        cached_name = key+"."+str(n_output)+CACHE_SUFFIX
+        tmp_file = os.path.join(cache_dir, cached_name+".tmp"+str(os.getpid()))
+        EcPp3_generalized_workspace.link_or_copy(os.path.join(folder, file_name), tmp_file, symlink=False)
+        os.replace(tmp_file, os.path.join(cache_dir, cached_name))
+        manifest[file_name] = cached_name
+
+    tmp_file = os.path.join(cache_dir, key+INIT_SUFFIX+".tmp"+str(os.getpid()))
+    with open(tmp_file, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(tmp_file, os.path.join(cache_dir, key+INIT_SUFFIX))
+
+    evict_cached_models(cache_dir)
+
+### end-function-store_cached_init
+###############################################################################
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FLYCOP - SelectConsortiumArchitecture pipeline
+Module added in October 2026 (authorship: see the git history)
+"""
+
+###############################################################################
+# SCRIPT DESCRIPTION
+###############################################################################
+
+"""
+PLOTS OF COMETS RUNS
+-------------------------------------------------------------------------------
+In the current script, the plot of every COMETS run (biomass of every strain and concentration of
+the metabolites to track vs. time) is generated in the current process, with matplotlib (non-interactive
+Agg backend), from the COMETS array (see 'EcPp3_generalized_parse_COMETS.py'). It replaces the
+shell / R toolchain ('plot_biomassX2_vs_4mediaItem_generalized.sh', 'plot.biomassX2.vs.4substrate_generalized.r'),
+with the same plot design.
+
+Plots can also be deferred (i.e. during SMAC runs): the plot data is saved ('.npz', compressed), and
+the PDF is rendered later, only for the runs of interest.
+
+Series of functions:
+
+    - "plot_comets" function: PDF plot from the COMETS array
+    - "save_plot_data" function: plot data (COMETS array, metabolites, strains, title) for a deferred plot
+    - "plot_from_data" function: PDF plot from the plot data saved for a deferred plot
+
+
+-------------------------------------------------------------------------------
+PLOT MODES (parameter 'plots' in 'SelectConsortiumArchitecture')
+-------------------------------------------------------------------------------
+
+    - 'pdf': the PDF is rendered after every COMETS run
+    - 'defer': the plot data is saved instead ('<plot name>.npz'), to render the PDF later
+    - 'skip': no plot
+
+"""
+# -----------------------------------------------------------------------------
+
+
+# MODULES
+# -----------------------------------------------------------------------------
+import os
+import numpy as np
+# -----------------------------------------------------------------------------
+
+
+PLOT_MODES = ("pdf", "defer", "skip")
+PLOT_DATA_SUFFIX = ".npz"
+
+# 6 colours are given since O2 is not represented (i.e. we do not need 7 colours, just 6)
+METABOLITE_COLORS = ["blue", "black", "darkmagenta", "yellow", "orange", "aquamarine"]
+
+# Biomass colours, as in the R script: colors()[99:(98+n_strains)]
+BIOMASS_COLORS = ["#68228B", "#8B0000", "#E9967A", "#8FBC8F", "#C1FFC1", "#B4EEB4"]
+
+
+
+###############################################################################
+### FUNCTION plot_comets ######################################################
+
+# PDF PLOT FROM THE COMETS ARRAY (see 'EcPp3_generalized_parse_COMETS.py')
+# Left axis: biomass of every strain (g/L), dashed lines. Right axis: concentration of the metabolites (mM), solid lines.
+
+# metabolites: metabolites to track, in the order of the COMETS array (only the first 6 are plotted)
+# timeStep: COMETS time step (h), i.e. time = cycle * timeStep
+# -----------------------------------------------------------------------------
+
+def plot_comets(CometsArray, plot_file, metabolites, strains_list, title, colors=METABOLITE_COLORS, timeStep=0.1):
+    from matplotlib.figure import Figure  # Figure API: Agg / PDF backends, no pyplot (interactive) state
+
+    n_metabolites = len(metabolites)
+    hours = CometsArray[:, n_metabolites] * timeStep
+    biomass = CometsArray[:, n_metabolites+1:n_metabolites+1+len(strains_list)]
+    n_plotted = min(len(colors), n_metabolites)
+    concentrations = CometsArray[:, :n_plotted]
+
+    figure = Figure(figsize=(7, 7))
+    biomass_axis = figure.add_subplot(1, 1, 1)
+    metabolite_axis = biomass_axis.twinx()
+
+    # BIOMASS
+    # =======
+    lines = []
+    for n_strain, strain in enumerate(strains_list):
+        lines += biomass_axis.plot(hours, biomass[:, n_strain], linestyle="--", linewidth=3,
+                                   color=BIOMASS_COLORS[n_strain % len(BIOMASS_COLORS)], label=strain)
+    biomass_axis.set_ylim(0, np.nanmax(biomass) if np.isfinite(biomass).any() else 1)
+    biomass_axis.set_xlabel("time(h)")
+    biomass_axis.set_ylabel("biomass (gr/L)")
+
+    # METABOLITES
+    # ===========
+    metabolite_lines = []
+    for n_metabolite in range(n_plotted):
+        metabolite_lines += metabolite_axis.plot(hours, concentrations[:, n_metabolite], linestyle="-", linewidth=4,
+                                                 color=colors[n_metabolite], label=metabolites[n_metabolite])
+    metabolite_axis.set_ylim(0, np.nanmax(concentrations) if np.isfinite(concentrations).any() and np.nanmax(concentrations) > 0 else 1)
+    metabolite_axis.set_ylabel("metabolite Conc. (mM)")
+
+    # LEGEND AND TITLE FOR THE PLOT
+    # =============================
+    metabolite_axis.legend(metabolite_lines+lines, [line.get_label() for line in metabolite_lines+lines], loc="center left", fontsize=6)
+    biomass_axis.set_title(title, fontsize=8)
+
+    figure.savefig(plot_file)
+
+### end-function-plot_comets
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION save_plot_data ###################################################
+
+# PLOT DATA FOR A DEFERRED PLOT ('.npz', compressed), written to a temporary file and then renamed
+# -----------------------------------------------------------------------------
+
+def save_plot_data(CometsArray, data_file, metabolites, strains_list, title, timeStep=0.1):
+    tmp_file = data_file+".tmp"+str(os.getpid())
+    with open(tmp_file, "wb") as plot_data:
+        np.savez_compressed(plot_data, CometsArray=CometsArray, metabolites=np.array(metabolites), strains_list=np.array(strains_list),
+                            title=np.array(title), timeStep=np.array(timeStep))
+    os.replace(tmp_file, data_file)
+
+### end-function-save_plot_data
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION plot_from_data ###################################################
+
+# PDF PLOT FROM THE PLOT DATA OF A DEFERRED PLOT (see 'save_plot_data')
+# -----------------------------------------------------------------------------
+
+def plot_from_data(data_file, plot_file):
+    with np.load(data_file) as plot_data:
+        plot_comets(plot_data["CometsArray"], plot_file, plot_data["metabolites"].tolist(), plot_data["strains_list"].tolist(),
+                    str(plot_data["title"]), timeStep=float(plot_data["timeStep"]))
+
+### end-function-plot_from_data
+###############################################################################
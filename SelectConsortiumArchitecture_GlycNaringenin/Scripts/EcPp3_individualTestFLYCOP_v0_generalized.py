@@ -25,6 +25,7 @@ n_line_args = len(sys.argv)
 # OTHER VARIABLES
 maxCycles = 240
 sd_cutoff = 0.1
+n_workers = 1  # COMETS repeats running in parallel (1: sequential repeats)
 
 
 # STUDY PARAMETERS OPTIMIZED BY SMAC
@@ -47,7 +48,7 @@ initial_biomass = [float(init_biomass) for init_biomass in initial_biomass_str.s
 # RUN EXECUTION
 avgfitness,sdfitness,strains_list=EcPp3_generalized.SelectConsortiumArchitecture(sucr1, frc2, nh4_Ec, nh4_KT, consortium_arch, initial_biomass, \
                                                                     fitObj='MaxGlycNar', maxCycles = 240, dirPlot='', repeat=5, sd_cutoff = sd_cutoff,
-                                                                    models_summary=True)
+                                                                    models_summary=True, n_workers=n_workers)
     
 print("\nComplete individualTest execution\n")
 
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+"""
+RENDERING OF DEFERRED PLOTS, after a FLYCOP run.
+
+During SMAC runs, the plots of the COMETS runs are deferred ('plots' in the wrapper): only the
+plot data of every run is stored in the plots folder (dirPlot), as '<baseConfig>_run<i>_<fitness>_<endCycle>.npz'
+(see 'EcPp3_generalized_plot_COMETS.py'). The current script renders the PDFs (same name, '.pdf')
+for the configurations of interest only, selected from the results store ('configurationsResults.sqlite'):
+
+    - the best configurations by average fitness (fitFunc), option -k / --top
+    - the configurations with biomass loss (BiomassLoss = 1), option -b / --biomass-loss
+    Both options only select full fidelity evaluations (screening evaluations of the multi-fidelity mode are not ranked).
+    - all the configurations with plot data, if no option is given
+
+Configurations are rendered in parallel (one task per configuration), option -p / --processes
+(default: number of CPUs).
+
+Call (i.e. from MicrobialCommunities, see 'FLYCOPanalyzingResults_EcPp3.sh'):
+
+    python3 -W ignore ../Scripts/EcPp3_render_deferred_plots.py <plots folder> [-d <results store>] [-k <top>] [-b] [-p <processes>]
+
+Results store: by default, 'configurationsResults.sqlite' in the plots folder.
+"""
+
+import os
+import sys
+import getopt
+import concurrent.futures
+
+import EcPp3_generalized_plot_COMETS
+import EcPp3_generalized_results_store
+
+
+
+###############################################################################
+### FUNCTION deferred_plots ###################################################
+
+# PLOT DATA FILES IN THE PLOTS FOLDER, grouped by base configuration
+# RESULT: dictionary, base configuration : list of plot data files
+# -----------------------------------------------------------------------------
+
+def deferred_plots(plots_folder):
+    plot_files = {}
+    for file_name in sorted(os.listdir(plots_folder)):
+        if not file_name.endswith(EcPp3_generalized_plot_COMETS.PLOT_DATA_SUFFIX) or "_run" not in file_name:
+            continue
+
+        base_config = file_name.rsplit("_run", 1)[0]  # '<baseConfig>_run<i>_<fitness>_<endCycle>.npz'
+        plot_files.setdefault(base_config, []).append(os.path.join(plots_folder, file_name))
+
+    return plot_files
+
+### end-function-deferred_plots
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION render_configuration #############################################
+
+# PDF PLOTS OF ALL THE RUNS OF A CONFIGURATION (PDF next to its plot data, unless it already exists)
+# RESULT: list of PDF files rendered
+# -----------------------------------------------------------------------------
+
+def render_configuration(data_files):
+    rendered = []
+    for data_file in data_files:
+        plot_file = data_file[:-len(EcPp3_generalized_plot_COMETS.PLOT_DATA_SUFFIX)]+".pdf"
+        if not os.path.isfile(plot_file):
+            EcPp3_generalized_plot_COMETS.plot_from_data(data_file, plot_file)
+            rendered.append(plot_file)
+
+    return rendered
+
+### end-function-render_configuration
+###############################################################################
+
+
+
+###############################################################################
+### FUNCTION render_deferred_plots ############################################
+
+# PDF PLOTS FOR THE SELECTED CONFIGURATIONS, in parallel (one task per configuration)
+# top, biomass_loss: selection criteria (see 'select_configurations' in 'EcPp3_generalized_results_store.py')
+# RESULT: number of PDF files rendered
+# -----------------------------------------------------------------------------
+
+def render_deferred_plots(plots_folder, database="", top=None, biomass_loss=False, processes=None):
+    if not database:
+        database = os.path.join(plots_folder, EcPp3_generalized_results_store.RESULTS_DATABASE)
+
+    plot_files = deferred_plots(plots_folder)
+    if top is not None or biomass_loss:
+        base_configs = EcPp3_generalized_results_store.select_configurations(database, top=top,
+                                                                             field_values={"BiomassLoss": "1"} if biomass_loss else None)
+    else:
+        base_configs = sorted(plot_files)
+
+    selected = [plot_files[base_config] for base_config in base_configs if base_config in plot_files]
+    print("Rendering plots of "+str(len(selected))+" configurations ("+str(len(plot_files))+" with deferred plots)")
+
+    n_rendered = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        for rendered in executor.map(render_configuration, selected):
+            n_rendered += len(rendered)
+
+    print("PDF plots rendered: "+str(n_rendered))
+    return n_rendered
+
+### end-function-render_deferred_plots
+###############################################################################
+
+
+
+if __name__ == "__main__":
+    options, arguments = getopt.gnu_getopt(sys.argv[1:], "d:k:bp:", ["database=", "top=", "biomass-loss", "processes="])
+    if len(arguments) != 1:
+        print("ERROR! Call: EcPp3_render_deferred_plots.py <plots folder> [-d <results store>] [-k <top>] [-b] [-p <processes>]")
+        sys.exit(1)
+
+    parameters = {"database": "", "top": None, "biomass_loss": False, "processes": None}
+    for option, value in options:
+        if option in ("-d", "--database"): parameters["database"] = value
+        elif option in ("-k", "--top"): parameters["top"] = int(value)
+        elif option in ("-b", "--biomass-loss"): parameters["biomass_loss"] = True
+        elif option in ("-p", "--processes"): parameters["processes"] = int(value)
+
+    render_deferred_plots(arguments[0], **parameters)
@@ -0,0 +1,21 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+"""
+TESTS OF THE PURE FUNCTIONS of the SelectConsortiumArchitecture pipeline (python3 -m pytest tests)
+
+The modules shared by the three cases are identical (see 'test_shared_modules.py'),
+so they are imported from the Scripts folder of the first case.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASES = ["SelectConsortiumArchitecture_2Ssakuranetine", "SelectConsortiumArchitecture_6GeranylNar", "SelectConsortiumArchitecture_GlycNaringenin"]
+SCRIPTS = os.path.join(ROOT, CASES[0], "Scripts")
+
+sys.path.insert(0, SCRIPTS)
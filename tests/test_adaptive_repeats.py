@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import statistics
+
+import pytest
+
+import EcPp3_generalized
+
+
+# ID_SD as computed in 'SelectConsortiumArchitecture' for the repeats run
+def id_sd(fitnessList, sd_cutoff):
+    return 1 if statistics.stdev(fitnessList) > float(sd_cutoff)*statistics.mean(fitnessList) else 0
+
+
+@pytest.mark.parametrize("p, df, quantile", [(0.95, 1, 3.8415), (0.05, 4, 0.7107), (0.975, 10, 20.4832), (0.5, 100, 99.3341)])
+def test_chi2_quantile(p, df, quantile):
+    assert EcPp3_generalized.chi2_quantile(p, df) == pytest.approx(quantile, abs=1e-4)
+    assert EcPp3_generalized.chi2_cdf(EcPp3_generalized.chi2_quantile(p, df), df) == pytest.approx(p, abs=1e-9)
+
+
+def test_adaptive_repeats_single_repeat():
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0], 0.1) is None
+    assert EcPp3_generalized.adaptive_repeats_decision([], 0.1, incumbent_fitness=5.0) is None
+
+
+def test_adaptive_repeats_deterministic():
+    # With 2 repeats, only deterministic configurations are clearly stable
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 1.0], 0.1) == "stable"
+    assert EcPp3_generalized.adaptive_repeats_decision([0.0, 0.0], 0.1) == "stable"
+
+
+def test_adaptive_repeats_stable_keeps_id_sd():
+    # Low SD after 2 repeats (0.007, 0.05 would be half the maximum allowed), but the remaining repeats give ID_SD = 1:
+    # an early 'stable' stop would have reported ID_SD = 0
+    fitnessList = [1.0, 1.01, 1.5, 0.6, 1.2]
+    assert id_sd(fitnessList[:2], 0.1) == 0 and id_sd(fitnessList, 0.1) == 1
+
+    for n_repeats in range(2, len(fitnessList)):
+        assert EcPp3_generalized.adaptive_repeats_decision(fitnessList[:n_repeats], 0.1) != "stable"
+
+
+def test_adaptive_repeats_stable():
+    fitnessList = [1.0, 1.001, 0.999, 1.0005, 0.9995]
+    assert EcPp3_generalized.adaptive_repeats_decision(fitnessList, 0.1) == "stable"
+    assert id_sd(fitnessList, 0.1) == 0
+
+
+def test_adaptive_repeats_unstable():
+    fitnessList = [1.0, 3.0, 1.0, 3.0, 1.0, 3.0]
+    assert EcPp3_generalized.adaptive_repeats_decision(fitnessList, 0.1) == "unstable"
+    assert EcPp3_generalized.adaptive_repeats_decision(fitnessList, 0.1, incumbent_fitness=100.0) == "unstable"
+    assert id_sd(fitnessList, 0.1) == 1
+
+    # Same SD with 2 repeats: not enough evidence yet
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 3.0], 0.1) is None
+
+
+def test_adaptive_repeats_hopeless():
+    # Mean + 3 standard errors (1.03) below the incumbent
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 1.02, 0.98], 0.1, incumbent_fitness=5.0) == "hopeless"
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 3.0], 0.1, incumbent_fitness=100.0) == "hopeless"
+
+
+def test_adaptive_repeats_go_on():
+    # Mean + 3 standard errors (1.17) above the incumbent, SD neither clearly below nor clearly above the maximum allowed
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 1.1, 0.9], 0.1) is None
+    assert EcPp3_generalized.adaptive_repeats_decision([1.0, 1.1, 0.9], 0.1, incumbent_fitness=1.1) is None
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import EcPp3_generalized_comets_supervisor as comets_supervisor
+
+
+def batch_run(outcome):
+    return {"outcome": outcome, "returncode": 0 if outcome == "OK" else 1, "elapsed": 12.0, "max_rss_mb": 512.0}
+
+
+def test_batch_results_completed(tmp_path):
+    log_files = [str(tmp_path / ("run"+str(n_run)+".txt")) for n_run in range(3)]
+    results = comets_supervisor.batch_results(batch_run("OK"), log_files)
+
+    assert [result["outcome"] for result in results] == ["OK", "OK", "OK"]
+    assert all([result["batch_runs"] == 3 and result["elapsed"] == 12.0 for result in results])
+
+
+def test_batch_results_interrupted(tmp_path):
+    # Runs 1 and 2 started (log files), run 3 did not: only run 1 completed for sure
+    log_files = [str(tmp_path / ("run"+str(n_run)+".txt")) for n_run in range(3)]
+    for log_file in log_files[:2]:
+        open(log_file, "w").close()
+
+    results = comets_supervisor.batch_results(batch_run("TIMEOUT"), log_files)
+    assert [result["outcome"] for result in results] == ["OK", "TIMEOUT", "TIMEOUT"]
+    assert [result["returncode"] for result in results] == [1, 1, 1]
+
+
+def test_batch_results_without_log_files(tmp_path):
+    log_file = str(tmp_path / "run2.txt")
+    open(log_file, "w").close()
+
+    results = comets_supervisor.batch_results(batch_run("MEMORY"), [None, None, log_file])
+    assert [result["outcome"] for result in results] == ["OK", "OK", "MEMORY"]
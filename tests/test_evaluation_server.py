@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import json
+import socket
+import threading
+
+import pytest
+
+import EcPp3_evaluation_server as evaluation_server
+
+
+# Evaluation server stand-in: accepts one connection, reads the request and answers with 'reply' (None: no answer)
+# 'close': close the connection after the answer, or at once if there is no answer
+class FakeServer(object):
+    def __init__(self, socket_file, reply=None, close=True):
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(socket_file)
+        self.listener.listen(1)
+        self.reply = reply
+        self.close = close
+        self.requests = []
+        self.connections = []
+        self.thread = threading.Thread(target=self.serve_once, daemon=True)
+        self.thread.start()
+
+    def serve_once(self):
+        connection, address = self.listener.accept()
+        self.connections.append(connection)
+        with connection.makefile("rb") as stream:
+            self.requests.append(json.loads(stream.readline().decode()))
+        if self.reply is not None:
+            connection.sendall((json.dumps(self.reply)+"\n").encode())
+        if self.close:
+            connection.close()
+
+    def stop(self):
+        for connection in self.connections:
+            connection.close()
+        self.listener.close()
+
+
+@pytest.fixture
+def socket_file(tmp_path, monkeypatch):
+    socket_file = str(tmp_path / "evaluation.sock")
+    monkeypatch.setenv("FLYCOP_EVALUATION_SOCKET", socket_file)
+    monkeypatch.setenv("FLYCOP_EVALUATION_TIMEOUT", "0.5")
+    return socket_file
+
+
+def test_request_evaluation_no_server(socket_file):
+    assert evaluation_server.request_evaluation(["config"]) is None
+
+
+def test_request_evaluation_response(socket_file):
+    server = FakeServer(socket_file, reply={"avgfitness": 2.5, "sdfitness": 0.1})
+    try:
+        assert evaluation_server.request_evaluation(["config", "1"]) == (2.5, 0.1)
+        assert server.requests == [{"argv": ["config", "1"]}]
+    finally:
+        server.stop()
+
+
+def test_request_evaluation_closed_without_response(socket_file):
+    # Server stopped during the evaluation: evaluation in the wrapper
+    server = FakeServer(socket_file)
+    try:
+        assert evaluation_server.request_evaluation(["config"]) is None
+    finally:
+        server.stop()
+
+
+def test_request_evaluation_timeout(socket_file):
+    # Server accepts the request but never answers: still evaluating, the wrapper must not evaluate it again
+    server = FakeServer(socket_file, close=False)
+    try:
+        with pytest.raises(SystemExit) as system_exit:
+            evaluation_server.request_evaluation(["config"])
+        assert system_exit.value.code == 1
+        assert server.requests == [{"argv": ["config"]}]
+    finally:
+        server.stop()
+
+
+def test_request_evaluation_error(socket_file):
+    server = FakeServer(socket_file, reply={"error": "Traceback"})
+    try:
+        with pytest.raises(SystemExit) as system_exit:
+            evaluation_server.request_evaluation(["config"])
+        assert system_exit.value.code == 1
+    finally:
+        server.stop()
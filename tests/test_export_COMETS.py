@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import cobra
+import pytest
+
+import EcPp3_generalized_export_COMETS as export_COMETS
+
+
+# Former 'mat_to_comets' export (metabolite-by-reaction loop), for a model loaded from a mat file
+def legacy_mat_to_comets(matInputFile, cometsOutputFile):
+    model = cobra.io.load_matlab_model(matInputFile)
+    with open(cometsOutputFile, mode='w') as f:
+        f.write("SMATRIX  "+str(len(model.metabolites))+"  "+str(len(model.reactions))+"\n")
+        for x in range(len(model.metabolites)):
+            for y in range(len(model.reactions)):
+                if (model.metabolites[x] in model.reactions[y].metabolites):
+                    coeff = model.reactions[y].get_coefficient(model.metabolites[x])
+                    f.write("    "+str(x+1)+"   "+str(y+1)+"   "+str(coeff)+"\n")
+        f.write("//\n")
+
+        f.write("BOUNDS  -1000  1000\n")
+        for y in range(len(model.reactions)):
+            f.write("    "+str(y+1)+"   "+str(model.reactions[y].lower_bound)+"   "+str(model.reactions[y].upper_bound)+"\n")
+        f.write("//\n")
+
+        f.write('OBJECTIVE\n')
+        for y in range(len(model.reactions)):
+            if model.reactions[y].objective_coefficient != 0:
+                indexObj = y+1
+        f.write("    "+str(indexObj)+"\n")
+        f.write("//\n")
+
+        f.write("METABOLITE_NAMES\n")
+        for x in range(len(model.metabolites)):
+            f.write("    "+model.metabolites[x].id+"\n")
+        f.write("//\n")
+
+        f.write("REACTION_NAMES\n")
+        for y in range(len(model.reactions)):
+            f.write("    "+model.reactions[y].id+"\n")
+        f.write("//\n")
+
+        f.write("EXCHANGE_REACTIONS\n")
+        for y in range(len(model.reactions)):
+            if (model.reactions[y].id.find('EX_') == 0):
+                f.write(" "+str(y+1))
+        f.write("\n//\n")
+
+
+def small_model():
+    model = cobra.Model("small_model")
+    sucr_e = cobra.Metabolite("sucr_e", compartment="e")
+    sucr_c = cobra.Metabolite("sucr_c", compartment="c")
+    nar_c = cobra.Metabolite("nar_c", compartment="c")
+    nar_e = cobra.Metabolite("nar_e", compartment="e")
+
+    reactions = [("EX_sucr_e", {sucr_e: -1.0}, -10.0, 1000.0), ("SUCRt", {sucr_e: -1.0, sucr_c: 1.0}, 0.0, 1000.0),
+                 ("NARsynth", {sucr_c: -2.0, nar_c: 0.5}, 0.0, 1000.0), ("BIOMASS", {sucr_c: -1.5}, 0.0, 1000.0),
+                 ("NARt", {nar_c: -1.0, nar_e: 1.0}, -1000.0, 1000.0), ("EX_nar_e", {nar_e: -1.0}, 0.0, 1000.0)]
+    for reaction_id, stoichiometry, lower_bound, upper_bound in reactions:
+        reaction = cobra.Reaction(reaction_id, lower_bound=lower_bound, upper_bound=upper_bound)
+        model.add_reactions([reaction])
+        reaction.add_metabolites(stoichiometry)
+    model.objective = "BIOMASS"
+
+    return model
+
+
+@pytest.fixture
+def model_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("FLYCOP_MODEL_CACHE_DIR", str(tmp_path / "ModelCache"))
+    return tmp_path
+
+
+def test_model_to_comets_as_legacy_export(model_cache):
+    model = small_model()
+    cobra.io.save_matlab_model(model, str(model_cache / "small_model.mat"))
+    legacy_mat_to_comets(str(model_cache / "small_model.mat"), str(model_cache / "legacy.txt"))
+
+    export_COMETS.model_to_comets(model, str(model_cache / "small_model.txt"))
+    assert (model_cache / "small_model.txt").read_bytes() == (model_cache / "legacy.txt").read_bytes()
+
+    # Second export, from the stored invariant sections
+    export_COMETS.model_to_comets(model, str(model_cache / "small_model_2.txt"))
+    assert (model_cache / "small_model_2.txt").read_bytes() == (model_cache / "legacy.txt").read_bytes()
+
+
+def test_model_to_comets_bounds(model_cache):
+    model = small_model()
+    export_COMETS.model_to_comets(model, str(model_cache / "small_model.txt"), bounds={"EX_sucr_e": (-5, 0), "NARsynth": (0.1, 20)})
+
+    # Bound overrides = the same bounds in the model itself
+    model.reactions.get_by_id("EX_sucr_e").bounds = (-5, 0)
+    model.reactions.get_by_id("NARsynth").bounds = (0.1, 20)
+    cobra.io.save_matlab_model(model, str(model_cache / "small_model.mat"))
+    legacy_mat_to_comets(str(model_cache / "small_model.mat"), str(model_cache / "legacy.txt"))
+
+    assert (model_cache / "small_model.txt").read_bytes() == (model_cache / "legacy.txt").read_bytes()
+
+
+def test_model_to_comets_stoichiometry_change(model_cache):
+    model = small_model()
+    export_COMETS.model_to_comets(model, str(model_cache / "small_model.txt"))
+
+    model.reactions.get_by_id("NARsynth").add_metabolites({model.metabolites.get_by_id("nar_c"): 0.5})  # Coefficient 1.0
+    export_COMETS.model_to_comets(model, str(model_cache / "small_model.txt"))
+    cobra.io.save_matlab_model(model, str(model_cache / "small_model.mat"))
+    legacy_mat_to_comets(str(model_cache / "small_model.mat"), str(model_cache / "legacy.txt"))
+
+    assert (model_cache / "small_model.txt").read_bytes() == (model_cache / "legacy.txt").read_bytes()
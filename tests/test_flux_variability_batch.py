@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import os
+import importlib.util
+
+import cobra
+import cobra.flux_analysis
+import pytest
+
+from conftest import ROOT, CASES
+
+
+# 'EcPp3_generalized_initialize_GEMs.py' is specific to every case: the module of each case is tested
+def initialize_GEMs(case):
+    spec = importlib.util.spec_from_file_location("initialize_GEMs_"+case, os.path.join(ROOT, case, "Scripts", "EcPp3_generalized_initialize_GEMs.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Sucrose uptake (at most 10), split into fructose + glucose (biomass, objective) or naringenin
+def small_model():
+    model = cobra.Model("small_model")
+    metabolites = {metabolite_id: cobra.Metabolite(metabolite_id, compartment=metabolite_id[-1])
+                   for metabolite_id in ("sucr_e", "sucr_c", "fru_c", "glc_c", "nar_c", "fru_e", "nar_e")}
+
+    reactions = [("EX_sucr", {"sucr_e": -1.0}, -10.0, 1000.0), ("SUCRt", {"sucr_e": -1.0, "sucr_c": 1.0}, 0.0, 1000.0),
+                 ("INV", {"sucr_c": -1.0, "fru_c": 1.0, "glc_c": 1.0}, 0.0, 1000.0), ("NARS", {"sucr_c": -1.0, "nar_c": 1.0}, 0.0, 1000.0),
+                 ("BIOMASS", {"glc_c": -1.0}, 0.0, 1000.0), ("FRUt", {"fru_c": -1.0, "fru_e": 1.0}, 0.0, 1000.0),
+                 ("EX_fru", {"fru_e": -1.0}, 0.0, 1000.0), ("NARt", {"nar_c": -1.0, "nar_e": 1.0}, 0.0, 1000.0),
+                 ("EX_nar", {"nar_e": -1.0}, 0.0, 1000.0)]
+    for reaction_id, stoichiometry, lower_bound, upper_bound in reactions:
+        reaction = cobra.Reaction(reaction_id, lower_bound=lower_bound, upper_bound=upper_bound)
+        model.add_reactions([reaction])
+        reaction.add_metabolites({metabolites[metabolite_id]: coefficient for metabolite_id, coefficient in stoichiometry.items()})
+    model.objective = "BIOMASS"
+
+    return model
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("case", CASES)
+def test_flux_variability_batch_as_cobra_fva(case, processes):
+    model = small_model()
+    fva_targets = [("EX_fru", 0.8), ("EX_nar", 0.8), ("EX_sucr", 1.0)]
+
+    fva_results = initialize_GEMs(case).flux_variability_batch(model, fva_targets, processes=processes)
+
+    for reaction_id, fraction_of_optimum in fva_targets:
+        fva_table = cobra.flux_analysis.flux_variability_analysis(model, [reaction_id], fraction_of_optimum=fraction_of_optimum)
+        assert fva_results[reaction_id]["minimum"] == pytest.approx(fva_table["minimum"][reaction_id], abs=1e-6)
+        assert fva_results[reaction_id]["maximum"] == pytest.approx(fva_table["maximum"][reaction_id], abs=1e-6)
+    assert fva_results["EX_nar"]["maximum"] == pytest.approx(2.0, abs=1e-6)
+    assert model.slim_optimize() == pytest.approx(10.0, abs=1e-6)  # Model unchanged
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("case", CASES)
+def test_flux_variability_batch_infeasible(case, processes):
+    model = small_model()
+    model.reactions.get_by_id("BIOMASS").lower_bound = 20.0  # More than the sucrose uptake
+
+    with pytest.raises(cobra.exceptions.Infeasible):
+        cobra.flux_analysis.flux_variability_analysis(model, ["EX_fru"])
+    with pytest.raises(cobra.exceptions.Infeasible):  # Not NaN bounds
+        initialize_GEMs(case).flux_variability_batch(model, [("EX_fru", 0.8), ("EX_nar", 0.8)], processes=processes)
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import shutil
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import EcPp3_generalized_parse_COMETS as parse_COMETS
+
+MEDIA_LOG = """medialist = { 'glc[e]', 'o2[e]', 'nar[e]', 'MetNar[e]' };
+media_1{1} = sparse(10, 10);
+media_1{1}(1, 1) = 11.5;
+media_1{1}(2, 1) = 11.25;
+media_1{2} = sparse(10, 10);
+media_1{4} = sparse(10, 10);
+media_2{1} = sparse(10, 10);
+media_2{1}(1, 1) = 10.5;
+media_2{2} = sparse(10, 10);
+media_2{2}(10, 10) = 3.0E-4;
+media_2{4} = sparse(10, 10);
+media_2{4}(1, 1) = 0.001;
+media_3{1} = sparse(10, 10);
+media_3{1}(1, 1) = 9.0;
+media_3{2} = sparse(10, 10);
+media_3{4} = sparse(10, 10);
+media_3{4}(1, 1) = 0.002;
+"""
+
+BIOMASS_LOG = """0\t0.01\t0.02
+1\t0.011\t0.021
+2\t0.012\t0.023
+3\t0.014\t0.024
+4\t0.015\t0.026
+"""
+
+# Former preprocessing ('plot_biomassX2_vs_4mediaItem_generalized.sh'), for a given metabolite
+LEGACY_METABOLITE = r"""numMet=`head -n1 media_log_test.txt | sed "s/.*{ //" | sed "s/}.*//" | sed "s/'//g" | sed "s/, /\n/g" | egrep -w -n $1 | cut -d: -f1`
+egrep '\{'$numMet'\}' media_log_test.txt | sed "s/media_//" | sed "s/{$numMet}//" | sed "s/(\([[:digit:]]\|10\), \([[:digit:]]\|10\))//g" | sed "s/sparse.*/0.0/" | sed "s/;$//" | sed "s/\ =\ /\t/" | awk -F"\t" 'BEGIN{oldCycle=0;value=-1}{if($1!=oldCycle){print value; oldCycle=$1; value=$2}else{value=$2}}END{print value}' > media_log_substrate_$1.txt
+"""
+
+
+def legacy_comets_table(folder, metabolites):
+    with open(str(folder / "legacy_metabolite.sh"), "w") as script:
+        script.write(LEGACY_METABOLITE)
+    for metabolite in metabolites:
+        subprocess.check_call(["bash", "legacy_metabolite.sh", metabolite], cwd=str(folder))
+    with open(str(folder / "COMETS_test.txt"), "w") as table:
+        subprocess.check_call(["paste", "-d\t"]+["media_log_substrate_"+metabolite+".txt" for metabolite in metabolites]+["total_biomass_log_test.txt"],
+                              cwd=str(folder), stdout=table)
+
+    return pd.read_csv(str(folder / "COMETS_test.txt"), sep="\t", header=None).values
+
+
+@pytest.fixture
+def comets_logs(tmp_path):
+    (tmp_path / "media_log_test.txt").write_text(MEDIA_LOG)
+    (tmp_path / "total_biomass_log_test.txt").write_text(BIOMASS_LOG)
+    return tmp_path
+
+
+def test_media_log_metabolites():
+    assert parse_COMETS.media_log_metabolites(MEDIA_LOG.splitlines()[0]) == ["glc[e]", "o2[e]", "nar[e]", "MetNar[e]"]
+
+
+def test_media_log_number():
+    medialist = ["sucr[e]", "glc__D[e]", "nar[e]", "2saku[e]", "nar"]
+    assert parse_COMETS.media_log_number(medialist, "sucr") == 1  # Whole word, as 'egrep -w'
+    assert parse_COMETS.media_log_number(medialist, "2saku") == 4
+    assert parse_COMETS.media_log_number(medialist, "nar") == 5  # Exact match first
+    assert parse_COMETS.media_log_number(medialist, "glc__D[e]") == 2
+    assert parse_COMETS.media_log_number(medialist, "glc") is None
+    assert parse_COMETS.media_log_number(medialist, "o2") is None
+
+
+def test_parse_media_log(comets_logs):
+    media = parse_COMETS.parse_media_log(str(comets_logs / "media_log_test.txt"), ["MetNar", "glc", "o2"])
+
+    # Last value per cycle, -1 before the first cycle (awk initial values)
+    expected = np.array([[-1.0, -1.0, -1.0], [0.0, 11.25, 0.0], [0.001, 10.5, 3.0E-4], [0.002, 9.0, 0.0]])
+    np.testing.assert_array_equal(media, expected)
+
+
+def test_parse_media_log_unknown_metabolite(comets_logs):
+    with pytest.raises(KeyError):
+        parse_COMETS.parse_media_log(str(comets_logs / "media_log_test.txt"), ["glc", "sucr"])
+
+
+@pytest.mark.skipif(not all([shutil.which(command) for command in ("bash", "awk", "sed", "egrep", "paste")]),
+                    reason="shell tools of the former preprocessing not available")
+def test_comets_array_as_legacy_table(comets_logs):
+    metabolites = ["glc", "o2", "MetNar"]  # As in 'nutrients_to_track.txt'
+    CometsArray = parse_COMETS.comets_array(str(comets_logs / "media_log_test.txt"), str(comets_logs / "total_biomass_log_test.txt"), metabolites)
+
+    # Biomass log one row longer than the media columns: NaN, as 'paste' + pandas
+    assert CometsArray.shape == (5, 6)
+    assert np.isnan(CometsArray[4, :3]).all()
+    np.testing.assert_array_equal(CometsArray, legacy_comets_table(comets_logs, metabolites))
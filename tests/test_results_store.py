@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import os
+
+import EcPp3_generalized_results_store as results_store
+
+
+# RESULTS STORE AND LEGACY TSV TABLE
+# -----------------------------------------------------------------------------
+
+def insert_results(database, legacy_file, fitness, id_sd, fidelity=1.0):
+    return results_store.insert_configuration(database, "2_models", "MaxMetNar", "config", [("fitness", str(fitness)), ("ID_SD", str(id_sd))],
+                                              fitness, 0.1, id_sd, [{"fitness": fitness, "final_cycle": 240, "biomass_track": 0, "dead_cycles": "NoDeadTracking"}],
+                                              legacy_file=legacy_file, fidelity=fidelity)
+
+
+def test_insert_configuration_legacy_tsv(tmp_path):
+    database = str(tmp_path / results_store.RESULTS_DATABASE)
+    legacy_file = str(tmp_path / "configurationsResults-2_models.txt")
+
+    first_id = insert_results(database, legacy_file, 1.5, 0)
+    assert insert_results(database, legacy_file, 2.5, 1) == first_id+1
+    with open(legacy_file) as legacy_table:
+        assert legacy_table.read() == "fitness\tID_SD\n1.5\t0\n2.5\t1\n"
+
+    # Incomplete last line (interrupted writer): the table is exported again from the results store
+    with open(legacy_file, "a") as legacy_table:
+        legacy_table.write("3.5\t")
+    insert_results(database, legacy_file, 3.5, 0)
+    with open(legacy_file) as legacy_table:
+        assert legacy_table.read() == "fitness\tID_SD\n1.5\t0\n2.5\t1\n3.5\t0\n"
+
+
+# CONFIGURATION KEY (evaluation cache)
+# -----------------------------------------------------------------------------
+
+def test_configuration_key_numeric_format():
+    key = results_store.configuration_key("2_models", {"p1": "0.04", "p2": "10"}, ["0.1", "0.2"], 2)
+    assert key == results_store.configuration_key("2_models", {"p1": "0.040", "p2": 10.0}, [0.1, "0.20"], 2)
+
+
+def test_configuration_key_parameter_order():
+    key = results_store.configuration_key("2_models", {"p1": 1, "p2": 2}, [0.1, 0.2], 2)
+    assert key == results_store.configuration_key("2_models", {"p2": 2, "p1": 1}, [0.1, 0.2], 2)
+
+
+def test_configuration_key_inactive_biomass():
+    # Biomass of a strain not in the consortium architecture
+    key = results_store.configuration_key("2_models", {"p1": 1}, [0.1, 0.2, 0.3], 2)
+    assert key == results_store.configuration_key("2_models", {"p1": 1}, [0.1, 0.2, 0.9], 2)
+    assert key != results_store.configuration_key("3_models", {"p1": 1}, [0.1, 0.2, 0.3], 3)
+
+
+def test_configuration_key_different_configurations():
+    key = results_store.configuration_key("2_models", {"p1": "0.04", "p2": "MetNar"}, [0.1, 0.2], 2, {"maxCycles": 240})
+    assert key != results_store.configuration_key("2_models", {"p1": "0.05", "p2": "MetNar"}, [0.1, 0.2], 2, {"maxCycles": 240})
+    assert key != results_store.configuration_key("2_models", {"p1": "0.04", "p2": "GlycNar"}, [0.1, 0.2], 2, {"maxCycles": 240})
+    assert key != results_store.configuration_key("2_models", {"p1": "0.04", "p2": "MetNar"}, [0.1, 0.3], 2, {"maxCycles": 240})
+    assert key != results_store.configuration_key("2_models", {"p1": "0.04", "p2": "MetNar"}, [0.1, 0.2], 2, {"maxCycles": 120})
+
+
+# FIDELITY RANK (multi-fidelity promotion)
+# -----------------------------------------------------------------------------
+
+def insert_fitness(database, avg_fitness, fidelity):
+    results_store.insert_configuration(database, "2_models", "MaxMetNar", "config", [("fitness", str(avg_fitness))],
+                                       avg_fitness, 0.0, 0, [{"fitness": avg_fitness, "final_cycle": 10, "biomass_track": 0, "dead_cycles": "NoDeadTracking"}],
+                                       fidelity=fidelity)
+
+
+def test_fidelity_rank_no_results_store(tmp_path):
+    assert results_store.fidelity_rank(str(tmp_path / "missing.sqlite"), 0.5, 1.0) == (0, 0)
+
+
+def test_fidelity_rank(tmp_path):
+    database = str(tmp_path / results_store.RESULTS_DATABASE)
+    for avg_fitness in (1.0, 2.0, 3.0):
+        insert_fitness(database, avg_fitness, 0.5)
+    insert_fitness(database, 10.0, 1.0)
+
+    assert results_store.fidelity_rank(database, 0.5, 2.5) == (3, 1)
+    assert results_store.fidelity_rank(database, 0.5, 3.0) == (3, 0)  # Ties are not better
+    assert results_store.fidelity_rank(database, 0.5, 0.0) == (3, 3)
+    assert results_store.fidelity_rank(database, 1.0, 2.5) == (1, 1)  # Fitness at other fidelities is not comparable
+    assert results_store.fidelity_rank(database, 0.25, 2.5) == (0, 0)
+    assert os.path.isfile(database)
+
+
+def test_low_fidelity_not_in_legacy_tsv(tmp_path):
+    database = str(tmp_path / results_store.RESULTS_DATABASE)
+    legacy_file = str(tmp_path / "configurationsResults-2_models.txt")
+
+    insert_results(database, legacy_file, 1.5, 0)
+    insert_results(database, legacy_file, 9.5, 0, fidelity=0.5)  # Screening result: results store only
+    with open(legacy_file) as legacy_table:
+        assert legacy_table.read() == "fitness\tID_SD\n1.5\t0\n"
+    assert results_store.best_fitness(database) == 1.5
+    assert results_store.best_fitness(database, fidelity=0.5) == 9.5
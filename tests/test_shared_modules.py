@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import os
+import filecmp
+
+import pytest
+
+from conftest import ROOT, CASES
+
+SHARED_MODULES = ["EcPp3_evaluation_server.py", "EcPp3_generalized_comets_supervisor.py", "EcPp3_generalized_export_COMETS.py",
+                  "EcPp3_generalized_flux_archive.py", "EcPp3_generalized_layout_COMETS.py", "EcPp3_generalized_model_cache.py",
+                  "EcPp3_generalized_parse_COMETS.py", "EcPp3_generalized_plot_COMETS.py", "EcPp3_generalized_results_store.py",
+                  "EcPp3_generalized_workspace.py", "EcPp3_render_deferred_plots.py", "EcPp3_work_queue.py"]
+
+
+# The shared modules are tested in the first case only: the copies in the other cases must be identical
+@pytest.mark.parametrize("module", SHARED_MODULES)
+def test_shared_module_identical_in_every_case(module):
+    first = os.path.join(ROOT, CASES[0], "Scripts", module)
+    for case in CASES[1:]:
+        assert filecmp.cmp(first, os.path.join(ROOT, case, "Scripts", module), shallow=False), case
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+
+############ FLYCOP ############
+# Added in October 2026 (authorship: see the git history)
+################################
+
+import os
+import json
+
+import pytest
+
+import EcPp3_work_queue as work_queue
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = str(tmp_path / "spool")
+    work_queue.create_spool(spool)
+    return spool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(work_queue.time, "monotonic", lambda: now[0])
+    return now
+
+
+# CLAIM
+# -----------------------------------------------------------------------------
+
+def test_claim_oldest_job_once(spool):
+    first_job = work_queue.submit_job(spool, ["config", "1"])
+    second_job = work_queue.submit_job(spool, ["config", "2"])
+    assert first_job < second_job
+
+    job, running_file, request = work_queue.claim_job(spool, "node1_100")
+    assert job == first_job
+    assert request["argv"] == ["config", "1"] and "store" not in request
+    assert running_file == os.path.join(spool, "running", first_job+"@node1_100")
+    assert work_queue.read_heartbeat(spool, os.path.basename(running_file)) == 0
+    assert os.listdir(os.path.join(spool, "pending")) == [second_job]
+
+    assert work_queue.claim_job(spool, "node2_200")[0] == second_job
+    assert work_queue.claim_job(spool, "node1_100") is None
+
+
+def test_claim_cancelled_job(spool):
+    job = work_queue.submit_job(spool, ["config", "1"])
+    with open(os.path.join(spool, "cancelled", job), "w") as cancelled_file:
+        json.dump({}, cancelled_file)
+
+    assert work_queue.claim_job(spool, "node1_100") is None
+    for folder in ("pending", "running", "heartbeat", "cancelled"):
+        assert os.listdir(os.path.join(spool, folder)) == []
+
+
+# REQUEUE (dead workers)
+# -----------------------------------------------------------------------------
+
+def test_requeue_stale_job(spool, clock):
+    work_queue.submit_job(spool, ["config", "1"])
+    job, running_file, request = work_queue.claim_job(spool, "node1_100")
+    beats_seen = {}
+
+    assert work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600) == 0  # First seen by this worker
+    clock[0] += 600
+    assert work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600) == 0
+    clock[0] += 1
+    assert work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600) == 1
+
+    assert os.listdir(os.path.join(spool, "pending")) == [job]
+    assert os.listdir(os.path.join(spool, "running")) == []
+    assert os.listdir(os.path.join(spool, "heartbeat")) == []
+    assert work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600) == 0
+    assert beats_seen == {}  # Jobs no longer running are forgotten
+
+    assert work_queue.claim_job(spool, "node2_200")[0] == job  # Claimed again by another worker
+
+
+def test_requeue_alive_job(spool, clock):
+    work_queue.submit_job(spool, ["config", "1"])
+    job, running_file, request = work_queue.claim_job(spool, "node1_100")
+    heartbeat_file = os.path.join(spool, "heartbeat", os.path.basename(running_file))
+    beats_seen = {}
+
+    work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600)
+    for beat in range(1, 4):
+        clock[0] += 500
+        work_queue.write_json(spool, heartbeat_file, {"beat": beat})
+        assert work_queue.requeue_stale_jobs(spool, beats_seen, stale_timeout=600) == 0
+
+    assert os.listdir(os.path.join(spool, "running")) == [os.path.basename(running_file)]
+    assert beats_seen[os.path.basename(running_file)] == (3, clock[0])